@@ -0,0 +1,51 @@
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle
+from PySide6.QtCore import Qt, QEvent, QRect, Signal
+from PySide6.QtGui import QColor, QFont, QPainter
+
+# model role holding the button's background QColor
+BUTTON_COLOR_ROLE = Qt.UserRole + 1
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    Paints a rounded push button in each cell (text from DisplayRole, color
+    from BUTTON_COLOR_ROLE) and emits clicked(index) on release, so tables
+    do not need a real QPushButton widget per row.
+    """
+    clicked = Signal(object)
+
+    def __init__(self, parent=None, width=80, height=28):
+        super().__init__(parent)
+        self.width = width
+        self.height = height
+
+    def button_rect(self, cell):
+        w = min(self.width, cell.width() - 4)
+        h = min(self.height, cell.height() - 4)
+        return QRect(cell.center().x() - w // 2, cell.center().y() - h // 2, w, h)
+
+    def paint(self, painter, option, index):
+        color = index.data(BUTTON_COLOR_ROLE) or QColor("#002366")
+        if option.state & QStyle.State_MouseOver:
+            color = color.darker(115)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(color)
+        rect = self.button_rect(option.rect)
+        painter.drawRoundedRect(rect, 6, 6)
+
+        font = QFont(option.font)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("white"))
+        painter.drawText(rect, Qt.AlignCenter, index.data(Qt.DisplayRole) or "")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if self.button_rect(option.rect).contains(event.position().toPoint()):
+                self.clicked.emit(index)
+                return True
+        return False
@@ -0,0 +1,32 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QDateEdit, QDialogButtonBox
+from PySide6.QtCore import QDate
+
+
+class DateRangeDialog(QDialog):
+    def __init__(self, parent=None, title="Select Report Period"):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+
+        layout = QVBoxLayout(self)
+        row = QHBoxLayout()
+
+        today = QDate.currentDate()
+        self.start_date = QDateEdit(QDate(today.year(), today.month(), 1))
+        self.start_date.setCalendarPopup(True)
+        self.end_date = QDateEdit(today)
+        self.end_date.setCalendarPopup(True)
+
+        row.addWidget(QLabel("From:"))
+        row.addWidget(self.start_date)
+        row.addWidget(QLabel("To:"))
+        row.addWidget(self.end_date)
+        layout.addLayout(row)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def get_dates(self):
+        """(start, end) as datetime.date, end inclusive."""
+        return self.start_date.date().toPython(), self.end_date.date().toPython()
@@ -0,0 +1,255 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QThread, Signal
+from PySide6.QtGui import QColor, QBrush, QFont
+
+from db.database import connect_from_env
+from Components.button_delegate import BUTTON_COLOR_ROLE
+
+PAGE_SIZE = 200
+MAX_CACHED_PAGES = 20  # ~4000 rows held at once, however far the view scrolls
+
+VOID_BACKGROUND = QBrush(QColor(200, 200, 200, 80))
+VOID_FOREGROUND = QBrush(QColor(50, 50, 50, 120))
+
+
+class PageLoader(QObject):
+    """Runs page queries for a LogTableModel on its own thread, over one connection it keeps open."""
+    loaded = Signal(int, int, list)  # generation, page index, rows
+    failed = Signal(int, int, str)
+
+    def __init__(self):
+        super().__init__()
+        self.conn = None
+
+    def load(self, generation, page_index, query, params):
+        try:
+            if self.conn is None or self.conn.closed:
+                self.conn = connect_from_env()
+                self.conn.autocommit = True
+            with self.conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+        except Exception as e:
+            self.close()
+            self.failed.emit(generation, page_index, str(e))
+            return
+        self.loaded.emit(generation, page_index, rows)
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+
+class LogTableModel(QAbstractTableModel):
+    """
+    Read-only view of gate_logs / room_logs, newest first.
+
+    Rows are fetched lazily in keyset-paginated pages (canFetchMore/fetchMore
+    as the view scrolls), ordered by (timestamp, id) DESC. Only the last
+    MAX_CACHED_PAGES pages are kept; an evicted page is re-read from its
+    boundary key when it is scrolled back into view, so memory stays flat.
+    All queries run on a model-owned PageLoader thread; rows of a page that
+    is being re-read show a placeholder until it arrives.
+
+    `columns` is a list of (header, column) pairs; a column of None is the
+    toggle button column (drawn by ButtonDelegate).
+    """
+    load_requested = Signal(int, int, str, list)  # generation, page index, query, params
+
+    def __init__(self, table, columns, parent=None):
+        super().__init__(parent)
+        self.table = table
+        self.columns = columns
+        self.db_columns = ["id", "timestamp", "status"] + [c for _, c in columns if c and c not in ("id", "timestamp", "status")]
+        self.where = ""
+        self.params = []
+        self.max_rows = None
+        self.generation = 0  # bumped by set_query so results for an old filter are dropped
+
+        self.loader_thread = QThread()
+        self.loader = PageLoader()
+        self.loader.moveToThread(self.loader_thread)
+        self.load_requested.connect(self.loader.load)
+        self.loader.loaded.connect(self.on_page_loaded)
+        self.loader.failed.connect(self.on_page_failed)
+        self.loader_thread.start()
+
+        self._clear()
+
+    def _clear(self):
+        self.pages = OrderedDict()
+        self.boundaries = []  # (timestamp, id) of the last row of each loaded page
+        self.loaded_rows = 0
+        self.exhausted = False
+        self.fetching = False  # a fetchMore page is on its way
+        self.pending = set()   # evicted pages being re-read
+
+    def shutdown(self):
+        self.loader_thread.quit()
+        self.loader_thread.wait()
+        self.loader.close()
+
+    # --- querying ------------------------------------------------------------
+
+    def set_query(self, where, params, max_rows=None):
+        """Apply a new filter (`where` is ANDed, e.g. "name ILIKE %s") and reload from the top."""
+        self.beginResetModel()
+        self.where = where
+        self.params = list(params)
+        self.max_rows = max_rows
+        self.generation += 1
+        self._clear()
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def _request_page(self, page_index):
+        query = f"SELECT {', '.join(self.db_columns)} FROM {self.table} WHERE TRUE"
+        params = []
+        if self.where:
+            query += f" AND {self.where}"
+            params.extend(self.params)
+        if page_index > 0:
+            query += " AND (timestamp, id) < (%s, %s)"
+            params.extend(self.boundaries[page_index - 1])
+        query += " ORDER BY timestamp DESC, id DESC LIMIT %s"
+        params.append(PAGE_SIZE)
+        self.load_requested.emit(self.generation, page_index, query, params)
+
+    def _make_row(self, row):
+        record = dict(zip(self.db_columns, row))
+        # formatted once here instead of on every paint
+        record["display_timestamp"] = record["timestamp"].strftime("%Y-%m-%d %I:%M %p")
+        return record
+
+    def _store_page(self, page_index, rows):
+        self.pages[page_index] = rows
+        self.pages.move_to_end(page_index)
+        while len(self.pages) > MAX_CACHED_PAGES:
+            self.pages.popitem(last=False)
+
+    def _page(self, page_index):
+        """The cached page, or None while it is being (re-)read."""
+        if page_index in self.pages:
+            self.pages.move_to_end(page_index)
+            return self.pages[page_index]
+        if page_index not in self.pending and page_index < len(self.boundaries):
+            self.pending.add(page_index)
+            self._request_page(page_index)
+        return None
+
+    def record(self, row):
+        page = self._page(row // PAGE_SIZE)
+        if page is None:
+            return None
+        offset = row % PAGE_SIZE
+        return page[offset] if offset < len(page) else None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self.fetching:
+            return False
+        return self.max_rows is None or self.loaded_rows < self.max_rows
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.fetching = True
+        self._request_page(len(self.boundaries))
+
+    def on_page_loaded(self, generation, page_index, rows):
+        if generation != self.generation:
+            return
+        rows = [self._make_row(row) for row in rows]
+
+        if page_index < len(self.boundaries):
+            # an evicted page scrolled back into view
+            self.pending.discard(page_index)
+            self._store_page(page_index, rows)
+            first = page_index * PAGE_SIZE
+            last = min(first + PAGE_SIZE, self.loaded_rows) - 1
+            self.dataChanged.emit(self.index(first, 0), self.index(last, self.columnCount() - 1))
+            return
+
+        self.fetching = False
+        if self.max_rows is not None:
+            rows = rows[:self.max_rows - self.loaded_rows]
+        if len(rows) < PAGE_SIZE:
+            self.exhausted = True
+        if not rows:
+            return
+
+        self.beginInsertRows(QModelIndex(), self.loaded_rows, self.loaded_rows + len(rows) - 1)
+        self._store_page(len(self.boundaries), rows)
+        self.boundaries.append((rows[-1]["timestamp"], rows[-1]["id"]))
+        self.loaded_rows += len(rows)
+        self.endInsertRows()
+
+    def on_page_failed(self, generation, page_index, message):
+        if generation != self.generation:
+            return
+        print(f"❌ Failed to load {self.table} page {page_index}: {message}")
+        if page_index < len(self.boundaries):
+            self.pending.discard(page_index)  # retried on the next paint
+        else:
+            self.fetching = False
+
+    # --- updates ---------------------------------------------------------------
+
+    def set_status(self, row, status):
+        record = self.record(row)
+        if record is None:
+            return
+        record["status"] = status
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    # --- Qt model API ------------------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.record(index.row())
+        if record is None:
+            # page still loading
+            return "…" if role == Qt.DisplayRole and index.column() == 0 else None
+        column = self.columns[index.column()][1]
+        void = record["status"] == "void"
+
+        if role == Qt.DisplayRole:
+            if column is None:
+                return "Void" if not void else "Activate"
+            if column == "timestamp":
+                return record["display_timestamp"]
+            value = record.get(column)
+            return "" if value is None else str(value)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if column is None:
+            if role == BUTTON_COLOR_ROLE:
+                return QColor("#dc3545") if void else QColor("#28a745")
+            return None
+        if void:
+            if role == Qt.FontRole:
+                font = QFont()
+                font.setStrikeOut(True)
+                return font
+            if role == Qt.BackgroundRole:
+                return VOID_BACKGROUND
+            if role == Qt.ForegroundRole:
+                return VOID_FOREGROUND
+        return None
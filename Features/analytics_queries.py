@@ -0,0 +1,126 @@
+# analytics_queries.py
+"""
+Shared read queries for charts (analytics page, dashboard, PDF reports).
+
+Everything reads the rollup tables from migration 4, with the time window
+pushed into SQL as a half-open [start, end) range on the day/hour column
+and the grouping and top-N done by the database, so a chart only ever
+transfers the handful of rows it draws.
+"""
+from datetime import date, timedelta
+
+from db.database import get_connection
+
+WINDOWS = ["All", "Today", "This Week", "This Month"]
+
+
+def window_range(filter_option, today=None):
+    """(start, end) dates for a window name; (None, None) means no bound."""
+    today = today or date.today()
+    tomorrow = today + timedelta(days=1)
+    if filter_option == "Today":
+        return today, tomorrow
+    if filter_option == "This Week":
+        return today - timedelta(days=today.weekday()), tomorrow
+    if filter_option == "This Month":
+        return today.replace(day=1), tomorrow
+    return None, None
+
+
+def _scope(column, source, role=None, start=None, end=None, name_filter=None, person_id=None, per_person=False):
+    """
+    WHERE clause + params shared by every query. Reads the total rows
+    (person_id = 0) unless a person, a name filter or per_person is given.
+    """
+    where = ["source = %s"]
+    params = [source]
+    if role:
+        where.append("role = %s")
+        params.append(role)
+    if start is not None:
+        where.append(f"{column} >= %s")
+        params.append(start)
+    if end is not None:
+        where.append(f"{column} < %s")
+        params.append(end)
+    if person_id is not None:
+        where.append("person_id = %s")
+        params.append(person_id)
+    elif name_filter or per_person:
+        where.append("person_id <> 0")
+        if name_filter:
+            where.append("name ILIKE %s")
+            params.append(f"%{name_filter}%")
+    else:
+        where.append("person_id = 0")
+    return " AND ".join(where), params
+
+
+def _fetch(query, params, conn=None):
+    """Run on `conn` when given (the caller owns it, e.g. to cancel it), else on a fresh connection."""
+    if conn is not None:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def daily_counts(source, role=None, start=None, end=None, name_filter=None, person_id=None, conn=None):
+    """[(day, purpose, count)] ordered by day."""
+    where, params = _scope("day", source, role, start, end, name_filter, person_id)
+    return _fetch(f"""
+        SELECT day, purpose, SUM(count)::INT FROM log_rollup_daily
+        WHERE {where}
+        GROUP BY day, purpose
+        ORDER BY day
+    """, params, conn)
+
+
+def hourly_counts(source, role=None, start=None, end=None, name_filter=None, conn=None):
+    """[(hour_of_day 0-23, purpose, count)] summed over the window."""
+    where, params = _scope("hour", source, role, start, end, name_filter)
+    return _fetch(f"""
+        SELECT EXTRACT(HOUR FROM hour)::INT, purpose, SUM(count)::INT FROM log_rollup_hourly
+        WHERE {where}
+        GROUP BY 1, purpose
+    """, params, conn)
+
+
+def top_people(source, role, purpose, start=None, end=None, limit=10, conn=None):
+    """[(name, count)] for the `limit` people with the most `purpose` logs in the window."""
+    where, params = _scope("day", source, role, start, end, per_person=True)
+    return _fetch(f"""
+        SELECT name, SUM(count)::INT AS total FROM log_rollup_daily
+        WHERE {where} AND lower(purpose) = lower(%s)
+        GROUP BY person_id, name
+        ORDER BY total DESC, name
+        LIMIT %s
+    """, params + [purpose, limit], conn)
+
+
+def totals_by_purpose(source, day=None):
+    """{purpose: count} for one day (default today)."""
+    rows = _fetch("""
+        SELECT purpose, SUM(count)::INT FROM log_rollup_daily
+        WHERE day = %s AND source = %s AND person_id = 0
+        GROUP BY purpose
+    """, (day or date.today(), source))
+    return dict(rows)
+
+
+def person_daily_totals(person_id, source, start=None, end=None):
+    """[(day, count)] across all purposes for one person."""
+    where, params = _scope("day", source, start=start, end=end, person_id=person_id)
+    return _fetch(f"""
+        SELECT day, SUM(count)::INT FROM log_rollup_daily
+        WHERE {where}
+        GROUP BY day
+        ORDER BY day
+    """, params)
@@ -0,0 +1,200 @@
+# bulk_enroll.py
+"""
+Batch enrollment from a CSV roster plus a folder of photos and/or short
+videos per person.
+
+    python -m Features.bulk_enroll roster.csv media_folder [--workers 4]
+
+The roster needs the columns name, role, section and contact (an optional
+`folder` column overrides the per-person folder, which defaults to
+media_folder/<name> or media_folder/<name_with_underscores>).
+"""
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+from numpy.linalg import norm
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+FRAMES_PER_VIDEO = 30
+EMBEDDINGS_PER_PERSON = 25
+MIN_QUALITY = 0.35
+
+_face_service = None
+
+
+def read_roster(csv_path, media_root):
+    people = []
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+            name = row.get("name")
+            if not name:
+                continue
+            folder = row.get("folder") or os.path.join(media_root, name)
+            if not os.path.isdir(folder):
+                folder = os.path.join(media_root, name.replace(" ", "_"))
+            people.append({
+                "name": name,
+                "role": row.get("role") or "Students",
+                "section": row.get("section", ""),
+                "contact": row.get("contact", ""),
+                "folder": folder,
+            })
+    return people
+
+
+def _init_worker():
+    # One model per process; each worker process keeps it for every person it handles
+    global _face_service
+    from Features.face_services import FaceDetectionService
+    _face_service = FaceDetectionService()
+
+
+def _iter_frames(folder):
+    for file_name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, file_name)
+        ext = os.path.splitext(file_name)[1].lower()
+        if ext in IMAGE_EXTENSIONS:
+            image = cv2.imread(path)
+            if image is not None:
+                yield image
+        elif ext in VIDEO_EXTENSIONS:
+            cap = cv2.VideoCapture(path)
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or FRAMES_PER_VIDEO
+            step = max(total // FRAMES_PER_VIDEO, 1)
+            for index in range(0, total, step):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame
+            cap.release()
+
+
+def embed_person(person):
+    """Detect and embed every photo/video frame for one person; keep the best embeddings."""
+    from Features.face_quality import score_face, largest_face
+
+    if not os.path.isdir(person["folder"]):
+        return person, None, f"folder not found: {person['folder']}"
+
+    scored = []
+    for frame in _iter_frames(person["folder"]):
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        face = largest_face(_face_service.detect_faces(rgb_frame))
+        if face is None or getattr(face, 'embedding', None) is None:
+            continue
+        score = score_face(face, rgb_frame, angle=None)
+        if score >= MIN_QUALITY:
+            scored.append((score, face.embedding / norm(face.embedding)))
+
+    if not scored:
+        return person, None, "no usable face found"
+
+    scored.sort(key=lambda s: s[0], reverse=True)
+    embeddings = np.array([emb for _, emb in scored[:EMBEDDINGS_PER_PERSON]], dtype=np.float32)
+    return person, embeddings, None
+
+
+def save_enrollments(results):
+    """
+    Insert all person_info rows in one statement, commit, then append every
+    embedding to the store in one write.
+    """
+    from psycopg2.extras import execute_values
+    from db.database import get_connection
+    from Features.embedding_store import EmbeddingStore, STORE_MARKER
+
+    rows = [(person["name"], person["role"], person["section"], person["contact"], STORE_MARKER)
+            for person, _ in results]
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            ids = execute_values(
+                cursor,
+                "INSERT INTO person_info (name, role, section_or_job, contact, npy_path) VALUES %s RETURNING id",
+                rows,
+                fetch=True
+            )
+        ids = [id_ for (id_,) in ids]
+        conn.commit()
+
+        # Only committed ids go into the store; if the append fails, the rows are removed again
+        try:
+            EmbeddingStore.get_instance().append_many(
+                [(id_, embeddings) for id_, (_, embeddings) in zip(ids, results)]
+            )
+        except Exception:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM person_info WHERE id = ANY(%s)", (ids,))
+            conn.commit()
+            raise
+    finally:
+        conn.close()
+
+    from Features.person_directory import PersonDirectory
+    PersonDirectory.get_instance().invalidate()
+    return ids
+
+
+def bulk_enroll(csv_path, media_root, workers=None, progress=None, indexer=None):
+    """
+    Enroll everyone in the roster. `progress(done, total, name, error)` is
+    called as each person finishes. When `indexer` (a live FaceIndexer) is
+    given, the new embeddings are added to it at the end.
+    Returns (enrolled_count, failures).
+    """
+    people = read_roster(csv_path, media_root)
+    results, failures = [], []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(embed_person, person) for person in people]
+        for done, future in enumerate(as_completed(futures), start=1):
+            person, embeddings, error = future.result()
+            if error:
+                failures.append((person["name"], error))
+            else:
+                results.append((person, embeddings))
+            if progress:
+                progress(done, len(people), person["name"], error)
+
+    if not results:
+        return 0, failures
+
+    ids = save_enrollments(results)
+
+    if indexer is not None:
+        for id_, (person, embeddings) in zip(ids, results):
+            indexer.add_faces(embeddings, {
+                "id": id_,
+                "name": person["name"],
+                "contact": person["contact"],
+                "role": person["role"],
+                "section": person["section"],
+            })
+
+    return len(results), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-enroll people from a CSV roster and media folders.")
+    parser.add_argument("roster", help="CSV with name, role, section, contact columns")
+    parser.add_argument("media_root", help="folder containing one sub-folder of photos/videos per person")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    def report(done, total, name, error):
+        print(f"[{done}/{total}] {name}: {'❌ ' + error if error else '✅'}")
+
+    enrolled, failures = bulk_enroll(args.roster, args.media_root, args.workers, progress=report)
+    print(f"Enrolled {enrolled} people, {len(failures)} failed.")
+
+
+if __name__ == "__main__":
+    main()
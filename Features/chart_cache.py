@@ -0,0 +1,113 @@
+# chart_cache.py
+"""
+Caches for rendered charts.
+
+- data_fingerprint(): the newest gate/room log ids. The rollups only change
+  when logs are inserted, so an unchanged fingerprint means unchanged charts.
+- CanvasCache: LRU of drawn FigureCanvas widgets shown through a
+  QStackedWidget; a hit just switches the visible canvas, and an evicted
+  canvas is cleared and reused for the next chart instead of building a new one.
+- png_cache: LRU of PNG bytes for report charts, keyed by the chart data itself.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from db.database import get_connection
+
+FINGERPRINT_TTL_SECONDS = 2.0
+
+_fingerprint = None
+_fingerprint_at = 0.0
+_fingerprint_lock = threading.Lock()
+
+
+def data_fingerprint(conn=None):
+    """
+    (max gate_logs id, max room_logs id), re-read at most every
+    FINGERPRINT_TTL_SECONDS. Pass `conn` from worker threads; without it a
+    fresh connection is opened.
+    """
+    global _fingerprint, _fingerprint_at
+    with _fingerprint_lock:
+        if _fingerprint is None or time.monotonic() - _fingerprint_at > FINGERPRINT_TTL_SECONDS:
+            own_conn = conn is None
+            if own_conn:
+                conn = get_connection()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT (SELECT MAX(id) FROM gate_logs), (SELECT MAX(id) FROM room_logs)")
+                    _fingerprint = cursor.fetchone()
+            finally:
+                if own_conn:
+                    conn.close()
+            _fingerprint_at = time.monotonic()
+        return _fingerprint
+
+
+class LRUCache:
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, value):
+        """Store value; returns the evicted (key, value) or None."""
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                return self.entries.popitem(last=False)
+        return None
+
+
+class CanvasCache:
+    """
+    One chart slot on a page. show(key, render) displays the canvas drawn for
+    `key`, calling render(canvas) only when that key is not cached.
+    """
+
+    def __init__(self, stack, make_canvas, max_entries=6):
+        self.stack = stack
+        self.make_canvas = make_canvas
+        self.max_entries = max_entries
+        self.canvases = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.canvases
+
+    def show(self, key, render):
+        """render may be None when the caller already checked that `key` is cached."""
+        if key in self.canvases:
+            self.canvases.move_to_end(key)
+            self.stack.setCurrentWidget(self.canvases[key])
+            return
+
+        if len(self.canvases) >= self.max_entries:
+            # recycle the least recently shown canvas and its figure
+            _, canvas = self.canvases.popitem(last=False)
+            canvas.figure.clear()
+        else:
+            canvas = self.make_canvas()
+            self.stack.addWidget(canvas)
+
+        render(canvas)
+        self.canvases[key] = canvas
+        self.stack.setCurrentWidget(canvas)
+
+    def clear(self):
+        for canvas in self.canvases.values():
+            self.stack.removeWidget(canvas)
+            canvas.deleteLater()
+        self.canvases.clear()
+
+
+# report chart PNGs, per process
+png_cache = LRUCache(max_entries=64)
@@ -1,57 +1,98 @@
 import csv
+import os
 from datetime import datetime
-from PySide6.QtWidgets import QFileDialog
 
-def export_table_to_csv(table_widget, parent=None, preset_name="logs"):
+from PySide6.QtCore import QObject, Signal
+
+from db.database import connect_from_env
+
+CHUNK_ROWS = 5000
+
+
+def suggested_file_name(preset_name):
+    return f"{preset_name}_{datetime.now().strftime('%Y-%m-%d')}.csv"
+
+
+def format_value(column, value):
+    if value is None:
+        return ""
+    if column == "timestamp" and isinstance(value, datetime):
+        # leading apostrophe keeps Excel from reinterpreting the AM/PM time
+        return "'" + value.strftime("%Y-%m-%d %I:%M %p")
+    return str(value)
+
+
+class CsvExportWorker(QObject):
     """
-    Export the contents of a QTableWidget to a CSV file.
+    Streams every row matching a log filter to CSV through a server-side
+    cursor, CHUNK_ROWS at a time, so memory stays flat for full-term exports.
+    Voided rows are left out. Writes to <path>.part and renames on success;
+    cancel() stops at the next chunk and removes the partial file.
     """
-    suggested_name = f"{preset_name}_{datetime.now().strftime('%Y-%m-%d')}.csv"
-
-    path, _ = QFileDialog.getSaveFileName(
-        parent,
-        "Save CSV",
-        suggested_name,
-        "CSV Files (*.csv);;All Files (*)"
-    )
-    if not path:
-        return  # User canceled
-
-    with open(path, "w", newline="", encoding="utf-8-sig") as file:
-        writer = csv.writer(file)
-
-        # Get headers from the table
-        headers = [table_widget.horizontalHeaderItem(i).text() for i in range(table_widget.columnCount())]
-
-        # Identify Status and Toggle columns to exclude
-        exclude_cols = [i for i, h in enumerate(headers) if h in ("Status", "Toggle")]
-
-        # Filtered headers (no Status, no Toggle)
-        filtered_headers = [h for i, h in enumerate(headers) if i not in exclude_cols]
-        writer.writerow(filtered_headers)
-
-        # Write data rows
-        for row in range(table_widget.rowCount()):
-            # Check the actual status column (before exclusion)
-            status_col_index = next((i for i, h in enumerate(headers) if h == "Status"), None)
-            if status_col_index is not None:
-                status_item = table_widget.item(row, status_col_index)
-                status_text = status_item.text().lower() if status_item else ""
-                if status_text == "void":
-                    continue  # skip voided rows
-
-            row_data = []
-            for col in range(table_widget.columnCount()):
-                if col in exclude_cols:
-                    continue  # skip Status & Toggle
-
-                item = table_widget.item(row, col)
-                text = item.text() if item else ""
-
-                # If it looks like a timestamp with AM/PM → force Excel to treat as text
-                if "AM" in text or "PM" in text:
-                    text = f"'{text}"
-
-                row_data.append(text)
-
-            writer.writerow(row_data)
+    progress = Signal(int, int)  # rows written, total rows
+    finished = Signal(str, int)  # path, rows written ("" when cancelled)
+    failed = Signal(str)
+
+    def __init__(self, path, table, columns, where="", params=()):
+        super().__init__()
+        self.path = path
+        self.table = table
+        self.columns = [(header, column) for header, column in columns if column]
+        self.where = where
+        self.params = list(params)
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        tmp_path = self.path + ".part"
+        conn = None
+        written = 0
+        try:
+            # never get_connection() here: its console fallback cannot prompt from a worker thread
+            conn = connect_from_env()
+            where = "status <> 'void'" + (f" AND {self.where}" if self.where else "")
+
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) FROM {self.table} WHERE {where}", self.params)
+                total = cursor.fetchone()[0]
+            self.progress.emit(0, total)
+
+            db_columns = [column for _, column in self.columns]
+            with conn.cursor(name="csv_export") as cursor, \
+                    open(tmp_path, "w", newline="", encoding="utf-8-sig") as file:
+                cursor.itersize = CHUNK_ROWS
+                cursor.execute(
+                    f"SELECT {', '.join(db_columns)} FROM {self.table} WHERE {where} "
+                    f"ORDER BY timestamp DESC, id DESC",
+                    self.params
+                )
+                writer = csv.writer(file)
+                writer.writerow([header for header, _ in self.columns])
+
+                while not self.cancelled:
+                    rows = cursor.fetchmany(CHUNK_ROWS)
+                    if not rows:
+                        break
+                    writer.writerows(
+                        [format_value(column, value) for column, value in zip(db_columns, row)]
+                        for row in rows
+                    )
+                    written += len(rows)
+                    self.progress.emit(written, total)
+
+            if self.cancelled:
+                os.remove(tmp_path)
+                self.finished.emit("", written)
+            else:
+                os.replace(tmp_path, self.path)
+                self.finished.emit(self.path, written)
+        except Exception as e:
+            print(f"❌ CSV export failed: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self.failed.emit(str(e))
+        finally:
+            if conn is not None:
+                conn.close()
@@ -0,0 +1,236 @@
+# embedding_store.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+EMBEDDING_DIM = 512
+STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "encoding")
+
+# person_info.npy_path value for people whose embeddings live in the store
+STORE_MARKER = "embedding_store"
+
+
+class EmbeddingStore:
+    """
+    All face embeddings in one append-only float32 matrix on disk plus a small
+    id/offset table, instead of one .npz per person.
+
+    - Appends write the new rows to the end of the data file, fsync it, then
+      atomically replace the index (the index is the commit point, so a crash
+      mid-append leaves only unreferenced bytes that the next append trims).
+    - load_all() memory-maps the matrix and reads it in one go.
+    - compact() rewrites only live rows (optionally only those of people
+      still in person_info) into a new generation of the data file and
+      switches the index to it.
+
+    Every operation holds an OS lock on embeddings.lock as well as the
+    in-process lock, so the GUI and the bulk_enroll CLI can share the store.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "embeddings_index.npz")
+        self.lock_path = os.path.join(directory, "embeddings.lock")
+        self._thread_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = EmbeddingStore()
+        return cls._instance
+
+    @contextmanager
+    def _lock(self):
+        """Exclusive across threads (threading.Lock) and processes (OS lock on lock_path)."""
+        with self._thread_lock:
+            with open(self.lock_path, "a+b") as f:
+                if os.name == "nt":
+                    import msvcrt
+                    f.seek(0)
+                    while True:
+                        try:
+                            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                            break
+                        except OSError:
+                            time.sleep(0.05)
+                    try:
+                        yield
+                    finally:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # --- index -------------------------------------------------------------
+
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return {
+                "data_file": "embeddings.0.f32",
+                "person_id": np.zeros(0, dtype=np.int64),
+                "offset": np.zeros(0, dtype=np.int64),
+                "count": np.zeros(0, dtype=np.int64),
+            }
+        with np.load(self.index_path) as index:
+            return {
+                "data_file": str(index["data_file"]),
+                "person_id": index["person_id"],
+                "offset": index["offset"],
+                "count": index["count"],
+            }
+
+    def _write_index(self, index):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, data_file=np.array(index["data_file"]), person_id=index["person_id"],
+                     offset=index["offset"], count=index["count"])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+    def _data_path(self, index):
+        return os.path.join(self.directory, index["data_file"])
+
+    @staticmethod
+    def _end_row(index):
+        if len(index["offset"]) == 0:
+            return 0
+        return int((index["offset"] + index["count"]).max())
+
+    # --- public API --------------------------------------------------------
+
+    def append(self, person_id, embeddings):
+        self.append_many([(person_id, embeddings)])
+
+    def append_many(self, entries):
+        """Append [(person_id, embeddings (n, 512))] with a single write and index update."""
+        entries = [(int(pid), np.asarray(emb, dtype=np.float32).reshape(-1, EMBEDDING_DIM)) for pid, emb in entries]
+        entries = [(pid, emb) for pid, emb in entries if len(emb)]
+        if not entries:
+            return
+
+        with self._lock():
+            index = self._read_index()
+            data_path = self._data_path(index)
+            end_row = self._end_row(index)
+
+            with open(data_path, "ab") as f:
+                # Drop bytes from an append that crashed before its index commit
+                f.truncate(end_row * EMBEDDING_DIM * 4)
+                for _, emb in entries:
+                    f.write(emb.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            offsets, row = [], end_row
+            for _, emb in entries:
+                offsets.append(row)
+                row += len(emb)
+
+            index["person_id"] = np.concatenate([index["person_id"], [pid for pid, _ in entries]]).astype(np.int64)
+            index["offset"] = np.concatenate([index["offset"], offsets]).astype(np.int64)
+            index["count"] = np.concatenate([index["count"], [len(emb) for _, emb in entries]]).astype(np.int64)
+            self._write_index(index)
+
+    def delete(self, person_id):
+        """Forget a person's embeddings (space is reclaimed by compact())."""
+        with self._lock():
+            index = self._read_index()
+            keep = index["person_id"] != int(person_id)
+            for key in ("person_id", "offset", "count"):
+                index[key] = index[key][keep]
+            self._write_index(index)
+
+    def person_ids(self):
+        with self._lock():
+            return set(int(pid) for pid in self._read_index()["person_id"])
+
+    def load_all(self):
+        """
+        Return (embeddings (N, 512) float32, person_ids (N,)) for every live row,
+        read from the memory-mapped matrix in one pass.
+        """
+        with self._lock():
+            index = self._read_index()
+            end_row = self._end_row(index)
+            if end_row == 0:
+                return np.zeros((0, EMBEDDING_DIM), dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+            matrix = np.memmap(self._data_path(index), dtype=np.float32, mode="r", shape=(end_row, EMBEDDING_DIM))
+            rows = np.concatenate([np.arange(o, o + c) for o, c in zip(index["offset"], index["count"])])
+            embeddings = np.array(matrix[rows])
+            person_ids = np.repeat(index["person_id"], index["count"])
+            del matrix
+        return embeddings, person_ids
+
+    def compact(self, live_person_ids=None):
+        """
+        Rewrite indexed rows into a fresh data file, reclaiming the space of
+        deleted entries and of appends that crashed before their index commit.
+        `live_person_ids` (a callable returning a set of ids) also drops entries
+        of people no longer in person_info; it is called with the store locked,
+        so an enrollment committed before its append is never mistaken for one.
+        """
+        with self._lock():
+            index = self._read_index()
+            end_row = self._end_row(index)  # of the current data file, before any entries are dropped
+            if live_person_ids is not None:
+                live = set(live_person_ids())
+                keep = np.array([int(pid) in live for pid in index["person_id"]], dtype=bool)
+                dropped = int((~keep).sum())
+                if dropped:
+                    print(f"[embedding_store] Dropping {dropped} entries of people no longer in person_info")
+                index = dict(index, **{key: index[key][keep] for key in ("person_id", "offset", "count")})
+            old_path = self._data_path(index)
+            generation = int(index["data_file"].split(".")[1]) + 1
+            new_index = {
+                "data_file": f"embeddings.{generation}.f32",
+                "person_id": index["person_id"].copy(),
+                "offset": np.zeros(len(index["offset"]), dtype=np.int64),
+                "count": index["count"].copy(),
+            }
+
+            with open(self._data_path(new_index), "wb") as out:
+                if end_row:
+                    matrix = np.memmap(old_path, dtype=np.float32, mode="r", shape=(end_row, EMBEDDING_DIM))
+                    row = 0
+                    for i, (offset, count) in enumerate(zip(index["offset"], index["count"])):
+                        out.write(np.ascontiguousarray(matrix[offset:offset + count]).tobytes())
+                        new_index["offset"][i] = row
+                        row += count
+                    del matrix
+                out.flush()
+                os.fsync(out.fileno())
+
+            self._write_index(new_index)
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+
+def person_info_ids():
+    from db.database import get_connection
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id FROM person_info")
+            return {id_ for (id_,) in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    # python -m Features.embedding_store  ->  reclaim space from people removed from person_info
+    EmbeddingStore.get_instance().compact(person_info_ids)
+    print("✅ Embedding store compacted.")
@@ -0,0 +1,87 @@
+import heapq
+import itertools
+import threading
+
+import cv2
+import numpy as np
+from numpy.linalg import norm
+from PySide6.QtCore import QObject, Signal
+
+from Features.face_quality import score_face, largest_face
+
+
+class EnrollmentWorker(QObject):
+    """
+    Runs face detection for the enrollment dialog off the GUI thread. While
+    collecting for an angle it scores every frame and keeps the best N
+    embeddings, instead of taking whatever face is visible at fixed intervals.
+    """
+    faces_detected = Signal(list)       # [(bbox, kps)] in full-frame coordinates for the preview
+    candidates_changed = Signal(int)    # candidates kept so far for the current angle
+
+    def __init__(self, face_service, keep_per_angle=5, scale=0.5, min_score=0.4):
+        super().__init__()
+        self.face_service = face_service
+        self.keep_per_angle = keep_per_angle
+        self.scale = scale
+        self.min_score = min_score
+        self.running = False
+
+        self._lock = threading.Lock()
+        self._angle = None
+        self._candidates = []           # min-heap of (score, seq, embedding)
+        self._seq = itertools.count()
+
+    def process_frame(self, rgb_frame):
+        """Always emits faces_detected (empty on error) so the sender knows the worker is free."""
+        self.running = True
+        faces = []
+        try:
+            small_frame = cv2.resize(rgb_frame, (0, 0), fx=self.scale, fy=self.scale)
+            faces = self.face_service.detect_faces(small_frame)
+
+            with self._lock:
+                angle = self._angle
+            face = largest_face(faces)
+            if angle is None or face is None or getattr(face, 'embedding', None) is None:
+                return
+
+            score = score_face(face, small_frame, angle)
+            if score < self.min_score:
+                return
+            self._keep_candidate(score, face.embedding / norm(face.embedding))
+        except Exception as e:
+            print(f"Enrollment detection error: {e}")
+        finally:
+            self.running = False
+            self.faces_detected.emit([
+                (face.bbox / self.scale, face.kps / self.scale if face.kps is not None else None)
+                for face in faces
+            ])
+
+    def _keep_candidate(self, score, embedding):
+        with self._lock:
+            entry = (score, next(self._seq), embedding)
+            if len(self._candidates) < self.keep_per_angle:
+                heapq.heappush(self._candidates, entry)
+            elif score > self._candidates[0][0]:
+                heapq.heapreplace(self._candidates, entry)
+            count = len(self._candidates)
+        self.candidates_changed.emit(count)
+
+    def start_collecting(self, angle):
+        with self._lock:
+            self._angle = angle
+            self._candidates = []
+
+    def stop_collecting(self):
+        """Stop collecting and return the kept embeddings, best first."""
+        with self._lock:
+            self._angle = None
+            best = sorted(self._candidates, reverse=True)
+            self._candidates = []
+        return [np.asarray(embedding, dtype=np.float32) for _, _, embedding in best]
+
+    def candidate_count(self):
+        with self._lock:
+            return len(self._candidates)
@@ -0,0 +1,128 @@
+# event_bus.py
+import json
+import select
+import threading
+import time
+from datetime import datetime
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+CHANNEL = "log_events"
+PERSON_CHANNEL = "person_events"
+RECONNECT_DELAY_SECONDS = 5
+
+
+class LogListenerWorker(QObject):
+    """
+    LISTENs on the log_events channel (see migration 5) and emits one dict per
+    inserted log row, and on person_events (migration 8) for roster changes.
+    """
+    log_inserted = Signal(dict)
+    person_changed = Signal(dict)
+    connected = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.running = True
+
+    def run(self):
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+        from db.database import connect_from_env
+
+        while self.running:
+            conn = None
+            try:
+                conn = connect_from_env()
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                    cursor.execute(f"LISTEN {PERSON_CHANNEL}")
+                print("📡 Listening for log events")
+                # Subscribers reconcile on (re)connect to cover anything missed while offline
+                self.connected.emit()
+
+                while self.running:
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        if notify.channel == PERSON_CHANNEL:
+                            self.emit_person_event(notify.payload)
+                        else:
+                            self.emit_event(notify.payload)
+            except Exception as e:
+                print(f"⚠️ Log event listener disconnected: {e}")
+                # sleep in small steps so stop() is not held up
+                for _ in range(RECONNECT_DELAY_SECONDS * 10):
+                    if not self.running:
+                        break
+                    time.sleep(0.1)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def emit_event(self, payload):
+        try:
+            event = json.loads(payload)
+            event["timestamp"] = datetime.fromisoformat(event["timestamp"])
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Ignoring malformed log event: {e}")
+            return
+        self.log_inserted.emit(event)
+
+    def emit_person_event(self, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            event = {}
+        self.person_changed.emit(event)
+
+
+class LogEventBus(QObject):
+    """
+    Process-wide feed of new gate/room log rows and person_info changes,
+    driven by PostgreSQL LISTEN/NOTIFY so changes made by any camera or
+    machine show up.
+    Create it from the GUI thread; signals are delivered there.
+    """
+    log_inserted = Signal(dict)
+    person_changed = Signal(dict)
+    connected = Signal()
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__()
+        self.thread = None
+        self.worker = None
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = LogEventBus()
+                cls._instance.start()
+        return cls._instance
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = QThread()
+        self.worker = LogListenerWorker()
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.log_inserted.connect(self.log_inserted)
+        self.worker.person_changed.connect(self.person_changed)
+        self.worker.connected.connect(self.connected)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.worker.running = False
+        self.thread.quit()
+        self.thread.wait()
+        self.thread = None
+        self.worker = None
@@ -1,68 +1,97 @@
-from itertools import count
-
 import faiss
 import numpy as np
 from numpy.linalg import norm
 import os
 from db.database import get_connection
 import glob
-from datetime import datetime
+from datetime import datetime, timedelta
 from Features.sms_notification import send_sms_notification
+from Features.embedding_store import EmbeddingStore, STORE_MARKER
+from Features.person_directory import PersonDirectory, face_info
+from Features.identity_cache import IdentityCache
 import threading
 
 class FaceIndexer:
+    _instance = None
+    _instance_lock = threading.Lock()
+
     def __init__(self):
         # Initialize the data (embedding + info)
-        self.data = self.load_faces()  # Assuming you already have a method that loads your data
-        self.embeddings = np.array([entry['embedding'] for entry in self.data], dtype=np.float32)
-        self.infos = [entry['info'] for entry in self.data]
+        self.embeddings, self.infos = self.load_faces()
 
         # Create FAISS index
         self.index = self.build_faiss_index(self.embeddings)
-
-    def load_faces(self):
-        all_data = []
+        self.index_lock = threading.Lock()  # guards index/infos between camera searches and add_faces
+
+        # Roster edits/removals (here or on another machine) rebuild the index in the background
+        self.reload_lock = threading.Lock()
+        self.reloading = False
+        self.reload_again = False
+        PersonDirectory.get_instance().changed.connect(self.on_people_changed)
+
+    @classmethod
+    def get_instance(cls):
+        """Shared indexer used by every camera (built once, usually by the warm-up service)."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = FaceIndexer()
+        return cls._instance
+
+    def load_faces(self, strict=False):
+        """
+        Return (embeddings (N, 512), infos) for everyone in person_info. Embeddings
+        come from the consolidated EmbeddingStore in one read; people still on a
+        legacy per-person .npz are loaded from it once and imported into the store.
+        With strict=True a failure raises instead of returning no faces.
+        """
+        embeddings, infos = [], []
         try:
-            conn = get_connection()
-            if not conn:
-                print("⚠️ No DB connection, skipping face loading.")
-                return all_data
-
-            cursor = conn.cursor()
-
-            # Unified people_info table
-            cursor.execute("SELECT id, name, contact, role, section_or_job, npy_path FROM person_info")
-            for row in cursor.fetchall():
-                id_, name, contact, role, section_or_job, npz_path = row
-                npz_files = glob.glob(npz_path) if '*' in npz_path else [npz_path]
-
-                for path in npz_files:
-                    try:
-                        if path.endswith(".npz"):
-                            npz_data = np.load(path)
-                            if 'embeddings' in npz_data:
-                                emb_array = npz_data['embeddings']
-                                if emb_array.ndim == 2 and emb_array.shape[1] == 512:
-                                    for emb in emb_array:
-                                        all_data.append({
-                                            "embedding": emb,
-                                            "info": {
-                                                "id": id_,
-                                                "name": name,
-                                                "contact": contact,
-                                                "role": role,
-                                                "section": section_or_job
-                                            }
-                                        })
-                    except Exception as e:
-                        print(f"[people_info] Failed to load {path}: {e}")
-
-            conn.close()
+            # Shared with the roster pages, so person_info is not re-queried here
+            people = {row[0]: (face_info(row), row[5]) for row in PersonDirectory.get_instance().rows()}
+
+            store = EmbeddingStore.get_instance()
+            stored_ids = store.person_ids()
+            legacy = [(id_, self.load_legacy_npz(npz_path)) for id_, (_, npz_path) in people.items()
+                      if id_ not in stored_ids and npz_path and npz_path != STORE_MARKER]
+            legacy = [(id_, emb) for id_, emb in legacy if len(emb)]
+            if legacy:
+                store.append_many(legacy)
+                print(f"[people_info] Imported {len(legacy)} legacy .npz files into the embedding store")
+
+            store_embeddings, person_ids = store.load_all()
+            for emb, person_id in zip(store_embeddings, person_ids):
+                person = people.get(int(person_id))
+                if person is not None:  # skip embeddings of people removed from person_info
+                    embeddings.append(emb)
+                    infos.append(person[0])
 
         except Exception as e:
             print(f"❌ Failed to load faces: {e}")
-
-        return all_data
+            if strict:
+                raise
+
+        if not embeddings:
+            return np.zeros((0, 512), dtype=np.float32), []
+        return np.array(embeddings, dtype=np.float32), infos
+
+    def load_legacy_npz(self, npz_path):
+        all_embeddings = []
+        npz_files = glob.glob(npz_path) if '*' in npz_path else [npz_path]
+
+        for path in npz_files:
+            try:
+                if path.endswith(".npz"):
+                    npz_data = np.load(path)
+                    if 'embeddings' in npz_data:
+                        emb_array = npz_data['embeddings']
+                        if emb_array.ndim == 2 and emb_array.shape[1] == 512:
+                            all_embeddings.append(emb_array)
+            except Exception as e:
+                print(f"[people_info] Failed to load {path}: {e}")
+
+        if not all_embeddings:
+            return np.zeros((0, 512), dtype=np.float32)
+        return np.concatenate(all_embeddings).astype(np.float32)
 
     def build_faiss_index(self, embeddings):
         if embeddings.size == 0:
@@ -90,111 +119,226 @@ class FaceIndexer:
             print(f"❌ Unexpected error in building FAISS index: {e}")
             return None
 
-    def recognize_face(self, new_embedding, threshold=1.2, camera_purpose=None, location=None):
-        new_embedding = new_embedding / norm(new_embedding)
-        new_embedding = np.array([new_embedding], dtype=np.float32)
+    def on_people_changed(self):
+        """PersonDirectory.changed: reload in a background thread (changes during a reload queue one more)."""
+        with self.reload_lock:
+            if self.reloading:
+                self.reload_again = True
+                return
+            self.reloading = True
+        threading.Thread(target=self._reload_loop, daemon=True).start()
+
+    def _reload_loop(self):
+        while True:
+            try:
+                self.reload_faces()
+            except Exception as e:
+                print(f"❌ Failed to reload faces, keeping the current index: {e}")
+            with self.reload_lock:
+                if not self.reload_again:
+                    self.reloading = False
+                    return
+                self.reload_again = False
+
+    def reload_faces(self):
+        """Rebuild embeddings, infos and the index from the directory, then swap them in."""
+        embeddings, infos = self.load_faces(strict=True)
+        index = self.build_faiss_index(embeddings)
+        with self.index_lock:
+            old_infos = self.infos
+            self.embeddings, self.infos, self.index = embeddings, infos, index
+        print(f"🔄 Face index reloaded: {len(infos)} embeddings")
+
+        # person_events carry no ids, so cached identities are dropped for anyone
+        # whose details or embeddings differ (or who was removed)
+        cache = IdentityCache.get_instance()
+        for person_id in self.changed_people(old_infos, infos):
+            cache.forget(person_id)
+
+    @staticmethod
+    def changed_people(old_infos, new_infos):
+        """Ids whose info or embedding count differs between two infos lists."""
+        def summary(infos):
+            people = {}
+            for info in infos:
+                count = people[info["id"]][1] + 1 if info["id"] in people else 1
+                people[info["id"]] = (info, count)
+            return people
+
+        old, new = summary(old_infos), summary(new_infos)
+        return {person_id for person_id, entry in old.items() if new.get(person_id) != entry}
+
+    def add_faces(self, embeddings, info):
+        """Add newly enrolled embeddings for one person to the live index without a rebuild."""
+        embeddings = np.array(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[1] != 512 or len(embeddings) == 0:
+            print(f"❌ Skipping index update for {info.get('name')}: bad embeddings shape {embeddings.shape}")
+            return
+
+        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        with self.index_lock:
+            if self.index is None:
+                self.index = faiss.IndexFlatL2(embeddings.shape[1])
+            self.index.add(embeddings)
+            self.infos.extend([info] * len(embeddings))
+        print(f"FAISS index updated with {len(embeddings)} embeddings for {info.get('name')}")
+
+    def identify(self, new_embedding, threshold=1.2):
+        """
+        (info, confidence) for a normalized embedding, or None. Recent
+        identities from any camera are checked first (IdentityCache); only a
+        miss searches the FAISS index, and a match there is cached.
+        """
+        cache = IdentityCache.get_instance()
+        cached = cache.lookup(new_embedding)
+        if cached is not None:
+            info, confidence = cached
+            print(f"⚡ Face re-identified from cache: {info['name']} (ID: {info['id']}, confidence {confidence:.2f})")
+            return info, confidence
 
         if self.index is None:
             print("❌ FAISS index is not available. Cannot recognize face.")
             return None
 
-        print("→ Input embedding shape:", new_embedding.shape)
         print("→ FAISS index size:", self.index.ntotal)
 
-        distances, indices = self.index.search(new_embedding, k=1)
+        with self.index_lock:
+            distances, indices = self.index.search(new_embedding[None, :], k=1)
+            info = self.infos[indices[0][0]] if indices[0][0] != -1 else None
 
         print("→ Nearest index:", indices[0][0])
         print("→ Distance to nearest:", distances[0][0])
 
-        if indices[0][0] != -1 and distances[0][0] < threshold:
-            recognized_info = self.infos[indices[0][0]]
-            print(f"✅ Face recognized: {recognized_info['name']} (ID: {recognized_info['id']}) has {'Entered' if camera_purpose == 'Entry' else 'Exited'} at {location}")
+        if info is None or distances[0][0] >= threshold:
+            return None
 
-            # Get current date as string (YYYY-MM-DD)
-            current_date = datetime.now().strftime('%Y-%m-%d')
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            name = recognized_info['name']
-            role = recognized_info.get('role', 'unknown')
-            section = recognized_info.get('section', 'unknown')
-            contact = recognized_info.get('contact', 'unknown')
+        # squared L2 between unit vectors is 2 - 2*cos
+        confidence = 1.0 - float(distances[0][0]) / 2.0
+        cache.remember(new_embedding, info, confidence)
+        return info, confidence
+
+    def recognize_face(self, new_embedding, threshold=1.2, camera_purpose=None, location=None):
+        new_embedding = np.asarray(new_embedding / norm(new_embedding), dtype=np.float32)
+
+        identified = self.identify(new_embedding, threshold)
+        if identified is None:
+            print("❌ No match found or the match is not strict enough")
+            return None
+
+        recognized_info, confidence = identified
+        print(f"✅ Face recognized: {recognized_info['name']} (ID: {recognized_info['id']}) has {'Entered' if camera_purpose == 'Entry' else 'Exited'} at {location}")
+
+        # Get current date as string (YYYY-MM-DD)
+        now = datetime.now().replace(microsecond=0)
+        current_date = now.strftime('%Y-%m-%d')
+        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
+        name = recognized_info['name']
+        role = recognized_info.get('role', 'unknown')
+        section = recognized_info.get('section', 'unknown')
+        contact = recognized_info.get('contact', 'unknown')
+        person_id = recognized_info['id']
+        cache = IdentityCache.get_instance()
+
+        if location.lower() == 'gate':
+            # One gate log per person, purpose and day; a cached one (from any camera) skips the DB check
+            claimed, previous = cache.claim_event(person_id, location, camera_purpose, now)
+            if not claimed:
+                print(f"ℹ️ Entry log already exists for {name} on {current_date}, skipping insert.")
+                return {"info": recognized_info, "timestamp": timestamp, "confidence": confidence}
 
-            # Check entry log and insert if not exist
             conn = get_connection()
             cursor = conn.cursor()
-
-            if location.lower() == 'gate':
+            try:
                 # Check if entry exists for this name and date
                 print("going to gate logs")
+                day_start = now.replace(hour=0, minute=0, second=0)
                 cursor.execute("""
-                                SELECT COUNT(*) FROM gate_logs
-                                WHERE name = %s AND DATE(timestamp) = %s AND purpose = %s
-                            """, (name, current_date, camera_purpose))
+                                SELECT MAX(timestamp) FROM gate_logs
+                                WHERE person_id = %s AND timestamp >= %s AND timestamp < %s + INTERVAL '1 day' AND purpose = %s
+                            """, (person_id, day_start, day_start, camera_purpose))
 
-                (count,) = cursor.fetchone()
+                (existing,) = cursor.fetchone()
 
-                if count == 0:
+                if existing is None:
                     # Insert new log
                     cursor.execute("""
                                     INSERT INTO gate_logs (person_id, name, timestamp, role, purpose, section)
                                     VALUES (%s, %s, %s, %s, %s, %s)
-                                """, (recognized_info['id'], name, timestamp, role, camera_purpose, section))
+                                """, (person_id, name, timestamp, role, camera_purpose, section))
                     conn.commit()
+                    # Queued to the durable outbox; delivery happens on a background thread
                     send_sms_notification(contact, name, timestamp, camera_purpose)
                     print(f"📝 Entry log added for {name} on {current_date} with role {role}.")
                 else:
+                    cache.record_event(person_id, location, camera_purpose, existing)
                     print(f"ℹ️ Entry log already exists for {name} on {current_date}, skipping insert.")
-
+            except Exception as e:
+                cache.release_event(person_id, location, camera_purpose, previous)
+                print(f"Error: {e}")
+            finally:
                 cursor.close()
                 conn.close()
 
-                return {
-                    "info": recognized_info,
-                    "timestamp": timestamp,
-                }
+            return {
+                "info": recognized_info,
+                "timestamp": timestamp,
+                "confidence": confidence,
+            }
+
+        # Rooms: 30 s cooldown; a sighting inside a cached cooldown never reaches the DB
+        claimed, previous = cache.claim_event(person_id, location, camera_purpose, now, cooldown_seconds=30)
+        if not claimed:
+            elapsed_seconds = (now - previous).total_seconds()
+            print(f"❌ Cooldown active. Please wait {30 - elapsed_seconds:.1f} more seconds.")
+            return {
+                "info": recognized_info,
+                "timestamp": timestamp,
+                "elapsed_seconds": elapsed_seconds,
+                "confidence": confidence,
+            }
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        row = None
+        try:
+            # Only the cooldown window matters; the lower bound keeps the lookup in recent partitions
+            cursor.execute("""
+                            SELECT timestamp FROM room_logs
+                            WHERE name = %s AND timestamp >= %s
+                            ORDER BY timestamp DESC LIMIT 1
+                        """, (name, now - timedelta(days=1)))
+            row = cursor.fetchone()
+
+            if row:
+                last_timestamp = row[0]
+                elapsed_seconds = (now - last_timestamp).total_seconds()
+
+                if elapsed_seconds >= 30:
+                    cursor.execute("""INSERT INTO room_logs (person_id, name, timestamp, role, purpose, section, room)
+                                    VALUES (%s, %s, %s, %s, %s, %s, %s)""", (person_id, name, timestamp, role, camera_purpose, section, location))
+                    conn.commit()
+                    print(f"📝 Entry log added for {name} on {current_date} with role {role}.")
+                else:
+                    cache.record_event(person_id, location, camera_purpose, last_timestamp)
+                    print(f"❌ Cooldown active. Please wait {30 - elapsed_seconds:.1f} more seconds.")
             else:
-                try:
-                    cursor.execute("SELECT timestamp FROM room_logs WHERE name = %s ORDER BY timestamp DESC LIMIT 1", (name,))
-                    row = cursor.fetchone()
-
-                    if row:
-                        last_timestamp = row[0]
-                        elapsed_seconds = (datetime.now() - last_timestamp).total_seconds()
-
-                        if elapsed_seconds >= 30:
-                            cursor.execute("""INSERT INTO room_logs (person_id, name, timestamp, role, purpose, section, room)
-                                            VALUES (%s, %s, %s, %s, %s, %s, %s)""", (recognized_info['id'], name, timestamp, role, camera_purpose, section, location))
-                            conn.commit()
-                            print(f"📝 Entry log added for {name} on {current_date} with role {role}.")
-                        else:
-                            print(f"❌ Cooldown active. Please wait {30 - elapsed_seconds:.1f} more seconds.")
-                    else:
-                        cursor.execute("""INSERT INTO room_logs (name, timestamp, role, purpose, section, room)
-                                                  VALUES (%s, %s, %s, %s, %s, %s)""",
-                                      (name, timestamp, role, camera_purpose, section, location))
-                        conn.commit()
-                        print(f"📝 First entry log added for {name} on {current_date} with role {role}.")
-
-                except Exception as e:
-                    print(f"Error: {e}")
-
-                finally:
-                    cursor.close()
-                    conn.close()
-
-                return {
-                    "info": recognized_info,
-                    "timestamp": timestamp,
-                    "elapsed_seconds": elapsed_seconds if row else None
-                }
-
-        else:
-            print("❌ No match found or the match is not strict enough")
-            return None
+                cursor.execute("""INSERT INTO room_logs (person_id, name, timestamp, role, purpose, section, room)
+                                          VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                              (person_id, name, timestamp, role, camera_purpose, section, location))
+                conn.commit()
+                print(f"📝 First entry log added for {name} on {current_date} with role {role}.")
 
-    def send_sms_notification_async(contact, name, timestamp, action):
-        thread = threading.Thread(target=send_sms_notification, args=(contact, name, timestamp, action))
-        thread.daemon = True  # Optional: lets thread exit when main program ends
-        thread.start()
+        except Exception as e:
+            cache.release_event(person_id, location, camera_purpose, previous)
+            print(f"Error: {e}")
+
+        finally:
+            cursor.close()
+            conn.close()
 
-# Example of loading faces and recognizing a new face
-face_indexer = FaceIndexer()
\ No newline at end of file
+        return {
+            "info": recognized_info,
+            "timestamp": timestamp,
+            "elapsed_seconds": elapsed_seconds if row else None,
+            "confidence": confidence,
+        }
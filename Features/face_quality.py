@@ -0,0 +1,72 @@
+# face_quality.py
+import cv2
+import numpy as np
+
+# Expected head pose per capture angle, estimated from the 5 landmarks:
+# yaw is the nose offset from the eye midpoint (in eye distances) and
+# pitch is how far down the nose sits between the eyes and the mouth.
+ANGLE_TARGETS = {
+    "front": (0.0, 0.55),
+    "left": (0.25, 0.55),
+    "right": (-0.25, 0.55),
+    "up": (0.0, 0.35),
+    "down": (0.0, 0.75),
+}
+
+MIN_FACE_SIZE = 60          # px (in the frame the face was detected on)
+GOOD_FACE_SIZE = 140
+GOOD_SHARPNESS = 300.0      # variance of the Laplacian
+
+
+def estimate_pose(kps):
+    """Rough (yaw, pitch) ratios from insightface's 5-point landmarks."""
+    left_eye, right_eye, nose, left_mouth, right_mouth = np.asarray(kps, dtype=np.float32)[:5]
+    eye_mid = (left_eye + right_eye) / 2
+    mouth_mid = (left_mouth + right_mouth) / 2
+    eye_distance = max(np.linalg.norm(right_eye - left_eye), 1e-6)
+    face_height = max(mouth_mid[1] - eye_mid[1], 1e-6)
+
+    yaw = (nose[0] - eye_mid[0]) / eye_distance
+    pitch = (nose[1] - eye_mid[1]) / face_height
+    return yaw, pitch
+
+
+def sharpness(image, bbox):
+    x1, y1, x2, y2 = [int(v) for v in bbox]
+    h, w = image.shape[:2]
+    crop = image[max(y1, 0):min(y2, h), max(x1, 0):min(x2, w)]
+    if crop.size == 0:
+        return 0.0
+    gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def score_face(face, image, angle="front"):
+    """
+    Score a detected face between 0 and 1 for enrollment: face size,
+    detection score, sharpness and how well the pose matches `angle`
+    (pass angle=None to ignore pose). Returns 0 for faces too small to be useful.
+    """
+    x1, y1, x2, y2 = face.bbox
+    size = min(x2 - x1, y2 - y1)
+    if size < MIN_FACE_SIZE:
+        return 0.0
+
+    size_score = min(size / GOOD_FACE_SIZE, 1.0)
+    det_score = float(getattr(face, 'det_score', 1.0))
+    sharp_score = min(sharpness(image, face.bbox) / GOOD_SHARPNESS, 1.0)
+
+    pose_score = 1.0
+    if angle is not None and getattr(face, 'kps', None) is not None:
+        yaw, pitch = estimate_pose(face.kps)
+        target_yaw, target_pitch = ANGLE_TARGETS.get(angle, ANGLE_TARGETS["front"])
+        pose_error = abs(yaw - target_yaw) + abs(pitch - target_pitch)
+        pose_score = max(1.0 - pose_error * 2, 0.0)
+
+    return size_score * 0.2 + det_score * 0.2 + sharp_score * 0.3 + pose_score * 0.3
+
+
+def largest_face(faces):
+    if not faces:
+        return None
+    return max(faces, key=lambda f: (f.bbox[2] - f.bbox[0]) * (f.bbox[3] - f.bbox[1]))
@@ -1,21 +1,35 @@
 # face_services.py
-from insightface.app import FaceAnalysis
-import cv2
+import threading
 import numpy as np
 
 class FaceDetectionService:
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __init__(self):
+        # imported here so importing this module does not load insightface/onnxruntime
+        from insightface.app import FaceAnalysis
+
         self.model = FaceAnalysis(name='buffalo_s', providers=['CPUExecutionProvider'])
         self.model.prepare(ctx_id=-1)  # -1 = CPU
 
     @classmethod
     def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = FaceDetectionService()
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = FaceDetectionService()
         return cls._instance
 
+    def warm_up(self):
+        """
+        Run one dummy inference through the detector and the recognizer so
+        ONNX Runtime allocates its buffers before the first real frame.
+        """
+        self.model.get(np.zeros((480, 640, 3), dtype=np.uint8))
+        recognizer = self.model.models.get('recognition')
+        if recognizer is not None:
+            recognizer.get_feat(np.zeros((112, 112, 3), dtype=np.uint8))
+
     def detect_faces(self, image):
         """
         Detects faces and returns a list of Face objects with .bbox and .embedding
@@ -0,0 +1,120 @@
+# identity_cache.py
+"""
+Short-lived identities shared by every camera.
+
+When FAISS recognizes someone, their embedding is remembered for
+IDENTITY_TTL_SECONDS. Other cameras that see a face close enough to one of
+those embeddings reuse the identity without another index search. The
+cache also records the last log event per (person, location, purpose) so
+a repeat sighting is dropped before it reaches the database, and two
+cameras at one location seeing the same person at once produce one log.
+"""
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+IDENTITY_TTL_SECONDS = 60
+# cosine similarity to a recently recognized embedding needed to reuse its identity
+MATCH_SIMILARITY = 0.6
+EMBEDDINGS_PER_PERSON = 8
+EVENT_TTL_SECONDS = 24 * 3600
+
+
+class IdentityCache:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, ttl_seconds=IDENTITY_TTL_SECONDS, match_similarity=MATCH_SIMILARITY):
+        self.ttl_seconds = ttl_seconds
+        self.match_similarity = match_similarity
+        self.lock = threading.Lock()
+        self.identities = {}  # person_id -> {"info", "embeddings", "confidence", "expires_at"}
+        self.events = {}      # (person_id, location, purpose) -> datetime of the last log
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = IdentityCache()
+        return cls._instance
+
+    def _expire(self, now):
+        for person_id in [pid for pid, entry in self.identities.items() if entry["expires_at"] <= now]:
+            del self.identities[person_id]
+
+    def lookup(self, embedding):
+        """
+        (info, similarity) of the freshest cached identity closest to a
+        normalized embedding, or None when nothing is close enough.
+        """
+        now = time.monotonic()
+        with self.lock:
+            self._expire(now)
+            best, best_similarity = None, self.match_similarity
+            for entry in self.identities.values():
+                similarity = float(np.max(entry["embeddings"] @ embedding))
+                if similarity >= best_similarity:
+                    best, best_similarity = entry, similarity
+            if best is None:
+                return None
+            return best["info"], best_similarity * best["confidence"]
+
+    def remember(self, embedding, info, confidence):
+        """Store an identity confirmed by the index; its expiry restarts from now."""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.identities.get(info["id"])
+            if entry is None:
+                entry = self.identities[info["id"]] = {"embeddings": np.empty((0, len(embedding)), dtype=np.float32)}
+            # keep a few recent views (e.g. from different cameras/angles)
+            entry["embeddings"] = np.vstack([entry["embeddings"], embedding[None, :]])[-EMBEDDINGS_PER_PERSON:]
+            entry["info"] = info
+            entry["confidence"] = confidence
+            entry["expires_at"] = now + self.ttl_seconds
+
+    def claim_event(self, person_id, location, purpose, now=None, cooldown_seconds=None):
+        """
+        Reserve the right to write a log for this sighting. Returns
+        (claimed, last_time): claimed is False when the last log for the same
+        person, location and purpose is still within its window (the same day
+        when cooldown_seconds is None, else the cooldown). A claim counts as
+        the latest log until release_event() undoes it.
+        """
+        now = now or datetime.now()
+        key = (person_id, location.lower(), purpose)
+        with self.lock:
+            last = self.events.get(key)
+            if last is not None:
+                if cooldown_seconds is None and last.date() == now.date():
+                    return False, last
+                if cooldown_seconds is not None and (now - last).total_seconds() < cooldown_seconds:
+                    return False, last
+            self.events[key] = now
+            if len(self.events) > 10000:
+                self.events = {k: t for k, t in self.events.items()
+                               if (now - t).total_seconds() < EVENT_TTL_SECONDS}
+            return True, last
+
+    def record_event(self, person_id, location, purpose, when):
+        """Note a log found in the database (e.g. written by another machine)."""
+        with self.lock:
+            self.events[(person_id, location.lower(), purpose)] = when
+
+    def release_event(self, person_id, location, purpose, previous=None):
+        """Undo a claim whose log was not written."""
+        key = (person_id, location.lower(), purpose)
+        with self.lock:
+            if previous is None:
+                self.events.pop(key, None)
+            else:
+                self.events[key] = previous
+
+    def forget(self, person_id=None):
+        """Drop one cached identity (or all); FaceIndexer calls this when a person is edited or removed."""
+        with self.lock:
+            if person_id is None:
+                self.identities.clear()
+            else:
+                self.identities.pop(person_id, None)
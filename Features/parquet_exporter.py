@@ -0,0 +1,181 @@
+# parquet_exporter.py
+"""
+Columnar (Parquet) export of gate_logs / room_logs joined with person_info.
+
+    python -m Features.parquet_exporter gate_logs --from 2025-06-01 --to 2025-11-01
+    python -m Features.parquet_exporter room_logs --since-last
+
+Timestamps are typed (timestamp[us]) and the low-cardinality text columns
+(role, purpose, section, room, status, person section) are dictionary
+encoded. Rows stream from a server-side cursor and are written one row
+group per chunk.
+
+--since-last exports rows after the (timestamp, id) recorded by the previous
+incremental export of that table, and only rows older than SETTLE_SECONDS,
+so a log whose transaction commits after a higher id was exported is not
+skipped. It only picks up new rows: status changes (e.g. a voided log) and
+rows inserted with a timestamp older than the watermark are not synced;
+re-export the affected range with --from/--to.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+from db.database import get_connection
+
+CHUNK_ROWS = 50000
+# --since-last leaves the newest rows for the next run, so in-flight inserts can commit first
+SETTLE_SECONDS = 300
+EXPORT_DIR = os.getenv("PARQUET_EXPORT_DIR", "exports")
+STATE_PATH = os.path.join(EXPORT_DIR, "parquet_export_state.json")
+
+# (column, arrow type name) per table; "dict" = dictionary-encoded string
+COLUMNS = {
+    "gate_logs": [
+        ("id", "int64"), ("person_id", "int32"), ("name", "string"), ("timestamp", "timestamp"),
+        ("role", "dict"), ("purpose", "dict"), ("section", "dict"), ("status", "dict"),
+    ],
+    "room_logs": [
+        ("id", "int64"), ("person_id", "int32"), ("name", "string"), ("timestamp", "timestamp"),
+        ("role", "dict"), ("purpose", "dict"), ("section", "dict"), ("room", "dict"), ("status", "dict"),
+    ],
+}
+# joined from person_info
+PERSON_COLUMNS = [("contact", "string"), ("section_or_job", "dict")]
+
+
+def _arrow_type(pa, kind):
+    return {
+        "int64": pa.int64(),
+        "int32": pa.int32(),
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+        "dict": pa.dictionary(pa.int32(), pa.string()),
+    }[kind]
+
+
+def read_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def export_logs(table, out_path=None, start=None, end=None, since_last=False, chunk_rows=CHUNK_ROWS, progress=None):
+    """
+    Export `table` rows with start <= timestamp < end (either bound optional)
+    to Parquet. With since_last, only rows after the last incremental
+    export's (timestamp, id) and older than SETTLE_SECONDS are written, and
+    the watermark is advanced afterwards.
+    `progress(rows_written)` is called after each chunk. Returns (path, rows).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if table not in COLUMNS:
+        raise ValueError(f"Unknown table: {table}")
+
+    columns = COLUMNS[table] + PERSON_COLUMNS
+    schema = pa.schema([(name, _arrow_type(pa, kind)) for name, kind in columns])
+
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("l.timestamp >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append("l.timestamp < %s")
+        params.append(end)
+    state = read_state()
+    if since_last:
+        watermark = state.get(table)
+        if isinstance(watermark, dict):
+            conditions.append("(l.timestamp, l.id) > (%s, %s)")
+            params += [datetime.fromisoformat(watermark["timestamp"]), watermark["id"]]
+        elif watermark is not None:
+            conditions.append("l.id > %s")  # id-only watermark from older versions
+            params.append(watermark)
+        conditions.append("l.timestamp < %s")
+        params.append(datetime.now() - timedelta(seconds=SETTLE_SECONDS))
+
+    select = [f"l.{name}" for name, _ in COLUMNS[table]] + [f"p.{name}" for name, _ in PERSON_COLUMNS]
+    query = f"SELECT {', '.join(select)} FROM {table} l LEFT JOIN person_info p ON p.id = l.person_id"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY l.timestamp, l.id" if since_last else " ORDER BY l.id"
+
+    if out_path is None:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        out_path = os.path.join(EXPORT_DIR, f"{table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet")
+    tmp_path = out_path + ".part"
+
+    written, last_row = 0, None
+    conn = get_connection()
+    try:
+        with conn.cursor(name=f"{table}_parquet_export") as cursor, \
+                pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+            cursor.itersize = chunk_rows
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                arrays = []
+                for i, (name, kind) in enumerate(columns):
+                    values = [row[i] for row in rows]
+                    if kind == "dict":
+                        arrays.append(pa.array(values, pa.string()).dictionary_encode())
+                    else:
+                        arrays.append(pa.array(values, _arrow_type(pa, kind)))
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                written += len(rows)
+                last_row = rows[-1]
+                if progress:
+                    progress(written)
+        os.replace(tmp_path, out_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        conn.close()
+
+    if since_last and last_row is not None:
+        state[table] = {"timestamp": last_row[3].isoformat(), "id": last_row[0]}
+        write_state(state)
+
+    return out_path, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export attendance logs to Parquet.")
+    parser.add_argument("table", choices=sorted(COLUMNS))
+    parser.add_argument("--from", dest="start", help="first day to export (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="day after the last day to export (YYYY-MM-DD)")
+    parser.add_argument("--since-last", action="store_true", help="only rows logged since the last --since-last export (new rows only, not status changes)")
+    parser.add_argument("--out", help=f"output file (default: {EXPORT_DIR}/<table>_<time>.parquet)")
+    args = parser.parse_args()
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        sys.exit("pyarrow is required for Parquet export: pip install pyarrow")
+
+    start = datetime.strptime(args.start, "%Y-%m-%d") if args.start else None
+    end = datetime.strptime(args.end, "%Y-%m-%d") if args.end else None
+    path, written = export_logs(args.table, args.out, start, end, args.since_last,
+                                progress=lambda n: print(f"… {n:,} rows"))
+    print(f"✅ Exported {written:,} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,248 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import os
+import re
 from db.database import get_connection
-import matplotlib.pyplot as plt
+from Features import analytics_queries
+from Features.chart_cache import png_cache
+from Features.person_search import search_people
+from matplotlib.figure import Figure
 from io import BytesIO
 import calendar
 
-def create_pdf_report(person_id, name, role, section_or_job, output_path=None, start_date=None, end_date=None, generated_by=None):
-    # Ensure output path exists if not provided
-    if output_path is None:
-        output_dir = "reports"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        filename = f"report_{person_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        output_path = os.path.join(output_dir, filename)
+TEXT_ROW_LIMIT = 20  # above this many logs the report also gets a per-day chart
+ROWS_PER_PAGE = 35
+PAGE_TOP = A4[1] - 60
+PAGE_BOTTOM = 120
+ROW_HEIGHT = 16
+STREAM_ROWS = 500
+
+LOG_COLUMNS = {
+    "gate": ("gate_logs", ["timestamp", "role", "purpose"], ["Timestamp", "Role", "Purpose"]),
+    "room": ("room_logs", ["timestamp", "role", "purpose", "room"], ["Timestamp", "Role", "Purpose", "Room"]),
+}
+
+
+def report_range(start_date=None, end_date=None):
+    """Inclusive report dates -> half-open [start, end) bounds for SQL (either may be None)."""
+    start = start_date if start_date is None or isinstance(start_date, date) else datetime.strptime(str(start_date), "%Y-%m-%d").date()
+    end = end_date if end_date is None or isinstance(end_date, date) else datetime.strptime(str(end_date), "%Y-%m-%d").date()
+    return start, (end + timedelta(days=1) if end else None)
+
+
+def range_clause(start, end, params):
+    clause = ""
+    if start is not None:
+        clause += " AND timestamp >= %s"
+        params.append(start)
+    if end is not None:
+        clause += " AND timestamp < %s"
+        params.append(end)
+    return clause
+
+
+def fetch_report_data(person_id, start_date=None, end_date=None):
+    """Per-day counts (aggregated in SQL from the rollups) for one person's report period."""
+    start, end = report_range(start_date, end_date)
+    return {
+        "gate_graph": analytics_queries.person_daily_totals(person_id, 'gate', start, end),
+        "room_graph": analytics_queries.person_daily_totals(person_id, 'room', start, end),
+    }
+
+
+def stream_log_rows(conn, source, person_id, start_date=None, end_date=None):
+    """Yield one person's log rows for the period from a server-side cursor, STREAM_ROWS at a time."""
+    table, columns, _ = LOG_COLUMNS[source]
+    start, end = report_range(start_date, end_date)
+    params = [person_id]
+    query = f"SELECT {', '.join(columns)} FROM {table} WHERE person_id = %s"
+    query += range_clause(start, end, params)
+    query += " ORDER BY timestamp"
+
+    with conn.cursor(name=f"report_{source}_rows") as cursor:
+        cursor.itersize = STREAM_ROWS
+        cursor.execute(query, params)
+        for row in cursor:
+            yield row
+
+
+def fetch_batch_report_data(person_ids, start_date=None, end_date=None):
+    """
+    Report data for many people at once: one grouped rollup query for the
+    graphs and one query per log table for the rows, all bounded by the
+    report period, instead of several queries per person. Returns {person_id: data}.
+    """
+    data = {pid: {"gate_graph": [], "room_graph": [], "gate_rows": [], "room_rows": []} for pid in person_ids}
+    if not person_ids:
+        return data
+    start, end = report_range(start_date, end_date)
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            params = [list(person_ids)]
+            day_clause = ""
+            if start is not None:
+                day_clause += " AND day >= %s"
+                params.append(start)
+            if end is not None:
+                day_clause += " AND day < %s"
+                params.append(end)
+            cursor.execute(f"""
+                SELECT person_id, source, day, SUM(count)::INT
+                FROM log_rollup_daily
+                WHERE person_id = ANY(%s){day_clause}
+                GROUP BY person_id, source, day
+                ORDER BY person_id, source, day
+            """, params)
+            for pid, source, day, count in cursor.fetchall():
+                data[pid][f"{source}_graph"].append((day, count))
+
+        for source, (table, columns, _) in LOG_COLUMNS.items():
+            params = [list(person_ids)]
+            query = f"SELECT person_id, {', '.join(columns)} FROM {table} WHERE person_id = ANY(%s)"
+            query += range_clause(start, end, params)
+            query += " ORDER BY person_id, timestamp"
+            with conn.cursor(name=f"batch_{source}_rows") as cursor:
+                cursor.itersize = STREAM_ROWS
+                cursor.execute(query, params)
+                for row in cursor:
+                    data[row[0]][f"{source}_rows"].append(row[1:])
+    finally:
+        conn.close()
+
+    return data
+
+
+def format_cell(value):
+    if isinstance(value, datetime):
+        # 12-hour format with AM/PM
+        return value.strftime("%Y-%m-%d %I:%M:%S %p")
+    return "" if value is None else str(value)
+
+
+class PageWriter:
+    """Tracks the y position on a reportlab canvas and starts numbered pages as needed."""
+
+    def __init__(self, c, title):
+        self.c = c
+        self.title = title
+        self.page = 1
+        self.y = PAGE_TOP
+
+    def new_page(self):
+        self.footer()
+        self.c.showPage()
+        self.page += 1
+        self.y = PAGE_TOP
+        self.c.setFont("Helvetica-Oblique", 9)
+        self.c.drawString(100, A4[1] - 40, self.title)
+
+    def footer(self):
+        self.c.setFont("Helvetica-Oblique", 9)
+        self.c.drawRightString(A4[0] - 60, 40, f"Page {self.page}")
+
+    def ensure(self, height):
+        if self.y - height < PAGE_BOTTOM:
+            self.new_page()
+
+
+def draw_log_table(pw, rows, title, headers):
+    """Draw rows as a table, ROWS_PER_PAGE at most per page, repeating the header on each page."""
+    col_width = 400 / len(headers)
+
+    def draw_header(suffix=""):
+        pw.ensure(ROW_HEIGHT * 3)
+        pw.c.setFont("Helvetica-Bold", 14)
+        pw.c.drawString(100, pw.y, title + suffix)
+        pw.y -= ROW_HEIGHT + 4
+        pw.c.setFont("Helvetica-Bold", 10)
+        for i, header in enumerate(headers):
+            pw.c.drawString(100 + i * col_width, pw.y, header)
+        pw.y -= 4
+        pw.c.line(100, pw.y, 500, pw.y)
+        pw.y -= ROW_HEIGHT - 4
+        pw.c.setFont("Helvetica", 10)
+
+    draw_header()
+    on_page = 0
+    count = 0
+    for row in rows:
+        if on_page >= ROWS_PER_PAGE or pw.y - ROW_HEIGHT < PAGE_BOTTOM:
+            pw.new_page()
+            draw_header(" (cont.)")
+            on_page = 0
+        for i, value in enumerate(row):
+            pw.c.drawString(100 + i * col_width, pw.y, format_cell(value))
+        pw.y -= ROW_HEIGHT
+        on_page += 1
+        count += 1
+
+    if count == 0:
+        pw.c.drawString(100, pw.y, "No logs in this period.")
+        pw.y -= ROW_HEIGHT
+    pw.y -= ROW_HEIGHT
+    return count
+
+
+# Function to create graph image in memory
+def draw_line_chart(data, title, start_date=None, end_date=None):
+    if not data:
+        return None
+
+    # Same data and period -> same picture; skip matplotlib entirely
+    key = (title, start_date, end_date, tuple(data))
+    cached = png_cache.get(key)
+    if cached is not None:
+        return BytesIO(cached)
+
+    # Convert date strings to datetime.date if necessary
+    dates, counts = zip(*data)
+    dates = [d if isinstance(d, date) else datetime.strptime(str(d), "%Y-%m-%d").date() for d in dates]
+
+    # Figure API rather than pyplot: no global state, safe in worker processes
+    fig = Figure(figsize=(6, 3))
+    ax = fig.add_subplot(111)
+    ax.plot(dates, counts, marker='o', linestyle='-', color="#002366")
+    ax.set_title(title)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Count")
+    ax.grid(True)
+    ax.tick_params(axis='x', labelrotation=45)
+
+    # Show the whole report period, or the month of start_date without an end
+    if start_date:
+        start_date, _ = report_range(start_date)
+        if end_date:
+            _, end_exclusive = report_range(None, end_date)
+            ax.set_xlim(start_date, end_exclusive - timedelta(days=1))
+        else:
+            last_day = calendar.monthrange(start_date.year, start_date.month)[1]
+            ax.set_xlim(start_date.replace(day=1), start_date.replace(day=last_day))
+
+    fig.tight_layout()
+    buf = BytesIO()
+    fig.savefig(buf, format='PNG')
+    png_cache.put(key, buf.getvalue())
+    buf.seek(0)
+    return buf
+
+
+def render_pdf_report(person, data, output_path, start_date=None, end_date=None, generated_by=None):
+    """
+    Draw one report. `data` holds the per-day graph rows and the log rows
+    (gate_rows / room_rows may be lists or generators streaming from the
+    database); this function does no querying of its own.
+    """
+    person_id, name = person["id"], person["name"]
 
     # Create PDF canvas
     c = canvas.Canvas(output_path, pagesize=A4)
     width, height = A4
+    pw = PageWriter(c, f"{name} report")
 
     # Title and basic info
     c.setFont("Helvetica-Bold", 18)
@@ -28,133 +251,116 @@ def create_pdf_report(person_id, name, role, section_or_job, output_path=None, s
     y = height - 130
     c.drawString(100, y, f"ID: {person_id}")
     c.drawString(100, y - 20, f"Name: {name}")
-    c.drawString(100, y - 40, f"Role: {role}")
-    c.drawString(100, y - 60, f"Section / Job: {section_or_job}")
+    c.drawString(100, y - 40, f"Role: {person['role']}")
+    c.drawString(100, y - 60, f"Section / Job: {person['section_or_job']}")
+    y -= 90
 
     if start_date and end_date:
         start_str = start_date.strftime("%Y-%m-%d") if isinstance(start_date, date) else str(start_date)
         end_str = end_date.strftime("%Y-%m-%d") if isinstance(end_date, date) else str(end_date)
         c.setFont("Helvetica-Bold", 18)
-        c.drawString(100, y - 100, f"Report Period: {start_str} to {end_str}")
+        c.drawString(100, y - 10, f"Report Period: {start_str} to {end_str}")
         c.setFont("Helvetica", 12)
-        y -= 30  # Adjust y position if needed
+        y -= 40
 
-    # Connect to DB and fetch logs
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        # Fetch aggregated data for graphs (per day)
-        cursor.execute("""
-            SELECT timestamp::date, COUNT(*)
-            FROM gate_logs
-            WHERE person_id = %s
-            GROUP BY timestamp::date
-            ORDER BY timestamp::date
-        """, (person_id,))
-        gate_rows_graph = cursor.fetchall()
-
-        cursor.execute("""
-            SELECT timestamp::date, COUNT(*)
-            FROM room_logs
-            WHERE person_id = %s
-            GROUP BY timestamp::date
-            ORDER BY timestamp::date
-        """, (person_id,))
-        room_rows_graph = cursor.fetchall()
-
-        # Fetch full timestamp + purpose for text output
-        cursor.execute("""
-            SELECT timestamp, role, purpose
-            FROM gate_logs
-            WHERE person_id = %s
-            ORDER BY timestamp
-        """, (person_id,))
-        gate_rows_text = cursor.fetchall()
-
-        cursor.execute("""
-            SELECT timestamp, role, purpose
-            FROM room_logs
-            WHERE person_id = %s
-            ORDER BY timestamp
-        """, (person_id,))
-        room_rows_text = cursor.fetchall()
+    gate_total = sum(count for _, count in data["gate_graph"])
+    room_total = sum(count for _, count in data["room_graph"])
+    c.drawString(100, y, f"Gate logs: {gate_total}    Room logs: {room_total}")
+    pw.y = y - 30
 
-    finally:
-        cursor.close()
-        conn.close()
+    # Per-day charts once there are too many logs to read at a glance
+    for graph, total, title in ((data["gate_graph"], gate_total, "Gate Logs Count per Day"),
+                                (data["room_graph"], room_total, "Room Logs Count per Day")):
+        if total > TEXT_ROW_LIMIT:
+            img = draw_line_chart(graph, title, start_date, end_date)
+            if img:
+                pw.ensure(170)
+                c.drawImage(ImageReader(img), 100, pw.y - 150, width=400, height=150)
+                pw.y -= 170
 
-    # Helper: Draw logs as text
-    def draw_logs_as_text(canvas, data, title, start_y):
-        canvas.setFont("Helvetica-Bold", 14)
-        canvas.drawString(100, start_y, title)
-        canvas.setFont("Helvetica", 12)
-        y_pos = start_y - 20
-        for timestamp, action, purpose in data:
-            # Format timestamp to 12-hour format with AM/PM
-            if isinstance(timestamp, datetime):
-                ts_str = timestamp.strftime("%Y-%m-%d %I:%M:%S %p")
-            else:
-                ts_str = str(timestamp)  # fallback
-
-            canvas.drawString(100, y_pos, f"{ts_str} | {action} | {purpose}")
-            y_pos -= 20
-        return y_pos
-
-    # Function to create graph image in memory
-    def draw_line_chart(data, title, start_date=None):
-        if not data:
-            return None
-
-        # Convert date strings to datetime.date if necessary
-        dates, counts = zip(*data)
-        dates = [d if isinstance(d, date) else datetime.strptime(str(d), "%Y-%m-%d").date() for d in dates]
-
-        plt.figure(figsize=(6, 3))
-        plt.plot(dates, counts, marker='o', linestyle='-', color="#002366")
-        plt.title(title)
-        plt.xlabel("Date")
-        plt.ylabel("Count")
-        plt.grid(True)
-        plt.xticks(rotation=45)
-
-        # Set x-axis to full month of start_date
-        if start_date:
-            start_date = start_date if isinstance(start_date, date) else datetime.strptime(str(start_date), "%Y-%m-%d").date()
-            start_of_month = start_date.replace(day=1)
-            last_day = calendar.monthrange(start_date.year, start_date.month)[1]
-            end_of_month = start_date.replace(day=last_day)
-            plt.xlim(start_of_month, end_of_month)
-
-        plt.tight_layout()
-        buf = BytesIO()
-        plt.savefig(buf, format='PNG')
-        plt.close()
-        buf.seek(0)
-        return buf
-
-    # Gate logs: text if ≤20 rows, otherwise graph
-    if len(gate_rows_text) <= 20:
-        y = draw_logs_as_text(c, gate_rows_text, "Gate Logs", y - 100)
-    else:
-        gate_img = draw_line_chart(gate_rows_graph, "Gate Logs Count per Day")
-        if gate_img:
-            c.drawImage(ImageReader(gate_img), 100, y - 300, width=400, height=150)
-            y -= 200
-
-    # Room logs
-    if len(room_rows_text) <= 20:
-        y = draw_logs_as_text(c, room_rows_text, "Room Logs", y - 40)
-    else:
-        room_img = draw_line_chart(room_rows_graph, "Room Logs Count per Day")
-        if room_img:
-            c.drawImage(ImageReader(room_img), 100, y - 300, width=400, height=150)
+    draw_log_table(pw, data["gate_rows"], "Gate Logs", LOG_COLUMNS["gate"][2])
+    draw_log_table(pw, data["room_rows"], "Room Logs", LOG_COLUMNS["room"][2])
 
     # Footer
     c.setFont("Helvetica-Oblique", 10)
     c.drawString(100, 80, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     c.drawString(100, 100, f"Generated by: {generated_by}")
+    pw.footer()
 
     c.showPage()
     c.save()
 
-    return output_path
\ No newline at end of file
+    return output_path
+
+
+def create_pdf_report(person_id, name, role, section_or_job, output_path=None, start_date=None, end_date=None, generated_by=None):
+    # Ensure output path exists if not provided
+    if output_path is None:
+        output_dir = "reports"
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        filename = f"report_{person_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        output_path = os.path.join(output_dir, filename)
+
+    person = {"id": person_id, "name": name, "role": role, "section_or_job": section_or_job}
+    data = fetch_report_data(person_id, start_date, end_date)
+
+    # Log rows stream straight from the database into the pages
+    conn = get_connection()
+    try:
+        data["gate_rows"] = stream_log_rows(conn, "gate", person_id, start_date, end_date)
+        data["room_rows"] = stream_log_rows(conn, "room", person_id, start_date, end_date)
+        return render_pdf_report(person, data, output_path, start_date, end_date, generated_by)
+    finally:
+        conn.close()
+
+
+def batch_people(role=None, section=None):
+    """person_info rows (as dicts) for a role and/or a section/job containing `section`."""
+    # server-side trigram search (migration 7 indexes), then grouped by section for the output folder
+    rows = search_people(section=section or "", role=role if role and role != "All" else None)
+    rows.sort(key=lambda row: (row[3] or "", row[1]))
+    return [dict(zip(("id", "name", "role", "section_or_job"), row[:4])) for row in rows]
+
+
+def report_file_name(person):
+    safe_name = re.sub(r"[^A-Za-z0-9]+", "_", person["name"]).strip("_")
+    return f"report_{person['id']}_{safe_name}.pdf"
+
+
+def create_batch_reports(people, output_dir, start_date=None, end_date=None, generated_by=None,
+                         workers=None, progress=None, should_stop=None):
+    """
+    Build one PDF per person into output_dir. Data is fetched up front with
+    grouped queries, then rendering is spread over a process pool.
+    `progress(done, total, name, error)` is called as each report finishes;
+    `should_stop()` returning True cancels the reports not yet started.
+    Returns (written_paths, failures).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    data = fetch_batch_report_data([person["id"] for person in people], start_date, end_date)
+
+    written, failures = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_pdf_report, person, data[person["id"]],
+                        os.path.join(output_dir, report_file_name(person)),
+                        start_date, end_date, generated_by): person
+            for person in people
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            person = futures[future]
+            error = None
+            try:
+                written.append(future.result())
+            except Exception as e:
+                error = str(e)
+                failures.append((person["name"], error))
+            if progress:
+                progress(done, len(people), person["name"], error)
+            if should_stop and should_stop():
+                for pending in futures:
+                    pending.cancel()
+                break
+
+    return written, failures
@@ -0,0 +1,140 @@
+# person_directory.py
+"""
+Process-wide, in-memory copy of person_info.
+
+Loaded once on first use and reused by the user management and report
+pages and by FaceIndexer. invalidate() (called after enrollments, and on
+person_events notifications from other machines) marks it stale; the next
+read reloads it and `changed` tells visible pages to re-render.
+"""
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+from db.database import connect_from_env
+from Features.person_search import TrigramIndex
+
+COLUMNS = ["id", "name", "role", "section_or_job", "contact", "npy_path"]
+SEARCH_FIELDS = {"name": 1, "section_or_job": 3}
+
+
+class PersonDirectory(QObject):
+    changed = Signal()
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.stale = True
+        self.generation = 0  # bumped by invalidate(), so a load that raced one stays stale
+        self.version = 0
+        self._rows = []
+        self._by_id = {}
+        self._by_role = {}
+        self._by_section = {}
+        self._search_index = TrigramIndex(SEARCH_FIELDS)
+        self._watching = False
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = PersonDirectory()
+        return cls._instance
+
+    def watch(self, event_bus):
+        """Invalidate on person_events, and after the listener reconnects (it may have missed some)."""
+        if self._watching:
+            return
+        self._watching = True
+        # lambdas run in the bus's (GUI) thread whichever thread created the directory
+        event_bus.person_changed.connect(lambda event: self.invalidate())
+        event_bus.connected.connect(lambda: self.invalidate())
+
+    def invalidate(self):
+        with self.lock:
+            self.stale = True
+            self.generation += 1
+        self.changed.emit()
+
+    def _ensure_loaded(self):
+        """
+        Reload if stale. The query and index build run without self.lock
+        (often on a background thread), which is only taken to swap the
+        new data in, so readers never wait on the database.
+        """
+        with self.lock:
+            if not self.stale:
+                return
+            generation = self.generation
+
+        # never get_connection(): its console credential prompt would hang a background thread
+        conn = connect_from_env()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM person_info ORDER BY name, id")
+                rows = cursor.fetchall()
+        finally:
+            conn.close()
+
+        by_role, by_section = {}, {}
+        for row in rows:
+            by_role.setdefault(row[2], []).append(row)
+            by_section.setdefault((row[3] or "").lower(), []).append(row)
+        by_id = {row[0]: row for row in rows}
+        search_index = TrigramIndex(SEARCH_FIELDS, rows)
+
+        with self.lock:
+            self._rows = rows
+            self._by_id = by_id
+            self._by_role = by_role
+            self._by_section = by_section
+            self._search_index = search_index
+            self.stale = self.generation != generation
+            self.version += 1
+        print(f"👥 Person directory loaded: {len(rows)} people")
+
+    def rows(self):
+        """Every person as a tuple in COLUMNS order, sorted by name."""
+        self._ensure_loaded()
+        with self.lock:
+            return list(self._rows)
+
+    def get(self, person_id):
+        self._ensure_loaded()
+        with self.lock:
+            return self._by_id.get(person_id)
+
+    def by_role(self, role):
+        self._ensure_loaded()
+        with self.lock:
+            return list(self._by_role.get(role, []))
+
+    def by_section(self, section):
+        """Exact section/job match, ignoring case."""
+        self._ensure_loaded()
+        with self.lock:
+            return list(self._by_section.get(section.lower(), []))
+
+    def search(self, name="", section="", role="All"):
+        """Substring/typo search on name and section/job (ranked), optionally limited to a role."""
+        self._ensure_loaded()
+        with self.lock:
+            search_index = self._search_index
+        rows = search_index.search({"name": name, "section_or_job": section})
+        if role and role != "All":
+            rows = [row for row in rows if row[2] == role]
+        return rows
+
+
+def face_info(row):
+    """The info dict FaceIndexer keeps per embedding."""
+    return {
+        "id": row[0],
+        "name": row[1],
+        "contact": row[4],
+        "role": row[2],
+        "section": row[3]
+    }
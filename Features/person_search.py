@@ -0,0 +1,158 @@
+# person_search.py
+"""
+Substring search over people (and log columns) that can use the pg_trgm
+indexes from migration 7.
+
+- like_pattern(): escaped '%text%' pattern for ILIKE filters.
+- search_people(): server-side search of person_info, best matches first.
+- TrigramIndex: the same search in memory over already-loaded rows, for
+  filtering tables while the user types without a database round trip.
+"""
+import re
+from collections import defaultdict
+
+from db.database import get_connection
+
+PERSON_COLUMNS = ["id", "name", "role", "section_or_job", "contact"]
+
+# below this pg_trgm similarity a non-substring row is not a match
+SIMILARITY_THRESHOLD = 0.3
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def like_pattern(text):
+    """'%text%' with LIKE wildcards in the text escaped."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_people(name="", section="", role=None, limit=None, conn=None):
+    """
+    person_info rows (PERSON_COLUMNS) whose name/section contains the given
+    text, ranked by pg_trgm similarity, then by name.
+    """
+    where, params, rank = ["TRUE"], [], []
+    if name:
+        where.append("name ILIKE %s")
+        params.append(like_pattern(name))
+        rank.append("similarity(name, %s)")
+    if section:
+        where.append("section_or_job ILIKE %s")
+        params.append(like_pattern(section))
+        rank.append("similarity(section_or_job, %s)")
+    if role:
+        where.append("role = %s")
+        params.append(role)
+
+    order = (" + ".join(rank) + " DESC, ") if rank else ""
+    query = f"""
+        SELECT {', '.join(PERSON_COLUMNS)} FROM person_info
+        WHERE {' AND '.join(where)}
+        ORDER BY {order}name, id
+    """
+    params += [text for text in (name, section) if text]
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def trigrams(text):
+    """pg_trgm-style trigrams: lower-cased words padded with two leading spaces and one trailing."""
+    grams = set()
+    for word in _WORD.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+class TrigramIndex:
+    """
+    In-memory index over rows (tuples). `fields` maps a column name to its
+    position in the row, e.g. {"name": 1, "section_or_job": 3}. search()
+    takes {column: text} and returns the rows that match every given column:
+    a substring match, or a close typo (similarity >= SIMILARITY_THRESHOLD).
+    Rows are ranked exact > prefix > word prefix > substring > fuzzy.
+    """
+
+    def __init__(self, fields, rows=()):
+        self.fields = dict(fields)
+        self.rebuild(rows)
+
+    def rebuild(self, rows):
+        self.rows = list(rows)
+        self.text = {column: [] for column in self.fields}
+        self.grams = {column: defaultdict(set) for column in self.fields}
+
+        for position, row in enumerate(self.rows):
+            for column, i in self.fields.items():
+                value = str(row[i] or "").lower()
+                self.text[column].append(value)
+                for gram in trigrams(value):
+                    self.grams[column][gram].add(position)
+
+    def _candidates(self, column, query):
+        if not any(len(word) >= 3 for word in _WORD.findall(query)):
+            # no whole trigram to look up (short or punctuation-only query): plain
+            # substring scan, so nothing the old ILIKE '%x%' filter found is hidden
+            return {position for position, value in enumerate(self.text[column]) if query in value}
+        found = set()
+        for gram in trigrams(query):
+            found |= self.grams[column].get(gram, set())
+        return found
+
+    def _score(self, column, position, query):
+        value = self.text[column][position]
+        if value == query:
+            return 5.0
+        if value.startswith(query):
+            return 4.0
+        if query in value:
+            return 3.0 if any(word.startswith(query) for word in _WORD.findall(value)) else 2.0
+        # typo tolerance, against the closest word (like pg_trgm's word_similarity)
+        score = max((similarity(word, query) for word in _WORD.findall(value)), default=0.0)
+        return score if score >= SIMILARITY_THRESHOLD else None
+
+    def search(self, filters, limit=None):
+        """filters: {column: text}; empty texts are ignored."""
+        filters = {column: text.strip().lower() for column, text in filters.items() if text and text.strip()}
+        if not filters:
+            return self.rows[:limit] if limit else list(self.rows)
+
+        positions = None
+        for column, query in filters.items():
+            found = self._candidates(column, query)
+            positions = found if positions is None else positions & found
+
+        ranked = []
+        for position in positions:
+            total = 0.0
+            for column, query in filters.items():
+                score = self._score(column, position, query)
+                if score is None:
+                    break
+                total += score
+            else:
+                ranked.append((-total, position))
+
+        ranked.sort()
+        rows = [self.rows[position] for _, position in ranked]
+        return rows[:limit] if limit else rows
@@ -1,34 +1,97 @@
 import os
+import threading
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
 
+from Features.sms_outbox import SmsOutbox, OutboxDrainer
+
 load_dotenv()
 
-def send_sms_notification(contact, name, timestamp, action):
-    base_url = os.getenv("BASE_URL")
-    api_key = os.getenv("API_KEY")
-    device_id = os.getenv("DEVICE_ID")
+_outbox = None
+_drainer = None
+_outbox_lock = threading.Lock()
 
 
+def build_message(name, timestamp, action):
     dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
     formatted_datetime = dt.strftime("%B %d, %Y at %I:%M %p")
 
-
-    message = (
+    return (
         f"Good day! This is Saviour School Inc. We would like to inform you "
         f"{name} has {'successfully entered' if action == 'Entry' else 'exited'} the school gate on "
         f"{formatted_datetime}. Thank you!"
     )
 
-    # Send the SMS
+
+def build_coalesced_message(entries):
+    """One message listing every child for a guardian; entries are (name, timestamp, action)."""
+    if len(entries) == 1:
+        return build_message(*entries[0])
+
+    lines = []
+    for name, timestamp, action in entries:
+        dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+        lines.append(f"- {name} {'entered' if action == 'Entry' else 'exited'} at {dt.strftime('%I:%M %p')}")
+
+    first_dt = datetime.strptime(entries[0][1], "%Y-%m-%d %H:%M:%S")
+    return (
+        f"Good day! This is Saviour School Inc. We would like to inform you of the following "
+        f"school gate activity on {first_dt.strftime('%B %d, %Y')}:\n"
+        + "\n".join(lines)
+        + "\nThank you!"
+    )
+
+
+def format_recipient(contact):
+    return f'+63{contact.lstrip("0")}'
+
+
+def send_sms(recipients, message):
+    """Send one message to a list of recipients in a single gateway request."""
+    base_url = os.getenv("BASE_URL")
+    api_key = os.getenv("API_KEY")
+    device_id = os.getenv("DEVICE_ID")
+
     response = requests.post(
         f'{base_url}/api/v1/gateway/devices/{device_id}/send-sms',
         json={
-            'recipients': [f'+63{contact.lstrip("0")}'],
+            'recipients': recipients,
             'message': message
         },
-        headers={'x-api-key': api_key}
+        headers={'x-api-key': api_key},
+        timeout=15
     )
+    response.raise_for_status()
+
+    print(response.json())
+
+
+def render_outbox_rows(rows):
+    """Render the coalesced rows of one contact into (message, recipient)."""
+    entries = [(name, timestamp, action) for _id, _contact, name, timestamp, action, _attempts in rows]
+    return build_coalesced_message(entries), format_recipient(rows[0][1])
+
+
+def get_outbox():
+    """Return the shared outbox, starting its background drainer on first use."""
+    global _outbox, _drainer
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = SmsOutbox()
+            _drainer = OutboxDrainer(_outbox, render_outbox_rows, send_sms)
+            _drainer.start()
+    return _outbox
+
+
+def send_sms_notification(contact, name, timestamp, action):
+    """
+    Queue a gate notification. Notifications for the same contact within the
+    coalescing window (SMS_COALESCE_SECONDS) are sent as one message.
+    """
+    if not contact or contact == 'unknown':
+        print(f"ℹ️ No contact number for {name}, skipping SMS.")
+        return
 
-    print(response.json())
\ No newline at end of file
+    get_outbox().enqueue(contact, name, timestamp, action)
+    _drainer.wake()
@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OUTBOX_PATH = os.getenv("SMS_OUTBOX_PATH", "sms_outbox.db")
+COALESCE_WINDOW_SECONDS = float(os.getenv("SMS_COALESCE_SECONDS", "60"))
+MAX_RECIPIENTS_PER_REQUEST = 50
+MAX_BACKOFF_SECONDS = 300
+MAX_ATTEMPTS = 10
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sms_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    contact TEXT NOT NULL,
+    name TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    action TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sms_outbox_pending ON sms_outbox (status, next_attempt_at, id);
+"""
+
+
+class SmsOutbox:
+    """
+    Durable queue of parent notifications kept in a local SQLite (WAL) file,
+    so messages survive app restarts and gateway outages.
+    """
+
+    def __init__(self, path=OUTBOX_PATH, coalesce_window=COALESCE_WINDOW_SECONDS):
+        self.path = path
+        self.coalesce_window = coalesce_window
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(OUTBOX_SCHEMA)
+            # Rows left in 'sending' were interrupted mid-request; send them again
+            conn.execute("UPDATE sms_outbox SET status = 'pending' WHERE status = 'sending'")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def enqueue(self, contact, name, timestamp, action):
+        """
+        Queue a notification. It is held for the coalescing window so other
+        notifications for the same contact (siblings) can join it; a row that
+        joins an open window inherits its due time instead of extending it.
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            open_window = conn.execute(
+                """SELECT next_attempt_at FROM sms_outbox
+                   WHERE contact = ? AND status = 'pending' AND attempts = 0 AND next_attempt_at > ?
+                   ORDER BY id DESC LIMIT 1""",
+                (contact, now)
+            ).fetchone()
+            due_at = open_window[0] if open_window else now + self.coalesce_window
+            conn.execute(
+                """INSERT INTO sms_outbox (contact, name, timestamp, action, next_attempt_at, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (contact, name, timestamp, action, due_at, now)
+            )
+
+    def next_due_in(self):
+        """Seconds until the earliest pending row is due (None when the queue is empty)."""
+        with self._connect() as conn:
+            (due_at,) = conn.execute("SELECT MIN(next_attempt_at) FROM sms_outbox WHERE status = 'pending'").fetchone()
+        return None if due_at is None else max(due_at - time.time(), 0)
+
+    def claim_pending(self, limit=500):
+        """
+        Mark due rows as 'sending' and return them ordered by due time.
+        Contacts with a row waiting out a retry backoff are skipped, so a
+        parent's later messages never overtake one the gateway rejected,
+        while everyone else's keep flowing.
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                """SELECT id, contact, name, timestamp, action, attempts FROM sms_outbox
+                   WHERE status = 'pending' AND next_attempt_at <= ?
+                     AND contact NOT IN (
+                         SELECT contact FROM sms_outbox
+                         WHERE status = 'pending' AND attempts > 0 AND next_attempt_at > ?)
+                   ORDER BY next_attempt_at, id LIMIT ?""",
+                (now, now, limit)
+            ).fetchall()
+            if rows:
+                conn.executemany("UPDATE sms_outbox SET status = 'sending' WHERE id = ?", [(r[0],) for r in rows])
+        return rows
+
+    def mark_sent(self, ids):
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "UPDATE sms_outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?",
+                [(time.time(), id_) for id_ in ids]
+            )
+
+    def mark_failed(self, ids, error):
+        with self._lock, self._connect() as conn:
+            for id_ in ids:
+                (attempts,) = conn.execute("SELECT attempts FROM sms_outbox WHERE id = ?", (id_,)).fetchone()
+                backoff = min(2 ** attempts * 5, MAX_BACKOFF_SECONDS)
+                # Give up on a message after MAX_ATTEMPTS so it cannot block the queue forever
+                status = 'failed' if attempts + 1 >= MAX_ATTEMPTS else 'pending'
+                conn.execute(
+                    """UPDATE sms_outbox SET status = ?, attempts = attempts + 1,
+                       next_attempt_at = ?, last_error = ? WHERE id = ?""",
+                    (status, time.time() + backoff, str(error), id_)
+                )
+
+    def release(self, ids):
+        """Put claimed rows back without counting an attempt (e.g. an earlier batch failed)."""
+        with self._lock, self._connect() as conn:
+            conn.executemany("UPDATE sms_outbox SET status = 'pending' WHERE id = ?", [(id_,) for id_ in ids])
+
+    def pending_count(self):
+        with self._connect() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM sms_outbox WHERE status IN ('pending', 'sending')").fetchone()
+        return count
+
+
+def coalesce_by_contact(rows):
+    """Merge claimed rows for the same contact into one notification, keeping first-seen order."""
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row[1], []).append(row)
+    return list(grouped.values())
+
+
+def group_into_batches(notifications, render):
+    """
+    Group notifications into gateway requests. Notifications that render to
+    the same message share one request (the payload takes a list of
+    recipients); batches keep the order of their first notification.
+    """
+    batches = {}
+    for position, rows in enumerate(notifications):
+        message, recipient = render(rows)
+        batch_list = batches.setdefault(message, [])
+        if not batch_list or len(batch_list[-1][1]) >= MAX_RECIPIENTS_PER_REQUEST:
+            batch_list.append((position, []))
+        batch_list[-1][1].append(([row[0] for row in rows], recipient))
+
+    ordered = [(position, message, batch) for message, batch_list in batches.items() for position, batch in batch_list]
+    ordered.sort(key=lambda b: b[0])
+    return [(message, batch) for _, message, batch in ordered]
+
+
+class OutboxDrainer(threading.Thread):
+    """Background thread that delivers queued notifications, in order per contact."""
+
+    def __init__(self, outbox, render, send, interval=60):
+        super().__init__(daemon=True)
+        self.outbox = outbox
+        self.render = render
+        self.send = send
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.drain_once()
+            except Exception as e:
+                print(f"❌ SMS outbox drain failed: {e}")
+            next_due = self.outbox.next_due_in()
+            timeout = self.interval if next_due is None else min(max(next_due, 1), self.interval)
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def drain_once(self):
+        rows = self.outbox.claim_pending()
+        if not rows:
+            return
+
+        try:
+            batches = group_into_batches(coalesce_by_contact(rows), self.render)
+        except Exception:
+            # don't leave the claimed rows in 'sending' until the next restart
+            self.outbox.release([row[0] for row in rows])
+            raise
+
+        # each contact is in exactly one batch, so a rejected batch only holds back its own
+        # contacts (claim_pending skips them until the backoff ends)
+        for message, batch in batches:
+            ids = [id_ for row_ids, _ in batch for id_ in row_ids]
+            recipients = list(dict.fromkeys(recipient for _, recipient in batch))
+            try:
+                self.send(recipients, message)
+            except Exception as e:
+                print(f"❌ SMS gateway error, will retry: {e}")
+                self.outbox.mark_failed(ids, e)
+                continue
+            self.outbox.mark_sent(ids)
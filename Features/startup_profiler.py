@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Enable with `python main.py --profile-startup` or SAVIOUR_PROFILE_STARTUP=1
+ENABLED = "--profile-startup" in sys.argv or os.getenv("SAVIOUR_PROFILE_STARTUP") == "1"
+
+_start = time.perf_counter()
+_records = []
+
+
+@contextmanager
+def profile(label):
+    """Time a startup step (import, page construction, ...) when profiling is enabled."""
+    if not ENABLED:
+        yield
+        return
+
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _records.append((label, time.perf_counter() - t0, t0 - _start))
+
+
+def mark(label):
+    """Record a point in time since process start (e.g. 'login dialog shown')."""
+    if ENABLED:
+        _records.append((label, 0.0, time.perf_counter() - _start))
+
+
+def report():
+    if not ENABLED or not _records:
+        return
+
+    print("\n⏱️ Startup profile")
+    print(f"{'at (s)':>8}  {'took (ms)':>10}  step")
+    for label, duration, at in _records:
+        print(f"{at:8.3f}  {duration * 1000:10.1f}  {label}")
+    print("Tip: run with `python -X importtime main.py` for a per-module import breakdown.\n")
+    _records.clear()
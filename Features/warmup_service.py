@@ -0,0 +1,58 @@
+from PySide6.QtCore import QObject, QThread, Signal
+
+
+class WarmupWorker(QObject):
+    progress = Signal(str, int)  # message, percent
+    finished = Signal(bool)  # True when recognition is ready
+
+    def run(self):
+        # imported here so the heavy libraries load on the worker thread
+        ok = False
+        try:
+            self.progress.emit("Loading face models...", 10)
+            from Features.face_services import FaceDetectionService
+            face_service = FaceDetectionService.get_instance()
+
+            self.progress.emit("Warming up face models...", 40)
+            face_service.warm_up()
+
+            self.progress.emit("Building face index...", 70)
+            from Features.face_indexer import FaceIndexer
+            FaceIndexer.get_instance()
+
+            self.progress.emit("Recognition ready", 100)
+            ok = True
+        except Exception as e:
+            print(f"❌ Warm-up failed: {e}")
+            self.progress.emit(f"Warm-up failed: {e}", 100)
+        finally:
+            self.finished.emit(ok)
+
+
+class WarmupService(QObject):
+    """
+    Loads the ONNX models, runs a dummy inference and builds the FAISS index
+    on a background thread right after login, so the recognition page opens hot.
+    """
+    progress = Signal(str, int)
+    finished = Signal(bool)  # True when recognition is ready
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thread = QThread()
+        self.worker = WarmupWorker()
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.progress)
+        self.worker.finished.connect(self.finished)
+        self.worker.finished.connect(self.thread.quit)
+
+    def start(self):
+        self.thread.start()
+
+    def is_running(self):
+        return self.thread.isRunning()
+
+    def wait(self):
+        self.thread.quit()
+        self.thread.wait()
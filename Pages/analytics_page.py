@@ -1,12 +1,73 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QLineEdit, QPushButton, QHBoxLayout, QFrame, QScrollArea, QSizePolicy
-from PySide6.QtCore import Qt, QDate
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QLineEdit, QPushButton, QHBoxLayout, QFrame, QScrollArea, QSizePolicy, QStackedWidget
+from PySide6.QtCore import Qt, QDate, QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtGui import QFont
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from matplotlib.ticker import MaxNLocator
-from db.database import get_connection
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date
+import threading
+import time
+from db.database import connect_from_env
+from Features import analytics_queries
+from Features.chart_cache import CanvasCache, data_fingerprint
+
+QUERY_TIMEOUT_MS = 15000
+
+
+class AnalyticsRequestSignals(QObject):
+    finished = Signal(str, int, object)  # kind, version, result
+    failed = Signal(str, int, str)
+
+
+class AnalyticsQueryTask(QRunnable):
+    """One chart query on its own connection, so a superseded one can be cancelled on the server."""
+
+    def __init__(self, kind, version, query, signals):
+        super().__init__()
+        self.kind = kind
+        self.version = version
+        self.query = query
+        self.signals = signals
+        self.conn = None
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            if self.conn is not None:
+                try:
+                    # asks the server to abort the running statement (same as pg_cancel_backend)
+                    self.conn.cancel()
+                except Exception as e:
+                    print(f"⚠️ Could not cancel {self.kind} query: {e}")
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            conn = connect_from_env()
+        except Exception as e:
+            self.signals.failed.emit(self.kind, self.version, str(e))
+            return
+
+        try:
+            with self.lock:
+                self.conn = conn
+            with conn.cursor() as cursor:
+                cursor.execute("SET statement_timeout = %s", (QUERY_TIMEOUT_MS,))
+            result = self.query(conn)
+            if not self.cancelled:
+                self.signals.finished.emit(self.kind, self.version, result)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(self.kind, self.version, str(e))
+        finally:
+            with self.lock:
+                self.conn = None
+            conn.close()
+
 
 class AnalyticsPage(QWidget):
     def __init__(self):
@@ -34,6 +95,16 @@ class AnalyticsPage(QWidget):
             }
         """)
 
+        # Chart queries run on a small pool; see submit_request()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.request_signals = AnalyticsRequestSignals()
+        self.request_signals.finished.connect(self.on_request_finished)
+        self.request_signals.failed.connect(self.on_request_failed)
+        self.request_versions = {}
+        self.active_requests = {}
+        self.result_handlers = {}
+
         self.init_ui()
         self.refresh_charts()
 
@@ -80,16 +151,10 @@ class AnalyticsPage(QWidget):
         content_layout.addWidget(line)
 
         # Entry/Exit Trends Canvas
-        self.entry_exit_canvas = FigureCanvas(Figure(figsize=(6, 4)))
-        self.entry_exit_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.entry_exit_canvas.setMinimumSize(600, 400)
-        content_layout.addWidget(self.entry_exit_canvas)
+        self.entry_exit_charts = self.create_chart_slot(content_layout)
 
         # Peak Hours Canvas
-        self.peak_hours_canvas = FigureCanvas(Figure(figsize=(6, 4)))
-        self.peak_hours_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.peak_hours_canvas.setMinimumSize(600, 400)
-        content_layout.addWidget(self.peak_hours_canvas)
+        self.peak_hours_charts = self.create_chart_slot(content_layout)
 
         # --- New Section for Top Frequent Users ---
         top_users_section = QLabel("Top Frequent Users", objectName="SectionLabel", alignment=Qt.AlignCenter)
@@ -113,121 +178,159 @@ class AnalyticsPage(QWidget):
         self.top_filter_combo.currentIndexChanged.connect(self.refresh_charts)
 
         # Top Frequent Users Canvas
-        self.top_users_canvas = FigureCanvas(Figure(figsize=(6, 4)))
-        self.top_users_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.top_users_canvas.setMinimumSize(600, 400)
-        content_layout.addWidget(self.top_users_canvas)
+        self.top_users_charts = self.create_chart_slot(content_layout)
 
         scroll_area.setWidget(content_widget)
         main_layout = QVBoxLayout(self)
         main_layout.addWidget(scroll_area)
 
+    def create_chart_slot(self, layout):
+        """A QStackedWidget holding cached canvases for one chart position."""
+        stack = QStackedWidget()
+        stack.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        stack.setMinimumSize(600, 400)
+        layout.addWidget(stack)
+
+        def make_canvas():
+            canvas = FigureCanvas(Figure(figsize=(6, 4)))
+            canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+            canvas.setMinimumSize(600, 400)
+            return canvas
+
+        return CanvasCache(stack, make_canvas)
+
     def refresh_charts(self):
         role = self.role_combo.currentText()
         data_type = self.data_type.currentText()
         filter_option = self.filter_combo.currentText()
         name_filter = self.name_input.text().strip()
 
+        # Charts are cached per filter + data fingerprint; unchanged ones are neither queried nor redrawn.
+        # The fingerprint is read on the pool too, so hit or miss is decided when the task returns;
+        # the task gets a snapshot of the cached keys and skips the chart queries on a hit.
+
         # Plot Entry/Exit Trends & Peak Hours
-        daily_data, hourly_data = self.load_entry_exit_data(role, data_type, filter_option, name_filter)
-        self.draw_trend_plot(daily_data, role, filter_option)
-        self.draw_peak_hours_plot(hourly_data)
+        params = (role, data_type, filter_option, name_filter)
+        cached = ({key[1:] for key in self.entry_exit_charts.canvases} &
+                  {key[1:] for key in self.peak_hours_charts.canvases})
+
+        def load_entry_exit(conn):
+            key = params + (self.read_fingerprint(conn),)
+            if key in cached:
+                return key, None
+            return key, self.load_entry_exit_data(role, data_type, filter_option, name_filter, conn)
+
+        def draw_entry_exit(result):
+            key, data = result
+            trend_key, peak_key = ("trend",) + key, ("peak_hours",) + key
+            if data is None and (trend_key not in self.entry_exit_charts or peak_key not in self.peak_hours_charts):
+                self.refresh_charts()  # evicted meanwhile
+                return
+            daily_data, hourly_data = data or (None, None)
+            self.entry_exit_charts.show(trend_key, lambda canvas: self.draw_trend_plot(canvas, daily_data, role, filter_option))
+            self.peak_hours_charts.show(peak_key, lambda canvas: self.draw_peak_hours_plot(canvas, hourly_data))
+
+        self.submit_request("entry_exit", load_entry_exit, draw_entry_exit)
 
         # Plot Top Frequent Users
         top_role = self.top_role_combo.currentText()
         top_log_type = self.top_log_type_combo.currentText().lower()  # 'entry' or 'exit'
         top_filter = self.top_filter_combo.currentText()
-        top_user_data = self.load_top_users_data(top_role, top_filter)
-        self.draw_top_frequent_users(top_user_data, top_log_type, top_role, top_filter)
-
-    def load_entry_exit_data(self, role, data_type, filter_option, name_filter):
-        from collections import defaultdict
-        from datetime import datetime, timedelta
-        conn = get_connection()
-        cursor = conn.cursor()
+        top_params = ("top_users", top_role, top_log_type, top_filter)
+        top_cached = set(self.top_users_charts.canvases)
+
+        def load_top_users(conn):
+            key = top_params + (self.read_fingerprint(conn),)
+            if key in top_cached:
+                return key, None
+            return key, self.load_top_users_data(top_role, top_log_type, top_filter, conn)
+
+        def draw_top_users(result):
+            key, data = result
+            if data is None and key not in self.top_users_charts:
+                self.refresh_charts()
+                return
+            self.top_users_charts.show(key, lambda canvas: self.draw_top_frequent_users(
+                canvas, data, top_log_type, top_role, top_filter))
+
+        self.submit_request("top_users", load_top_users, draw_top_users)
+
+    def read_fingerprint(self, conn):
+        """Runs on the pool (see refresh_charts)."""
+        try:
+            return (date.today(),) + tuple(data_fingerprint(conn))
+        except Exception as e:
+            print("Error reading chart fingerprint:", e)
+            return (time.monotonic(),)  # no caching without a fingerprint
+
+    # --- background queries ---------------------------------------------------
+
+    def submit_request(self, kind, query, on_result):
+        """
+        Run query(conn) on the thread pool. A newer request of the same kind
+        cancels the running one (server-side too) and only the latest result
+        is passed to on_result on the GUI thread.
+        """
+        self.cancel_request(kind)
+        version = self.request_versions[kind]
+        self.result_handlers[kind] = on_result
+
+        task = AnalyticsQueryTask(kind, version, query, self.request_signals)
+        self.active_requests[kind] = task
+        self.pool.start(task)
+
+    def cancel_request(self, kind):
+        # bumping the version also drops a result that is already queued for delivery
+        self.request_versions[kind] = self.request_versions.get(kind, 0) + 1
+        self.result_handlers.pop(kind, None)
+        task = self.active_requests.pop(kind, None)
+        if task is not None:
+            task.cancel()
+
+    def on_request_finished(self, kind, version, result):
+        if version != self.request_versions.get(kind):
+            return  # superseded while it was running
+        self.active_requests.pop(kind, None)
+        self.result_handlers.pop(kind)(result)
+
+    def on_request_failed(self, kind, version, message):
+        if version == self.request_versions.get(kind):
+            self.active_requests.pop(kind, None)
+            print(f"Error loading {kind} chart: {message}")
+
+    # Page lifecycle hook (called by MainPage)
+    def shutdown(self):
+        for kind in list(self.active_requests):
+            self.cancel_request(kind)
+        self.pool.waitForDone(2000)
+
+    # --- data (run on pool threads) --------------------------------------------
+
+    def load_entry_exit_data(self, role, data_type, filter_option, name_filter, conn=None):
         daily = defaultdict(lambda: {"entry": 0, "exit": 0})
         hourly = defaultdict(lambda: {"entry": 0, "exit": 0})
-        now = datetime.now()
-        try:
-            table = "gate_logs" if data_type == "Gate Logs" else "room_logs"
-            query = f"SELECT timestamp, purpose, role, name FROM {table} WHERE role = %s"
-            params = [role]
-
-            if name_filter:
-                query += " AND name ILIKE %s"
-                params.append(f"%{name_filter}%")
-
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
+        source = "gate" if data_type == "Gate Logs" else "room"
+        start, end = analytics_queries.window_range(filter_option)
 
-            for timestamp, purpose, _, _name in rows:
-                if isinstance(timestamp, str):
-                    timestamp = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+        for day, purpose, count in analytics_queries.daily_counts(source, role, start, end, name_filter, conn=conn):
+            action = purpose.lower()
+            if action in ["entry", "exit"]:
+                daily[day.strftime("%Y-%m-%d")][action] += count
 
-                if not self._date_matches_filter(timestamp, now, filter_option):
-                    continue
-
-                date_key = timestamp.strftime("%Y-%m-%d")
-                hour_key = timestamp.hour
-                action = purpose.lower()
-
-                if action in ["entry", "exit"]:
-                    daily[date_key][action] += 1
-                    hourly[hour_key][action] += 1
-        except Exception as e:
-            print("Error loading logs:", e)
-        finally:
-            conn.close()
+        for hour, purpose, count in analytics_queries.hourly_counts(source, role, start, end, name_filter, conn=conn):
+            action = purpose.lower()
+            if action in ["entry", "exit"]:
+                hourly[hour][action] += count
 
         return daily, hourly
 
-    def load_top_users_data(self, role, filter_option):
-        from collections import defaultdict
-        from datetime import datetime, timedelta
-        conn = get_connection()
-        cursor = conn.cursor()
-        now = datetime.now()
-
-        user_counts = defaultdict(lambda: {"entry": 0, "exit": 0})
-
-        try:
-            table = "room_logs"  # or room_logs? You can add logic if needed
-            query = f"SELECT name, purpose, timestamp FROM {table} WHERE role = %s"
-            params = [role]
-
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-
-            for name, purpose, timestamp in rows:
-                if isinstance(timestamp, str):
-                    timestamp = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-
-                if not self._date_matches_filter(timestamp, now, filter_option):
-                    continue
-
-                action = purpose.lower()
-                if action in ["entry", "exit"]:
-                    user_counts[name][action] += 1
-        except Exception as e:
-            print("Error loading top users:", e)
-        finally:
-            conn.close()
+    def load_top_users_data(self, role, log_type, filter_option, conn=None):
+        """[(name, count)] of the top 10 people for room logs."""
+        start, end = analytics_queries.window_range(filter_option)
+        return analytics_queries.top_people("room", role, log_type, start, end, limit=10, conn=conn)
 
-        return user_counts
-
-    def _date_matches_filter(self, timestamp, now, filter_option):
-        from datetime import timedelta
-        if filter_option == "Today":
-            return timestamp.date() == now.date()
-        elif filter_option == "This Week":
-            start = now - timedelta(days=now.weekday())
-            return timestamp.date() >= start.date()
-        elif filter_option == "This Month":
-            return timestamp.month == now.month and timestamp.year == now.year
-        return True
-
-    def draw_trend_plot(self, daily_data, role, filter_option):
-        fig = self.entry_exit_canvas.figure
+    def draw_trend_plot(self, canvas, daily_data, role, filter_option):
+        fig = canvas.figure
         fig.clear()
         ax = fig.add_subplot(111)
 
@@ -261,10 +364,10 @@ class AnalyticsPage(QWidget):
         ax.set_title(f"{role} Entry/Exit - {filter_option}")
         ax.yaxis.set_major_locator(MaxNLocator(integer=True))
         fig.tight_layout()
-        self.entry_exit_canvas.draw()
+        canvas.draw()
 
-    def draw_peak_hours_plot(self, hourly_data):
-        fig = self.peak_hours_canvas.figure
+    def draw_peak_hours_plot(self, canvas, hourly_data):
+        fig = canvas.figure
         fig.clear()
         ax = fig.add_subplot(111)
 
@@ -284,21 +387,19 @@ class AnalyticsPage(QWidget):
         ax.set_title("Peak Hours")
         ax.yaxis.set_major_locator(MaxNLocator(integer=True))
         fig.tight_layout()
-        self.peak_hours_canvas.draw()
+        canvas.draw()
 
-    def draw_top_frequent_users(self, user_counts, log_type, role, filter_option):
-        fig = self.top_users_canvas.figure
+    def draw_top_frequent_users(self, canvas, user_counts, log_type, role, filter_option):
+        fig = canvas.figure
         fig.clear()
         ax = fig.add_subplot(111)
 
-        filtered_counts = {user: counts[log_type] for user, counts in user_counts.items() if counts[log_type] > 0}
-        if not filtered_counts:
+        if not user_counts:
             ax.text(0.5, 0.5, "No Data", ha='center', va='center', fontsize=16, transform=ax.transAxes)
             ax.set_xticks([])
             ax.set_yticks([])
         else:
-            sorted_users = sorted(filtered_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-            users, counts = zip(*sorted_users)
+            users, counts = zip(*user_counts)
             ax.bar(range(len(users)), counts, color="#4CAF50")
             ax.set_xticks(range(len(users)))
             ax.set_xticklabels(users, rotation=45, ha='right')
@@ -308,4 +409,4 @@ class AnalyticsPage(QWidget):
         fig.subplots_adjust(bottom=0.25)  # Give room for rotated labels
         ax.yaxis.set_major_locator(MaxNLocator(integer=True))
         fig.tight_layout()
-        self.top_users_canvas.draw()
+        canvas.draw()
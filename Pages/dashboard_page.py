@@ -5,7 +5,14 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QFont, QColor, QPalette
 from db.database import get_connection
+from Features import analytics_queries
+from Features.event_bus import LogEventBus
 import datetime
+import time
+
+LATEST_LIMIT = 10
+REPAINT_DEBOUNCE_MS = 300
+RECONCILE_INTERVAL_MS = 15 * 60 * 1000
 
 
 class DashboardPage(QWidget):
@@ -49,13 +56,49 @@ class DashboardPage(QWidget):
 
         main_layout.addLayout(table_layout)
 
+        # Dashboard state, kept current by log events and repainted on a short debounce
+        self.counts = {'Entry': 0, 'Exit': 0}
+        self.latest = {'Entry': [], 'Exit': []}
+        self.day = datetime.date.today()
+        self.last_snapshot_id = 0
+        self.last_reconcile = 0.0
+        self.suspended = False
+
+        self.repaint_timer = QTimer(self)
+        self.repaint_timer.setSingleShot(True)
+        self.repaint_timer.setInterval(REPAINT_DEBOUNCE_MS)
+        self.repaint_timer.timeout.connect(self.render)
+
         # After UI setup, update dashboard first time
         self.update_dashboard()
 
-        # Auto refresh every 5 minutes
-        timer = QTimer(self)
-        timer.timeout.connect(self.update_dashboard)
-        timer.start(5 * 60 * 1000)
+        # Live rows arrive over LISTEN/NOTIFY; a slow full reload only corrects drift
+        self.event_bus = LogEventBus.get_instance()
+        self.event_bus.log_inserted.connect(self.on_log_inserted)
+        self.event_bus.connected.connect(self.update_dashboard)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.update_dashboard)
+        self.refresh_timer.start(RECONCILE_INTERVAL_MS)
+
+    # Page lifecycle hooks (called by MainPage)
+    def suspend(self):
+        self.suspended = True
+        self.refresh_timer.stop()
+
+    def resume(self):
+        self.suspended = False
+        if (time.monotonic() - self.last_reconcile) * 1000 >= RECONCILE_INTERVAL_MS:
+            self.update_dashboard()
+        else:
+            # events kept the state current while hidden; just paint it
+            self.render()
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start()
+
+    def shutdown(self):
+        self.event_bus.log_inserted.disconnect(self.on_log_inserted)
+        self.event_bus.connected.disconnect(self.update_dashboard)
 
     def create_stat_card(self, title: str, value: str):
         card = QGroupBox()
@@ -114,67 +157,77 @@ class DashboardPage(QWidget):
         return group
 
     def fetch_today_counts(self):
-        conn = get_connection()
-        cursor = conn.cursor()
+        results = analytics_queries.totals_by_purpose("gate")
+        return results.get('Entry', 0), results.get('Exit', 0)
 
-        today = datetime.date.today()
-
-        query = """
-            SELECT purpose, COUNT(*) 
-            FROM gate_logs 
-            WHERE DATE(timestamp) = %s 
-            GROUP BY purpose
-        """
-
-        cursor.execute(query, (today,))  # Note the tuple with a comma!
-        results = dict(cursor.fetchall())
-
-        total_entry = results.get('Entry', 0)
-        total_exit = results.get('Exit', 0)
-
-        conn.close()
-        return total_entry, total_exit
-
-    def fetch_latest_logs(self, action_type, limit=10):
+    def fetch_latest_logs(self, action_type, limit=LATEST_LIMIT):
         """Fetch latest logs filtered by entry or exit."""
         today = datetime.date.today()
+        tomorrow = today + datetime.timedelta(days=1)
         conn = get_connection()
         cursor = conn.cursor()
 
         query = """
-            SELECT name, role, timestamp 
+            SELECT id, name, role, timestamp 
             FROM gate_logs 
-            WHERE purpose = %s AND DATE(timestamp) = %s
+            WHERE purpose = %s AND timestamp >= %s AND timestamp < %s
             ORDER BY timestamp DESC 
             LIMIT %s
         """
 
-        cursor.execute(query, (action_type, today, limit))
+        cursor.execute(query, (action_type, today, tomorrow, limit))
         rows = cursor.fetchall()
         conn.close()
         return rows
 
     def update_dashboard(self):
-        # Update total entries and exits
+        """Full reload of counts and latest logs; events keep it current in between."""
+        self.day = datetime.date.today()
         total_entry, total_exit = self.fetch_today_counts()
-
+        self.counts = {'Entry': total_entry, 'Exit': total_exit}
+        self.latest = {action: self.fetch_latest_logs(action) for action in ('Entry', 'Exit')}
+        # Events for rows at or below this id are already in the snapshot
+        self.last_snapshot_id = max((row[0] for rows in self.latest.values() for row in rows), default=0)
+        self.last_reconcile = time.monotonic()
+        self.render()
+
+    def on_log_inserted(self, event):
+        if event.get('source') != 'gate' or event.get('purpose') not in self.counts:
+            return
+        event_day = event['timestamp'].date()
+        if event_day != self.day:
+            if event_day != datetime.date.today():
+                return  # backdated row from another day
+            # first event after midnight: reload today's snapshot, then carry on incrementally
+            self.update_dashboard()
+        if event['id'] <= self.last_snapshot_id:
+            return
+
+        action = event['purpose']
+        self.counts[action] += 1
+        row = (event['id'], event['name'], event['role'], event['timestamp'])
+        self.latest[action] = sorted(self.latest[action] + [row], key=lambda r: r[3], reverse=True)[:LATEST_LIMIT]
+
+        if not self.suspended and not self.repaint_timer.isActive():
+            self.repaint_timer.start()
+
+    def render(self):
         # Update entry card
         entry_value_label = self.entry_card.findChildren(QLabel)[1]
-        entry_value_label.setText(str(total_entry))
+        entry_value_label.setText(str(self.counts['Entry']))
 
         # Update exit card
         exit_value_label = self.exit_card.findChildren(QLabel)[1]
-        exit_value_label.setText(str(total_exit))
+        exit_value_label.setText(str(self.counts['Exit']))
 
         # Update tables
-        self.populate_table(self.entry_table.findChild(QTableWidget), 'Entry')
-        self.populate_table(self.exit_table.findChild(QTableWidget), 'Exit')
+        self.populate_table(self.entry_table.findChild(QTableWidget), self.latest['Entry'])
+        self.populate_table(self.exit_table.findChild(QTableWidget), self.latest['Exit'])
 
-    def populate_table(self, table_widget, action_type):
-        logs = self.fetch_latest_logs(action_type)
+    def populate_table(self, table_widget, logs):
         table_widget.setRowCount(len(logs))
 
-        for row_idx, (name, role, timestamp) in enumerate(logs):
+        for row_idx, (_id, name, role, timestamp) in enumerate(logs):
             # Name
             name_item = QTableWidgetItem(name)
             table_widget.setItem(row_idx, 0, name_item)
@@ -192,4 +245,3 @@ class DashboardPage(QWidget):
 
             timestamp_item = QTableWidgetItem(formatted_time)
             table_widget.setItem(row_idx, 2, timestamp_item)
-
@@ -1,30 +1,43 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy, QComboBox, QDialog, QPushButton, QDialogButtonBox, QLineEdit, QScrollArea, QHBoxLayout, QSpacerItem
-from PySide6.QtCore import Qt, QTimer, QObject, Signal, QThread
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy, QComboBox, QDialog, QPushButton, QDialogButtonBox, QLineEdit, QScrollArea, QHBoxLayout, QSpacerItem, QGridLayout, QStackedWidget
+from PySide6.QtCore import Qt, QTimer, QObject, Signal, Slot, QThread, QPoint, QRect
 from PySide6.QtGui import QFont, QImage, QPixmap
-from pygrabber.dshow_graph import FilterGraph
 import cv2
 import numpy as np
-import insightface
 import uuid
 import time
-
-from win32ctypes.pywin32.pywintypes import datetime
+from datetime import datetime
 
 from Features.face_indexer import FaceIndexer
 from Features.face_services import FaceDetectionService
 from functools import partial
 import json
 import os
-from Pages.monitoring_logs import MonitoringLogs
+import threading
 
 
 CONFIG_PATH = "./camera_config.json"
 
+# preview size of each camera tile in the grid
+TILE_SIZES = {"Small": (320, 240), "Medium": (480, 360), "Large": (640, 480)}
+DEFAULT_TILE_SIZE = "Medium"
+# grid tiles refresh at this rate; the focused camera gets the full frame rate
+THUMBNAIL_FPS = 10
+# how long a source may take to open before its tile is marked offline
+# (per camera via "open_timeout" in camera_config.json), and the retry delay
+OPEN_TIMEOUT_SECONDS = {"wired": 5, "rtsp": 10}
+RETRY_INTERVAL_MS = 30000
+# an open camera that sends no frame for this long is treated as offline and reopened
+READ_STALL_SECONDS = 10
+
 class LiveRecognitionPage(QWidget):
     def __init__(self):
         super().__init__()
         self.camera_widgets = []
-        self.monitoring_logs = MonitoringLogs()  # Create instance for logging
+        self.monitoring_logs = None
+        self.tile_size = TILE_SIZES[DEFAULT_TILE_SIZE]
+        self.grid_columns = 0
+        self.focused_camera = None
+        self.page_active = True
         self.init_ui()
 
     def init_ui(self):
@@ -66,13 +79,21 @@ class LiveRecognitionPage(QWidget):
             }
         """)
 
+        self.tile_size_combo = QComboBox()
+        self.tile_size_combo.addItems(list(TILE_SIZES))
+        self.tile_size_combo.setCurrentText(DEFAULT_TILE_SIZE)
+        self.tile_size_combo.setFixedHeight(40)
+        self.tile_size_combo.setToolTip("Camera tile size")
+        self.tile_size_combo.currentTextChanged.connect(self.set_tile_size)
+
         title_bar.addWidget(title)
         title_bar.addItem(spacer)
+        title_bar.addWidget(self.tile_size_combo)
         title_bar.addWidget(self.add_camera_button)
 
-        # Container widget inside scroll area to hold camera widgets
+        # Container widget inside scroll area to hold camera widgets as a grid
         self.camera_container = QWidget()
-        self.cameras_layout = QVBoxLayout()
+        self.cameras_layout = QGridLayout()
         self.cameras_layout.setContentsMargins(5, 5, 5, 5)
         self.cameras_layout.setSpacing(10)
         self.camera_container.setLayout(self.cameras_layout)
@@ -100,11 +121,39 @@ class LiveRecognitionPage(QWidget):
             }
         """)
 
+        # Only tiles inside the viewport render
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.update_visibility)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self.update_visibility)
+
+        # Focus view: one camera at full size, shown instead of the grid
+        self.focus_view = QWidget()
+        focus_layout = QVBoxLayout(self.focus_view)
+        focus_bar = QHBoxLayout()
+        self.focus_title = QLabel()
+        self.focus_title.setFont(QFont("Segoe UI", 16, QFont.DemiBold))
+        back_button = QPushButton("Back to Grid")
+        back_button.clicked.connect(self.unfocus_camera)
+        focus_bar.addWidget(self.focus_title)
+        focus_bar.addStretch()
+        focus_bar.addWidget(back_button)
+        self.focus_label = QLabel()
+        self.focus_label.setAlignment(Qt.AlignCenter)
+        self.focus_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+        self.focus_label.setStyleSheet("background-color: #002366; border-radius: 12px;")
+        focus_layout.addLayout(focus_bar)
+        focus_layout.addWidget(self.focus_label)
+
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.scroll_area)
+        self.view_stack.addWidget(self.focus_view)
+
         self.layout.addLayout(title_bar)
-        self.layout.addWidget(self.scroll_area)
+        self.layout.addWidget(self.view_stack)
         self.load_saved_cameras()
 
     def show_add_camera_dialog(self):
+        from pygrabber.dshow_graph import FilterGraph
+
         graph = FilterGraph()
         devices = graph.get_input_devices()
         dialog = AddCameraDialog(devices, self)
@@ -126,12 +175,11 @@ class LiveRecognitionPage(QWidget):
                 label=label,
                 purpose=purpose, # <- Pass purpose
                 location=location,
-                monitoring_logs = self.monitoring_logs
+                monitoring_logs = self.monitoring_logs,
+                tile_size=self.tile_size
             )
             print(f"ADDING camera_widget: {id(camera_widget)}")
-            camera_widget.finished.connect(partial(self.remove_camera_widget, camera_widget))
-            self.cameras_layout.addWidget(camera_widget)
-            self.camera_widgets.append(camera_widget)
+            self.add_camera_widget(camera_widget)
             self.save_camera_config()
 
     def save_camera_config(self):
@@ -145,6 +193,8 @@ class LiveRecognitionPage(QWidget):
                 "location": cam.location
 
             })
+            if cam.open_timeout:
+                camera_data[-1]["open_timeout"] = cam.open_timeout
 
         with open(CONFIG_PATH, "w") as f:
             json.dump(camera_data, f, indent=4)
@@ -163,21 +213,95 @@ class LiveRecognitionPage(QWidget):
                 label=cam["label"],
                 purpose=cam["purpose"],
                 location=cam["location"],
-                monitoring_logs=self.monitoring_logs
+                monitoring_logs=self.monitoring_logs,
+                tile_size=self.tile_size,
+                open_timeout=cam.get("open_timeout")
             )
+            self.add_camera_widget(camera_widget)
+
+    def add_camera_widget(self, camera_widget):
+        camera_widget.finished.connect(partial(self.remove_camera_widget, camera_widget))
+        camera_widget.focus_requested.connect(partial(self.focus_camera, camera_widget))
+        self.camera_widgets.append(camera_widget)
+        self.relayout_grid(force=True)
+
+    # --- grid layout and render suppression -------------------------------------
+
+    def grid_column_count(self):
+        tile_width = self.tile_size[0] + 2 * 10 + self.cameras_layout.horizontalSpacing()  # tile margins
+        return max(1, self.scroll_area.viewport().width() // tile_width)
+
+    def relayout_grid(self, force=False):
+        columns = self.grid_column_count()
+        if columns != self.grid_columns or force:
+            self.grid_columns = columns
+            for camera in self.camera_widgets:
+                self.cameras_layout.removeWidget(camera)
+            for i, camera in enumerate(self.camera_widgets):
+                self.cameras_layout.addWidget(camera, i // columns, i % columns, Qt.AlignTop | Qt.AlignLeft)
+        # positions settle after the layout runs
+        QTimer.singleShot(0, self.update_visibility)
+
+    def set_tile_size(self, name):
+        self.tile_size = TILE_SIZES[name]
+        for camera in self.camera_widgets:
+            camera.set_tile_size(self.tile_size)
+        self.relayout_grid(force=True)
 
-            camera_widget.finished.connect(partial(self.remove_camera_widget, camera_widget))
-            self.cameras_layout.addWidget(camera_widget)
-            self.camera_widgets.append(camera_widget)
-
-    def hideEvent(self, event):
+    def update_visibility(self):
+        """Render only what is on screen: the focused camera, or the tiles inside the viewport."""
+        viewport = self.scroll_area.viewport()
+        for camera in self.camera_widgets:
+            if not self.page_active:
+                visible = False
+            elif self.focused_camera is not None:
+                visible = camera is self.focused_camera
+            else:
+                rect = QRect(camera.mapTo(viewport, QPoint(0, 0)), camera.size())
+                visible = camera.isVisible() and rect.intersects(viewport.rect())
+            camera.set_rendering(visible)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.relayout_grid()
+
+    def focus_camera(self, camera_widget):
+        if self.focused_camera is not None:
+            self.focused_camera.set_focus_label(None)
+        self.focused_camera = camera_widget
+        self.focus_title.setText(camera_widget.label)
+        self.focus_label.clear()
+        camera_widget.set_focus_label(self.focus_label)
+        self.view_stack.setCurrentWidget(self.focus_view)
+        self.update_visibility()
+
+    def unfocus_camera(self):
+        if self.focused_camera is not None:
+            self.focused_camera.set_focus_label(None)
+            self.focused_camera = None
+        self.view_stack.setCurrentWidget(self.scroll_area)
+        QTimer.singleShot(0, self.update_visibility)
+
+    # Page lifecycle hooks (called by MainPage). Cameras keep recognizing while
+    # another page is shown; only the preview rendering is paused.
+    def suspend(self):
+        self.page_active = False
+        self.update_visibility()
+
+    def resume(self):
+        self.page_active = True
+        QTimer.singleShot(0, self.update_visibility)
+
+    def shutdown(self):
         for camera in self.camera_widgets:
             camera.stop_camera()
-        event.accept()
 
     def remove_camera_widget(self, camera_widget):
         print(f"REMOVING camera_widget: {id(camera_widget)}")
 
+        if camera_widget is self.focused_camera:
+            self.unfocus_camera()
+
         camera_widget.stop_camera()
         self.cameras_layout.removeWidget(camera_widget)
 
@@ -189,6 +313,7 @@ class LiveRecognitionPage(QWidget):
             print("WARNING: camera_widget not in camera_widgets list!")
 
         camera_widget.deleteLater()
+        self.relayout_grid(force=True)
 
 class AddCameraDialog(QDialog):
     def __init__(self, devices, parent=None):
@@ -282,39 +407,154 @@ class FaceDetectionWorker(QObject):
         super().__init__()
         self.face_service = face_service
         self.scale = scale
-        self.running = False
+        self.running = False  # set by the camera when it queues a frame, cleared once it is processed
 
+    @Slot(np.ndarray)
     def process_frame(self, frame):
-        if not self.running:
-            self.running = True
-            try:
-                # Process in worker thread
-                small_frame = cv2.resize(frame, (0, 0), fx=self.scale, fy=self.scale)
-                faces = self.face_service.detect_faces(small_frame)
-                self.detection_complete.emit(frame, faces)
-            finally:
-                self.running = False
+        try:
+            # Process in worker thread
+            small_frame = cv2.resize(frame, (0, 0), fx=self.scale, fy=self.scale)
+            faces = self.face_service.detect_faces(small_frame)
+            self.detection_complete.emit(frame, faces)
+        finally:
+            self.running = False
+
+class CameraOpener(QObject):
+    """
+    Opens a capture source on a daemon thread, loading the shared face models
+    and index first if warm-up has not finished, so neither a slow model load
+    nor an unreachable camera blocks the GUI or the other cameras.
+    """
+    opened = Signal(int, object)  # attempt, cv2.VideoCapture
+    failed = Signal(int, str)
+
+    def __init__(self):
+        super().__init__()
+        self.thread = None
+
+    def busy(self):
+        """True while an earlier open is still running (e.g. a backend ignoring its timeout)."""
+        return self.thread is not None and self.thread.is_alive()
+
+    def open(self, attempt, source, source_type, timeout_seconds):
+        self.thread = threading.Thread(
+            target=self._open, args=(attempt, source, source_type, timeout_seconds), daemon=True
+        )
+        self.thread.start()
+
+    def _open(self, attempt, source, source_type, timeout_seconds):
+        try:
+            FaceDetectionService.get_instance()
+            FaceIndexer.get_instance()
+
+            if source_type == 'wired':
+                cap = cv2.VideoCapture(source)
+            else:
+                if hasattr(cv2, "CAP_PROP_OPEN_TIMEOUT_MSEC"):  # OpenCV >= 4.5.2
+                    cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG, [
+                        cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(timeout_seconds * 1000),
+                        cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(timeout_seconds * 1000)
+                    ])
+                else:
+                    cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG)
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                cap.set(cv2.CAP_PROP_FPS, 25)  # Limit FPS for RTSP
+
+            if not cap.isOpened():
+                cap.release()
+                self.failed.emit(attempt, "could not open source")
+                return
+
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+            self.opened.emit(attempt, cap)
+        except Exception as e:
+            self.failed.emit(attempt, str(e))
+
+
+class FrameReader(QObject):
+    """
+    Reads an opened capture on a daemon thread and keeps only the latest
+    frame, so a stalled source never blocks the GUI. The thread owns the
+    capture and releases it when stopped or when the source stops sending.
+    """
+    lost = Signal(int, str)  # attempt, reason
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.frame = None
+        self.sequence = 0
+        self.stop_event = None
+
+    def start(self, attempt, cap):
+        self.stop()
+        with self.lock:
+            self.frame = None
+        self.stop_event = threading.Event()
+        threading.Thread(target=self._read, args=(attempt, cap, self.stop_event), daemon=True).start()
+
+    def stop(self):
+        if self.stop_event is not None:
+            self.stop_event.set()
+            self.stop_event = None
+
+    def latest(self):
+        """(sequence, frame) of the newest frame; the sequence changes with every new frame."""
+        with self.lock:
+            return self.sequence, self.frame
+
+    def _read(self, attempt, cap, stop_event):
+        last_frame_time = time.monotonic()
+        try:
+            while not stop_event.is_set():
+                ret, frame = cap.read()
+                if stop_event.is_set():
+                    break
+                if ret:
+                    last_frame_time = time.monotonic()
+                    with self.lock:
+                        self.frame = frame
+                        self.sequence += 1
+                    continue
+                if not cap.isOpened() or time.monotonic() - last_frame_time >= READ_STALL_SECONDS:
+                    self.lost.emit(attempt, "stopped sending frames")
+                    break
+                time.sleep(0.1)
+        except Exception as e:
+            self.lost.emit(attempt, str(e))
+        finally:
+            cap.release()
+
 
 class CameraFeedWidget(QWidget):
     finished = Signal()
+    focus_requested = Signal()
+    detect_requested = Signal(np.ndarray)  # queued to FaceDetectionWorker in face_thread
 
-    def __init__(self, source, source_type='wired', label='Camera', purpose='Entry', location='Gate', monitoring_logs=None, parent=None):
+    def __init__(self, source, source_type='wired', label='Camera', purpose='Entry', location='Gate', monitoring_logs=None, parent=None, tile_size=TILE_SIZES[DEFAULT_TILE_SIZE], open_timeout=None):
         super().__init__(parent)
         self.label = label
         self.source = source
         self.source_type = source_type
+        self.open_timeout = open_timeout
         self.purpose = purpose
         self.location = location
         self.monitoring_logs = monitoring_logs
-        self.cap = None
+        self.reader = FrameReader()
+        self.last_sequence = 0
         self.timer = QTimer(self)
         self.last_display_time = 0
         self.current_frame = None  # Add this to store the current frame
         self.last_processed_frame = None  # Add this to track last processed frame
-
-        # Face detection setup
-        self.face_service = FaceDetectionService()
-        self.face_worker = FaceDetectionWorker(self.face_service)
+        self.last_detection_time = 0
+        self.tile_size = tile_size
+        self.focus_label = None  # the page's full-size view while this camera is focused
+
+        # Face detection setup (models are shared and normally already warm, see WarmupService);
+        # the service and index are attached once CameraOpener has them loaded
+        self.face_service = None
+        self.face_worker = FaceDetectionWorker(None)
         self.face_thread = QThread()
         self.face_worker.moveToThread(self.face_thread)
         self.face_thread.start()
@@ -325,12 +565,26 @@ class CameraFeedWidget(QWidget):
         self.embedding_threshold = 0.6
         self.face_ttl = 30
         self.iou_threshold = 0.3
-        self.face_recognize = FaceIndexer()
+        self.face_recognize = None
+
+        # Background open: the tile shows "Connecting..." until the source answers or times out
+        self.opener = CameraOpener()
+        self.opener.opened.connect(self.on_camera_opened)
+        self.opener.failed.connect(self.on_camera_failed)
+        self.open_attempt = 0
+        self.open_timer = QTimer(self)
+        self.open_timer.setSingleShot(True)
+        self.open_timer.timeout.connect(lambda: self.on_camera_failed(self.open_attempt, "timed out"))
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.start_camera)
+        self.reader.lost.connect(self.on_camera_failed)
 
         self.init_ui()
         self.init_connections()
-        self.start_camera()
         self.show_preview = True
+        self.rendering = True  # False while the recognition page is not on screen
+        self.start_camera()
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -344,11 +598,14 @@ class CameraFeedWidget(QWidget):
         self.title.setStyleSheet("color: #34495E;")  # dark slate blue
 
         self.image_label = QLabel()
-        self.image_label.setFixedSize(640, 480)
+        self.image_label.setFixedSize(*self.tile_size)
+        self.image_label.setCursor(Qt.PointingHandCursor)
+        self.image_label.setToolTip("Click to focus")
         self.image_label.setStyleSheet("""
             background-color: #002366;  /* medium gray */
             border-radius: 12px;
             border: 2px solid #7F8C8D;
+            color: #FFD700;  /* connection status text */
         """)
 
         # Add horizontal layout for buttons
@@ -407,6 +664,7 @@ class CameraFeedWidget(QWidget):
     def init_connections(self):
         self.timer.timeout.connect(self.update_frame)
         self.face_worker.detection_complete.connect(self.handle_detection_results)
+        self.detect_requested.connect(self.face_worker.process_frame, Qt.QueuedConnection)
         self.close_button.clicked.connect(self.handle_close_camera)
 
     def iou(self, box1, box2):
@@ -422,55 +680,90 @@ class CameraFeedWidget(QWidget):
         return inter_area / union_area if union_area > 0 else 0
 
     def start_camera(self):
-        if self.source_type == 'wired':
-            self.cap = cv2.VideoCapture(self.source)
-        else:
-            self.cap = cv2.VideoCapture(self.source, cv2.CAP_FFMPEG)
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            self.cap.set(cv2.CAP_PROP_FPS, 25)  # Limit FPS for RTSP
-
-        if self.cap.isOpened():
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.timer.start(30)  # ~33ms per frame (~30fps)
-
-    def update_frame(self):
-        """Capture and process a new frame from the camera"""
-        if not self.cap or not self.cap.isOpened():
+        """Open the source in the background; see on_camera_opened / on_camera_failed."""
+        if self.opener.busy():
+            # never stack open threads on a source that is still hanging
+            self.show_status(f"Camera offline (still connecting)\nRetrying in {RETRY_INTERVAL_MS // 1000} s")
+            self.retry_timer.start(RETRY_INTERVAL_MS)
+            return
+        self.open_attempt += 1
+        timeout = self.open_timeout or OPEN_TIMEOUT_SECONDS.get(self.source_type, 10)
+        self.show_status("Connecting...")
+        # a little longer than OpenCV's own timeout, which not every backend honours
+        self.open_timer.start(int(timeout * 1000) + 2000)
+        self.opener.open(self.open_attempt, self.source, self.source_type, timeout)
+
+    def on_camera_opened(self, attempt, cap):
+        if attempt != self.open_attempt:
+            cap.release()  # answered after its timeout, or the camera was closed meanwhile
+            return
+        self.open_timer.stop()
+        self.face_service = FaceDetectionService.get_instance()
+        self.face_worker.face_service = self.face_service
+        self.face_recognize = FaceIndexer.get_instance()
+        self.reader.start(attempt, cap)
+        self.image_label.clear()
+        print(f"📷 Camera opened: {self.label}")
+        self.timer.start(30)  # ~33ms per frame (~30fps)
+
+    def on_camera_failed(self, attempt, reason):
+        if attempt != self.open_attempt:
             return
+        self.open_attempt += 1  # a late success from this attempt is released
+        self.open_timer.stop()
+        self.timer.stop()
+        self.reader.stop()
+        print(f"⚠️ Camera {self.label} ({self.source}) unavailable: {reason}")
+        self.show_status(f"Camera offline ({reason})\nRetrying in {RETRY_INTERVAL_MS // 1000} s")
+        self.retry_timer.start(RETRY_INTERVAL_MS)
+
+    def show_status(self, text):
+        self.image_label.clear()
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setText(text)
 
-        ret, frame = self.cap.read()
-        if not ret:
+    def update_frame(self):
+        """Process the newest frame from the reader thread"""
+        sequence, frame = self.reader.latest()
+        if frame is None or sequence == self.last_sequence:
             return
+        self.last_sequence = sequence
 
         self.frame_counter += 1
-        self.current_frame = frame.copy()  # Store the current frame
+        self.current_frame = frame  # Store the current frame
 
-        # Throttle display updates
+        # Detection runs every 2nd frame (at most 30/s) whether or not the feed is on screen
         current_time = time.time()
-        if current_time - self.last_display_time < 1 / 30:
+        detect = (current_time - self.last_detection_time >= 1 / 30 and
+                  self.frame_counter % 2 == 0 and
+                  not self.face_worker.running and
+                  not np.array_equal(frame, self.last_processed_frame))
+
+        # Off-screen, hidden or minimized tiles are neither converted nor drawn;
+        # grid thumbnails refresh at THUMBNAIL_FPS, the focused view at full rate
+        display_interval = 1 / 30 if self.focus_label is not None else 1 / THUMBNAIL_FPS
+        display = (self.rendering and self.show_preview and
+                   current_time - self.last_display_time >= display_interval and
+                   not self.window().isMinimized())
+
+        if not (detect or display):
             return
 
-        # Convert to RGB for display
+        # Convert to RGB for display and detection
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
-        # Draw existing faces on the current frame
-        self.draw_face_annotations(rgb_frame)
-
-        # Display the frame
-        if self.show_preview:
-            self.display_frame(rgb_frame)
-        else:
-            self.image_label.clear()
-
-        self.last_display_time = current_time
+        if display:
+            # annotate a copy when the same frame also goes to detection
+            preview = rgb_frame.copy() if detect else rgb_frame
+            self.draw_face_annotations(preview)
+            self.display_frame(preview)
+            self.last_display_time = current_time
 
-        # Start face detection every 2nd frame if we're not already processing
-        if (self.frame_counter % 2 == 0 and
-                not self.face_worker.running and
-                not np.array_equal(frame, self.last_processed_frame)):
+        if detect:
+            self.last_detection_time = current_time
             self.last_processed_frame = frame.copy()
-            QTimer.singleShot(0, lambda: self.face_worker.process_frame(rgb_frame.copy()))
+            self.face_worker.running = True  # one frame in flight; later ticks skip detection
+            self.detect_requested.emit(rgb_frame)
 
     def handle_detection_results(self, frame, faces):
         """Process face detection results from worker thread"""
@@ -594,32 +887,50 @@ class CameraFeedWidget(QWidget):
                 cv2.putText(frame, countdown_text, (x1, text_y),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
 
-        if self.show_preview:
-            self.display_frame(frame)
-
     def display_frame(self, frame):
-        """Display the frame in the QLabel"""
-        h, w, ch = frame.shape
-        bytes_per_line = ch * w
-        qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        self.image_label.setPixmap(QPixmap.fromImage(qt_image).scaled(
-            self.image_label.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        ))
+        """Display the frame in the tile (or the focused view), scaled down before conversion"""
+        target = self.focus_label if self.focus_label is not None else self.image_label
+        h, w, _ = frame.shape
+        scale = min(target.width() / w, target.height() / h)
+        if scale != 1:
+            frame = cv2.resize(frame, (max(int(w * scale), 1), max(int(h * scale), 1)),
+                               interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+            h, w, _ = frame.shape
+        qt_image = QImage(frame.data, w, h, frame.strides[0], QImage.Format_RGB888)
+        target.setPixmap(QPixmap.fromImage(qt_image))
 
     def stop_camera(self):
+        # drop any open still in flight
+        self.open_attempt += 1
+        self.open_timer.stop()
+        self.retry_timer.stop()
+
         if self.timer and self.timer.isActive():
             self.timer.stop()
 
-        if self.cap is not None:
-            self.cap.release()
-            self.cap = None
+        self.reader.stop()  # its thread releases the capture
 
         if self.face_thread and self.face_thread.isRunning():
             self.face_thread.quit()
             self.face_thread.wait()
 
+    def set_rendering(self, enabled):
+        self.rendering = enabled
+
+    def set_tile_size(self, size):
+        self.tile_size = size
+        self.image_label.setFixedSize(*size)
+
+    def set_focus_label(self, label):
+        """Render into `label` (the page's focus view) instead of the tile; None goes back to the tile."""
+        self.focus_label = label
+        self.last_display_time = 0
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.focus_requested.emit()
+        super().mousePressEvent(event)
+
     def handle_close_camera(self):
         self.stop_camera()
         self.finished.emit()
@@ -1,17 +1,22 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QLabel, QTableView,
     QHeaderView, QLineEdit, QComboBox, QDateEdit, QTimeEdit,
-    QHBoxLayout, QPushButton, QSizePolicy, QTabWidget, QMessageBox
+    QHBoxLayout, QPushButton, QSizePolicy, QTabWidget, QMessageBox,
+    QFileDialog, QProgressDialog
 )
-from PySide6.QtCore import Qt, QDate, QTime
-from PySide6.QtGui import QFont, QColor, QBrush
-from datetime import datetime
-import time
-
-from sympy.physics.units import action
+from PySide6.QtCore import Qt, QDate, QTime, QThread
+from PySide6.QtGui import QFont
 
 from db.database import get_connection
-from Features.csv_exporter import export_table_to_csv
+from Features.csv_exporter import CsvExportWorker, suggested_file_name
+from Features.person_search import like_pattern
+from Components.log_table_model import LogTableModel
+from Components.button_delegate import ButtonDelegate
+
+GATE_COLUMNS = [("ID", "id"), ("Name", "name"), ("Section", "section"), ("Role", "role"),
+                ("Action", "purpose"), ("Timestamp", "timestamp"), ("Toggle", None)]
+ROOM_COLUMNS = [("ID", "id"), ("Name", "name"), ("Role", "role"), ("Timestamp", "timestamp"),
+                ("Purpose", "purpose"), ("Section", "section"), ("Room", "room"), ("Toggle", None)]
 
 class MonitoringLogs(QWidget):
     def __init__(self, parent=None):
@@ -62,9 +67,62 @@ class MonitoringLogs(QWidget):
         current_index = self.tabs.currentIndex()
 
         if current_index == 0:  # Entry/Exit tab
-            export_table_to_csv(self.table, self, preset_name="Gate_logs")
+            model, preset_name = self.gate_model, "Gate_logs"
         elif current_index == 1:  # Room Entry/Exit tab
-            export_table_to_csv(self.room_table, self, preset_name="Room_Logs")
+            model, preset_name = self.room_model, "Room_Logs"
+        else:
+            return
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save CSV", suggested_file_name(preset_name), "CSV Files (*.csv);;All Files (*)"
+        )
+        if not path:
+            return  # User canceled
+
+        # Exports everything matching the current filter, not just the rows on screen
+        self.btn_export_csv.setEnabled(False)
+        self.export_progress = QProgressDialog("Exporting...", "Cancel", 0, 0, self)
+        self.export_progress.setWindowTitle("Export CSV")
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.show()
+
+        self.export_thread = QThread()
+        self.export_worker = CsvExportWorker(path, model.table, model.columns, model.where, model.params)
+        self.export_worker.moveToThread(self.export_thread)
+        self.export_thread.started.connect(self.export_worker.run)
+        # direct connection: the worker thread is busy in run() and polls the flag between chunks
+        self.export_progress.canceled.connect(self.export_worker.cancel, Qt.DirectConnection)
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.finished.connect(self.on_export_finished)
+        self.export_worker.failed.connect(self.on_export_failed)
+        self.export_worker.finished.connect(self.export_thread.quit)
+        self.export_worker.failed.connect(self.export_thread.quit)
+        self.export_thread.start()
+
+    def on_export_progress(self, written, total):
+        self.export_progress.setMaximum(max(total, 1))
+        self.export_progress.setValue(written)
+        self.export_progress.setLabelText(f"Exported {written:,} of {total:,} rows")
+
+    def on_export_finished(self, path, written):
+        self.export_progress.close()
+        self.btn_export_csv.setEnabled(True)
+        if path:
+            QMessageBox.information(self, "Export CSV", f"Exported {written:,} rows to {path}")
+
+    def on_export_failed(self, message):
+        self.export_progress.close()
+        self.btn_export_csv.setEnabled(True)
+        QMessageBox.warning(self, "Export CSV", f"Export failed: {message}")
+
+    def shutdown(self):
+        if getattr(self, "export_thread", None) is not None and self.export_thread.isRunning():
+            self.export_worker.cancel()
+            self.export_thread.quit()
+            self.export_thread.wait()
+        self.gate_model.shutdown()
+        self.room_model.shutdown()
 
     def setup_entry_exit_tab(self):
         layout = QVBoxLayout()
@@ -178,11 +236,8 @@ class MonitoringLogs(QWidget):
         self.advanced_filters.setVisible(False)
         layout.addWidget(self.advanced_filters)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels(["ID", "Name", "Section", "Role", "Action", "Timestamp", "Status", "Toggle"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setColumnHidden(6, True)
+        self.gate_model = LogTableModel("gate_logs", GATE_COLUMNS, self)
+        self.table = self.create_log_view(self.gate_model)
         layout.addWidget(self.table)
 
         self.load_gate_logs()
@@ -268,11 +323,8 @@ class MonitoringLogs(QWidget):
 
         layout.addLayout(top_filter_layout)
 
-        self.room_table = QTableWidget()
-        self.room_table.setColumnCount(9)
-        self.room_table.setHorizontalHeaderLabels(["ID", "Name", "Role", "Timestamp", "Purpose", "Section", "Room", "Status", "Toggle"])
-        self.room_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.room_table.setColumnHidden(7, True)
+        self.room_model = LogTableModel("room_logs", ROOM_COLUMNS, self)
+        self.room_table = self.create_log_view(self.room_model)
         layout.addWidget(self.room_table)
 
         self.load_room_logs()
@@ -282,14 +334,24 @@ class MonitoringLogs(QWidget):
         self.advanced_filters.setVisible(not visible)
         self.toggle_button.setText("▲ Hide Filters" if not visible else "▼ Show Filters")
 
-    def toggle_status(self, log_id, table_name):
-        conn = get_connection()
-        cursor = conn.cursor()
+    def create_log_view(self, model):
+        view = QTableView()
+        view.setModel(model)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        view.verticalHeader().setVisible(False)
+        view.setMouseTracking(True)  # hover state for the painted toggle buttons
+
+        delegate = ButtonDelegate(view)
+        delegate.clicked.connect(lambda index, model=model: self.toggle_status(model, index.row()))
+        view.setItemDelegateForColumn(model.columnCount() - 1, delegate)
+        return view
 
-        cursor.execute(f"SELECT status FROM {table_name} WHERE id = %s", (log_id,))
-        current_status = cursor.fetchone()[0]
+    def toggle_status(self, model, row):
+        record = model.record(row)
+        if record is None:
+            return
 
-        new_status = "void" if current_status == "active" else "active"
+        new_status = "void" if record["status"] == "active" else "active"
         action_text = "void this record" if new_status == "void" else "activate this record"
 
         reply = QMessageBox.question(
@@ -299,200 +361,66 @@ class MonitoringLogs(QWidget):
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No
         )
+        if reply != QMessageBox.Yes:
+            return
 
-        if reply == QMessageBox.Yes:
-            cursor.execute(f"UPDATE {table_name} SET status = %s WHERE id = %s", (new_status, log_id))
+        conn = get_connection()
+        try:
+            with conn.cursor() as cursor:
+                # timestamp lets the update go straight to the row's partition
+                cursor.execute(f"UPDATE {model.table} SET status = %s WHERE id = %s AND timestamp = %s",
+                               (new_status, record["id"], record["timestamp"]))
             conn.commit()
+        finally:
+            conn.close()
 
-        conn.close()
-        if table_name == "gate_logs":
-            self.load_gate_logs()
-        else:
-            self.load_room_logs()
+        model.set_status(row, new_status)
 
-    def load_gate_logs(self):
-        gate_logs = self.fetch_gate_logs_from_db()
-        self.populate_gate_logs_table(gate_logs)
+    @staticmethod
+    def parse_limit(limit_value):
+        return None if limit_value == "All" else int(limit_value)
 
-    def fetch_gate_logs_from_db(self):
+    def load_gate_logs(self):
         name_filter = self.name_input.text().strip()
         role_filter = self.role_combo.currentText()
         section_filter = self.section_input.text().strip()
-        limit_value = self.limit_combo.currentText()
 
         start_dt = f"{self.start_date.date().toString('yyyy-MM-dd')} {self.start_time.time().toString('HH:mm:ss')}"
         end_dt = f"{self.end_date.date().toString('yyyy-MM-dd')} {self.end_time.time().toString('HH:mm:ss')}"
 
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        query = "SELECT id, name, timestamp, role, purpose, section, status FROM gate_logs WHERE 1=1"
-        params = []
+        conditions = ["timestamp BETWEEN %s AND %s"]
+        params = [start_dt, end_dt]
 
         if name_filter:
-            query += " AND name ILIKE %s"
-            params.append(f"%{name_filter}%")
+            conditions.append("name ILIKE %s")
+            params.append(like_pattern(name_filter))
 
         if role_filter != "All":
-            query += " AND role = %s"
+            conditions.append("role = %s")
             params.append(role_filter)
 
         if section_filter:
-            query += " AND section ILIKE %s"
-            params.append(f"%{section_filter}%")
-
-        query += " AND timestamp BETWEEN %s AND %s"
-        params.extend([start_dt, end_dt])
-        query += " ORDER BY timestamp DESC"
-
-        if limit_value != "All":
-            query += " LIMIT %s"
-            params.append(int(limit_value))
-
-        cursor.execute(query, params)
-        gate_logs = cursor.fetchall()
-        conn.close()
-
-        return gate_logs
-
-    def populate_gate_logs_table(self, gate_logs):
-        self.table.setRowCount(len(gate_logs))
-
-        for row_idx, (id, name, timestamp, role, purpose, section, status) in enumerate(gate_logs):
-            dt_obj = datetime.strptime(str(timestamp), "%Y-%m-%d %H:%M:%S")
-            formatted_timestamp = dt_obj.strftime("%Y-%m-%d %I:%M %p")
-
-            row_values = [id, name, section, role, purpose, formatted_timestamp]
-            for col_idx, value in enumerate(row_values):
-                item = QTableWidgetItem(str(value))
-                item.setTextAlignment(Qt.AlignCenter)
-
-                if status == "void":
-                    font = item.font()
-                    font.setStrikeOut(True)
-                    item.setFont(font)
-
-                    item.setBackground(QBrush(QColor(200, 200, 200, 80)))
-                    item.setForeground(QBrush(QColor(50, 50, 50, 120)))
-
-                self.table.setItem(row_idx, col_idx, item)
-
-            status_item = QTableWidgetItem(status)
-            self.table.setItem(row_idx, 6, status_item)
-
-            # Add the action button
-            btn = self.create_status_button(id, status, "gate_logs")
-            self.table.setCellWidget(row_idx, 7, btn)
-
-    def create_status_button(self, log_id, status, table_name):
-        btn = QPushButton("Void" if status == "active" else "Activate")
-        btn.setFixedSize(80, 28)
-
-        if status == "active":
-            btn.setStyleSheet("""
-                        QPushButton {
-                            background-color: #28a745;
-                            color: white;
-                            font-weight: bold;
-                            border: none;
-                            border-radius: 6px;
-                            padding: 4px 8px;
-                        }
-                        QPushButton:hover {
-                            background-color: #218838;
-                        }
-                    """)
-        else:
-            btn.setStyleSheet("""
-                        QPushButton {
-                            background-color: #dc3545;
-                            color: white;
-                            font-weight: bold;
-                            border: none;
-                            border-radius: 6px;
-                            padding: 4px 8px;
-                        }
-                        QPushButton:hover {
-                            background-color: #c82333;
-                        }
-                    """)
-
-
-        btn.clicked.connect(lambda _, log_id=log_id: self.toggle_status(log_id, table_name))
-
-        # 👇 wrap button in QWidget with centered layout
-        wrapper = QWidget()
-        layout = QHBoxLayout(wrapper)
-        layout.addWidget(btn)
-        layout.setAlignment(Qt.AlignCenter)  # center it
-        layout.setContentsMargins(0, 0, 0, 0)  # no padding
-        wrapper.setLayout(layout)
-
-        return wrapper
+            conditions.append("section ILIKE %s")
+            params.append(like_pattern(section_filter))
 
-    def load_room_logs(self):
-        room_logs = self.fetch_room_logs_from_db()
-        self.populate_room_logs_table(room_logs)
+        self.gate_model.set_query(" AND ".join(conditions), params, self.parse_limit(self.limit_combo.currentText()))
 
-    def fetch_room_logs_from_db(self):
+    def load_room_logs(self):
         name_filter = self.room_name_input.text().strip()
         room_filter = self.room_filter_input.text().strip()
-        limit_value = self.room_limit_combo.currentText()
 
         start_dt = f"{self.room_start_date.date().toString('yyyy-MM-dd')} {self.room_start_time.time().toString('HH:mm:ss')}"
         end_dt = f"{self.room_end_date.date().toString('yyyy-MM-dd')} {self.room_end_time.time().toString('HH:mm:ss')}"
 
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        query = "SELECT id, name, role, timestamp, purpose, section, room, status FROM room_logs WHERE 1=1"
-        params = []
+        conditions = ["timestamp BETWEEN %s AND %s"]
+        params = [start_dt, end_dt]
 
         if name_filter:
-            query += " AND name ILIKE %s"
-            params.append(f"%{name_filter}%")
+            conditions.append("name ILIKE %s")
+            params.append(like_pattern(name_filter))
 
         if room_filter:
-            query += " AND room ILIKE %s"
-            params.append(f"%{room_filter}%")
-
-        query += " AND timestamp BETWEEN %s AND %s"
-        params.extend([start_dt, end_dt])
-        query += " ORDER BY timestamp DESC"
-
-        if limit_value != "All":
-            query += " LIMIT %s"
-            params.append(int(limit_value))
-
-        cursor.execute(query, params)
-        room_logs = cursor.fetchall()
-        conn.close()
-
-        return room_logs
-
-    def populate_room_logs_table(self, room_logs):
-        self.room_table.setRowCount(len(room_logs))
-        for row_idx, (id, name, role, timestamp, purpose, section, room, status) in enumerate(room_logs):
-            dt_obj = datetime.strptime(str(timestamp), "%Y-%m-%d %H:%M:%S")
-            formatted_timestamp = dt_obj.strftime("%Y-%m-%d %I:%M %p")
-
-            row_values = [id, name, role, formatted_timestamp, purpose, section, room]
-            for col_idx, value in enumerate(row_values):
-                item = QTableWidgetItem(str(value))
-                item.setTextAlignment(Qt.AlignCenter)
-
-                if status == "void":
-                    font = item.font()
-                    font.setStrikeOut(True)
-                    item.setFont(font)
-
-                    item.setBackground(QBrush(QColor(200, 200, 200, 80)))
-                    item.setForeground(QBrush(QColor(50, 50, 50, 120)))
-
-                self.room_table.setItem(row_idx, col_idx, item)
-
-            status_item = QTableWidgetItem(status)
-            self.room_table.setItem(row_idx, 7, status_item)
+            conditions.append("room ILIKE %s")
+            params.append(like_pattern(room_filter))
 
-            btn = self.create_status_button(id, status, "room_logs")
-            self.room_table.setCellWidget(row_idx, 8, btn)
\ No newline at end of file
+        self.room_model.set_query(" AND ".join(conditions), params, self.parse_limit(self.room_limit_combo.currentText()))
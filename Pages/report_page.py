@@ -1,7 +1,7 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QHBoxLayout, QPushButton, QComboBox, QSizePolicy,
                                QTableWidget, QTableWidgetItem, QHeaderView, QDialog, QLineEdit, QStackedWidget,
-                               QMessageBox, QFrame, QFileDialog, QDateEdit)
-from PySide6.QtCore import Qt, QTimer, QRegularExpression, QDate
+                               QMessageBox, QFrame, QFileDialog, QDateEdit, QProgressDialog)
+from PySide6.QtCore import Qt, QTimer, QRegularExpression, QDate, QObject, QThread, Signal
 from PySide6.QtGui import QFont, QStandardItemModel, QStandardItem, QGuiApplication, QImage, QPixmap, QRegularExpressionValidator
 import cv2
 import sys
@@ -12,12 +12,14 @@ from numpy.linalg import norm
 import threading
 import time
 
-from sympy.integrals.meijerint_doc import category
-
 from db.database import get_connection
-from Features.pdf_report import create_pdf_report
+from Features.pdf_report import create_pdf_report, create_batch_reports, batch_people
+from Features.person_directory import PersonDirectory
+from Features.event_bus import LogEventBus
 from Components.date_range_dialog import DateRangeDialog
 
+FILTER_DEBOUNCE_MS = 150
+
 class ReportPage(QWidget):
     def __init__(self, username):
         super().__init__()
@@ -63,6 +65,11 @@ class ReportPage(QWidget):
         title_layout.addWidget(lbl_title)
         title_layout.addStretch()
 
+        btn_batch = QPushButton("Batch Reports")
+        btn_batch.setToolTip("Generate a report for everyone matching the section/job and role filters")
+        btn_batch.clicked.connect(self.open_batch_reports)
+        title_layout.addWidget(btn_batch)
+
         # --- Filters ---
         second_section = QFrame(self)
         second_section.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
@@ -83,6 +90,15 @@ class ReportPage(QWidget):
         btn_filter = QPushButton("Apply Filters")
         btn_filter.clicked.connect(self.filter_data)
 
+        # Type-ahead: filter the loaded roster in memory once typing pauses
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.filter_data)
+        self.filter_name.textChanged.connect(self.filter_timer.start)
+        self.filter_section.textChanged.connect(self.filter_timer.start)
+        self.filter_role.currentIndexChanged.connect(self.filter_timer.start)
+
         filter_layout.addWidget(self.filter_name)
         filter_layout.addWidget(self.filter_section)
         filter_layout.addWidget(self.filter_role)
@@ -94,6 +110,10 @@ class ReportPage(QWidget):
         self.table.setHorizontalHeaderLabels(["ID", "Name", "Role", "Section / Job", "PDF"])
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
+        self.directory = PersonDirectory.get_instance()
+        self.directory.watch(LogEventBus.get_instance())
+        self.directory.changed.connect(self.on_directory_changed)
+        self.rendered_version = None
         self.load_data_from_db(self.table)
 
         layout.addWidget(first_section)
@@ -104,126 +124,68 @@ class ReportPage(QWidget):
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
     def load_data_from_db(self, table):
-        conn = get_connection()  # Replace with your DB name
-        cursor = conn.cursor()
+        """Re-render from the shared directory; it only queries person_info after an invalidation."""
+        self.filter_data()
 
-        query = f"SELECT id, name, role, section_or_job FROM person_info"
+    def on_directory_changed(self):
+        if self.isVisible():
+            self.filter_timer.start()
 
-        try:
-            cursor.execute(query)
-            rows = cursor.fetchall()
-
-            table.setRowCount(0)  # Clear table before inserting
-
-            for row_data in rows:
-                row_position = table.rowCount()
-                table.insertRow(row_position)
-                for column, data in enumerate(row_data):
-                    table.setItem(row_position, column, QTableWidgetItem(str(data)))
-
-                # generate button
-                btn_generate = QPushButton("Generate")
-                btn_generate.setFixedSize(80, 28)
-                btn_generate.setStyleSheet("""
-                    QPushButton {
-                            background-color: #28a745;
-                            color: white;
-                            font-weight: bold;
-                            border: none;
-                            border-radius: 6px;
-                            padding: 4px 8px;
-                        }
-                        QPushButton:hover {
-                            background-color: #218838;
-                        }
-                    """)
-                btn_generate.clicked.connect(lambda _, r=row_data, btn=btn_generate: self.generate_report(r[0], r[1], r[2], r[3], btn))
-
-                # wrap button to center
-
-                wrapper = QWidget()
-                layout = QHBoxLayout(wrapper)
-                layout.addWidget(btn_generate)
-                layout.setAlignment(Qt.AlignCenter)
-                layout.setContentsMargins(0, 0, 0, 0)
-                wrapper.setLayout(layout)
-
-                table.setCellWidget(row_position, 4, wrapper)
-
-        except Exception as e:
-            print("Error: ", e)
-
-        finally:
-            conn.close()
+    # Page lifecycle hook (called by MainPage)
+    def resume(self):
+        if self.rendered_version != self.directory.version or self.directory.stale:
+            self.filter_data()
 
     def filter_data(self):
-        conn = get_connection()
-        cursor = conn.cursor()
-
         name = self.filter_name.text().strip()
         section = self.filter_section.text().strip()
         role = self.filter_role.currentText()
 
-        query = "SELECT id, name, role, section_or_job FROM person_info WHERE 1=1"
-        params = []
-
-        if name:
-            query += " AND name ILIKE %s"
-            params.append(f"%{name}%")
-
-        if section:
-            query += " AND section_or_job ILIKE %s"
-            params.append(f"%{section}%")
-
-        if role != "All":
-            query += " AND role = %s"
-            params.append(role)
-
+        # rows: (id, name, role, section_or_job, contact, npy_path)
         try:
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-
-            self.table.setRowCount(0)  # Clear table before inserting filtered results
-
-            for row_data in rows:
-                row_position = self.table.rowCount()
-                self.table.insertRow(row_position)
-                for column, data in enumerate(row_data):
-                    self.table.setItem(row_position, column, QTableWidgetItem(str(data)))
-
-                    # generate button
-                    btn_generate = QPushButton("Generate")
-                    btn_generate.setFixedSize(80, 28)
-                    btn_generate.setStyleSheet("""
-                                    QPushButton {
-                                            background-color: #28a745;
-                                            color: white;
-                                            font-weight: bold;
-                                            border: none;
-                                            border-radius: 6px;
-                                            padding: 4px 8px;
-                                        }
-                                        QPushButton:hover {
-                                            background-color: #218838;
-                                        }
-                                    """)
-                    btn_generate.clicked.connect(lambda _, r=row_data, btn=btn_generate: self.generate_report(r[0], r[1], r[2], r[3], btn))
-
-                    # wrap button to center
-
-                    wrapper = QWidget()
-                    layout = QHBoxLayout(wrapper)
-                    layout.addWidget(btn_generate)
-                    layout.setAlignment(Qt.AlignCenter)
-                    layout.setContentsMargins(0, 0, 0, 0)
-                    wrapper.setLayout(layout)
-
-                    self.table.setCellWidget(row_position, 4, wrapper)
-
+            rows = self.directory.search(name, section, role)
         except Exception as e:
             print("Filter error:", e)
-        finally:
-            conn.close()
+            return
+        self.rendered_version = self.directory.version
+
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(0)  # Clear table before inserting filtered results
+        self.table.setRowCount(len(rows))
+        for row_position, row_data in enumerate(rows):
+            row_data = row_data[:4]
+            for column, data in enumerate(row_data):
+                self.table.setItem(row_position, column, QTableWidgetItem(str(data)))
+
+            # generate button
+            btn_generate = QPushButton("Generate")
+            btn_generate.setFixedSize(80, 28)
+            btn_generate.setStyleSheet("""
+                QPushButton {
+                        background-color: #28a745;
+                        color: white;
+                        font-weight: bold;
+                        border: none;
+                        border-radius: 6px;
+                        padding: 4px 8px;
+                    }
+                    QPushButton:hover {
+                        background-color: #218838;
+                    }
+                """)
+            btn_generate.clicked.connect(lambda _, r=row_data, btn=btn_generate: self.generate_report(r[0], r[1], r[2], r[3], btn))
+
+            # wrap button to center
+
+            wrapper = QWidget()
+            layout = QHBoxLayout(wrapper)
+            layout.addWidget(btn_generate)
+            layout.setAlignment(Qt.AlignCenter)
+            layout.setContentsMargins(0, 0, 0, 0)
+            wrapper.setLayout(layout)
+
+            self.table.setCellWidget(row_position, 4, wrapper)
+        self.table.setUpdatesEnabled(True)
 
     def generate_report(self, person_id, name, role, section_or_job, btn=None):
         try:
@@ -262,3 +224,86 @@ class ReportPage(QWidget):
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to generate PDF: {e}")
+
+    def open_batch_reports(self):
+        section = self.filter_section.text().strip()
+        role = self.filter_role.currentText()
+        if not section and role == "All":
+            QMessageBox.warning(self, "Batch Reports", "Enter a section/job or pick a role first.")
+            return
+
+        people = batch_people(role, section)
+        if not people:
+            QMessageBox.information(self, "Batch Reports", "Nobody matches those filters.")
+            return
+
+        date_dialog = DateRangeDialog(self)
+        if date_dialog.exec() != QDialog.Accepted:
+            return
+        start_date, end_date = date_dialog.get_dates()
+
+        output_dir = QFileDialog.getExistingDirectory(self, f"Folder for {len(people)} Reports")
+        if not output_dir:
+            return
+
+        self.batch_progress = QProgressDialog("Generating reports...", "Cancel", 0, len(people), self)
+        self.batch_progress.setWindowTitle("Batch Reports")
+        self.batch_progress.setWindowModality(Qt.WindowModal)
+        self.batch_progress.setMinimumDuration(0)
+        self.batch_progress.show()
+
+        self.batch_thread = QThread()
+        self.batch_worker = BatchReportWorker(people, output_dir, start_date, end_date, self.username)
+        self.batch_worker.moveToThread(self.batch_thread)
+        self.batch_thread.started.connect(self.batch_worker.run)
+        self.batch_progress.canceled.connect(self.batch_worker.cancel, Qt.DirectConnection)
+        self.batch_worker.progress.connect(self.on_batch_progress)
+        self.batch_worker.finished.connect(self.on_batch_finished)
+        self.batch_worker.finished.connect(self.batch_thread.quit)
+        self.batch_thread.start()
+
+    def on_batch_progress(self, done, total, name):
+        self.batch_progress.setValue(done)
+        self.batch_progress.setLabelText(f"Generated {done}/{total}: {name}")
+
+    def on_batch_finished(self, written, failures, output_dir):
+        self.batch_progress.close()
+        message = f"Generated {written} reports in {output_dir}."
+        if failures:
+            message += "\n\nFailed:\n" + "\n".join(f"{name}: {error}" for name, error in failures[:20])
+        QMessageBox.information(self, "Batch Reports", message)
+
+    def shutdown(self):
+        if getattr(self, "batch_thread", None) is not None and self.batch_thread.isRunning():
+            self.batch_worker.cancel()
+            self.batch_thread.quit()
+            self.batch_thread.wait()
+
+
+class BatchReportWorker(QObject):
+    progress = Signal(int, int, str)
+    finished = Signal(int, list, str)
+
+    def __init__(self, people, output_dir, start_date, end_date, generated_by):
+        super().__init__()
+        self.people = people
+        self.output_dir = output_dir
+        self.start_date = start_date
+        self.end_date = end_date
+        self.generated_by = generated_by
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        written, failures = [], []
+        try:
+            written, failures = create_batch_reports(
+                self.people, self.output_dir, self.start_date, self.end_date, self.generated_by,
+                progress=lambda done, total, name, error: self.progress.emit(done, total, name),
+                should_stop=lambda: self.cancelled
+            )
+        except Exception as e:
+            failures = [("Batch reports", str(e))]
+        self.finished.emit(len(written), failures, self.output_dir)
@@ -1,21 +1,26 @@
 # dashboard_page.py
 import os
 
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QPushButton, QComboBox, QSizePolicy, QTableWidget, QTableWidgetItem, QHeaderView, QDialog, QLineEdit, QStackedWidget, QMessageBox, QFrame
-from PySide6.QtCore import Qt, QTimer, QRegularExpression
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QPushButton, QComboBox, QSizePolicy, QTableWidget, QTableWidgetItem, QHeaderView, QDialog, QLineEdit, QStackedWidget, QMessageBox, QFrame, QFileDialog, QProgressDialog
+from PySide6.QtCore import Qt, QTimer, QRegularExpression, QThread, Signal, QObject
 from PySide6.QtGui import QFont, QStandardItemModel, QStandardItem, QGuiApplication, QImage, QPixmap, QRegularExpressionValidator
 import cv2
 import sys
 from Features.face_services import FaceDetectionService
 from Features.camera_manager import CameraManager
+from Features.enrollment_worker import EnrollmentWorker
+from Features.embedding_store import EmbeddingStore, STORE_MARKER
 import numpy as np
 from numpy.linalg import norm
 import threading
 import time
 
-from sympy.integrals.meijerint_doc import category
-
 from db.database import get_connection
+from Features.person_directory import PersonDirectory
+from Features.event_bus import LogEventBus
+
+FILTER_DEBOUNCE_MS = 150
+
 
 class UserManagementPage(QWidget):
     def __init__(self):
@@ -61,8 +66,13 @@ class UserManagementPage(QWidget):
         btn_add.setFixedHeight(34)
         btn_add.clicked.connect(self.open_add_person_window)
 
+        btn_bulk = QPushButton("Bulk Enroll")
+        btn_bulk.setFixedHeight(34)
+        btn_bulk.clicked.connect(self.open_bulk_enroll)
+
         title_layout.addWidget(lbl_title)
         title_layout.addStretch()
+        title_layout.addWidget(btn_bulk)
         title_layout.addWidget(btn_add)
 
         # --- Filters ---
@@ -85,6 +95,15 @@ class UserManagementPage(QWidget):
         btn_filter = QPushButton("Apply Filters")
         btn_filter.clicked.connect(self.filter_data)
 
+        # Type-ahead: filter the loaded roster in memory once typing pauses
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.filter_data)
+        self.filter_name.textChanged.connect(self.filter_timer.start)
+        self.filter_section.textChanged.connect(self.filter_timer.start)
+        self.filter_role.currentIndexChanged.connect(self.filter_timer.start)
+
         filter_layout.addWidget(self.filter_name)
         filter_layout.addWidget(self.filter_section)
         filter_layout.addWidget(self.filter_role)
@@ -96,6 +115,10 @@ class UserManagementPage(QWidget):
         self.table.setHorizontalHeaderLabels(["Name", "Role", "Section / Job", "Contact No"])
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
+        self.directory = PersonDirectory.get_instance()
+        self.directory.watch(LogEventBus.get_instance())
+        self.directory.changed.connect(self.on_directory_changed)
+        self.rendered_version = None
         self.load_data_from_db(self.table)
 
         layout.addWidget(first_section)
@@ -110,71 +133,108 @@ class UserManagementPage(QWidget):
         dialog.setModal(True)
         dialog.exec()
 
-    def load_data_from_db(self, table):
-        conn = get_connection()  # Replace with your DB name
-        cursor = conn.cursor()
+    def open_bulk_enroll(self):
+        csv_path, _ = QFileDialog.getOpenFileName(self, "Select Roster CSV", "", "CSV Files (*.csv)")
+        if not csv_path:
+            return
+        media_root = QFileDialog.getExistingDirectory(self, "Select Folder With One Sub-folder Per Person")
+        if not media_root:
+            return
 
-        query = f"SELECT name, role, section_or_job, contact FROM person_info"
+        self.bulk_progress = QProgressDialog("Enrolling...", None, 0, 0, self)
+        self.bulk_progress.setWindowTitle("Bulk Enrollment")
+        self.bulk_progress.setWindowModality(Qt.WindowModal)
+        self.bulk_progress.show()
+
+        self.bulk_thread = QThread()
+        self.bulk_worker = BulkEnrollWorker(csv_path, media_root)
+        self.bulk_worker.moveToThread(self.bulk_thread)
+        self.bulk_thread.started.connect(self.bulk_worker.run)
+        self.bulk_worker.progress.connect(self.on_bulk_progress)
+        self.bulk_worker.finished.connect(self.on_bulk_finished)
+        self.bulk_worker.finished.connect(self.bulk_thread.quit)
+        self.bulk_thread.start()
+
+    def on_bulk_progress(self, done, total, name):
+        self.bulk_progress.setMaximum(total)
+        self.bulk_progress.setValue(done)
+        self.bulk_progress.setLabelText(f"Enrolled {done}/{total}: {name}")
+
+    def on_bulk_finished(self, enrolled, failures):
+        self.bulk_progress.close()
+        message = f"Enrolled {enrolled} people."
+        if failures:
+            message += "\n\nFailed:\n" + "\n".join(f"{name}: {error}" for name, error in failures[:20])
+        QMessageBox.information(self, "Bulk Enrollment", message)
+        self.load_data_from_db(self.table)
 
-        try:
-            cursor.execute(query)
-            rows = cursor.fetchall()
+    def load_data_from_db(self, table):
+        """Re-render from the shared directory; it only queries person_info after an invalidation."""
+        self.filter_data()
 
-            table.setRowCount(0)  # Clear table before inserting
+    def on_directory_changed(self):
+        if self.isVisible():
+            self.filter_timer.start()
 
-            for row_data in rows:
-                row_position = table.rowCount()
-                table.insertRow(row_position)
-                for column, data in enumerate(row_data):
-                    table.setItem(row_position, column, QTableWidgetItem(str(data)))
-        except Exception as e:
-            print("Error: ", e)
-
-        finally:
-            conn.close()
+    # Page lifecycle hook (called by MainPage)
+    def resume(self):
+        if self.rendered_version != self.directory.version or self.directory.stale:
+            self.filter_data()
 
     def filter_data(self):
-        conn = get_connection()
-        cursor = conn.cursor()
-
         name = self.filter_name.text().strip()
         section = self.filter_section.text().strip()
         role = self.filter_role.currentText()
 
-        query = "SELECT name, role, section_or_job, contact FROM person_info WHERE 1=1"
-        params = []
-
-        if name:
-            query += " AND name ILIKE %s"
-            params.append(f"%{name}%")
+        # rows: (id, name, role, section_or_job, contact, npy_path)
+        try:
+            rows = self.directory.search(name, section, role)
+        except Exception as e:
+            print("Filter error:", e)
+            return
+        self.rendered_version = self.directory.version
 
-        if section:
-            query += " AND section_or_job ILIKE %s"
-            params.append(f"%{section}%")
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(rows))  # Clear table before inserting filtered results
+        for row_position, row_data in enumerate(rows):
+            for column, data in enumerate(row_data[1:5]):
+                self.table.setItem(row_position, column, QTableWidgetItem(str(data)))
+        self.table.setUpdatesEnabled(True)
 
-        if role != "All":
-            query += " AND role = %s"
-            params.append(role)
 
-        try:
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
+class BulkEnrollWorker(QObject):
+    progress = Signal(int, int, str)
+    finished = Signal(int, list)
 
-            self.table.setRowCount(0)  # Clear table before inserting filtered results
+    def __init__(self, csv_path, media_root):
+        super().__init__()
+        self.csv_path = csv_path
+        self.media_root = media_root
 
-            for row_data in rows:
-                row_position = self.table.rowCount()
-                self.table.insertRow(row_position)
-                for column, data in enumerate(row_data):
-                    self.table.setItem(row_position, column, QTableWidgetItem(str(data)))
+    def run(self):
+        from Features.bulk_enroll import bulk_enroll
+        from Features.face_indexer import FaceIndexer
 
+        enrolled, failures = 0, []
+        try:
+            # Only update the live index if recognition has already loaded it
+            enrolled, failures = bulk_enroll(
+                self.csv_path, self.media_root,
+                progress=lambda done, total, name, error: self.progress.emit(done, total, name),
+                indexer=FaceIndexer._instance
+            )
         except Exception as e:
-            print("Filter error:", e)
-        finally:
-            conn.close()
+            failures = [("Bulk enrollment", str(e))]
+        self.finished.emit(enrolled, failures)
 
 
 class AddPersonWindow(QDialog):
+    frame_ready = Signal(np.ndarray)
+
+    # How long to collect candidate frames for each angle
+    min_collect_ms = 2000
+    max_collect_ms = 10000
+
     def __init__(self):
         super().__init__()
         self.face_detection_service = FaceDetectionService.get_instance()
@@ -184,10 +244,17 @@ class AddPersonWindow(QDialog):
         self.capture_angles = ["front", "left", "right", "up", "down"]
         self.current_angle_index = 0
         self.captures_per_angle = 5
-        self.captured_count = 0
         self.embeddings_buffer = []
         self.scale = 0.5
 
+        # Detection and frame scoring run on a worker thread so the preview stays smooth
+        self.enrollment_worker = EnrollmentWorker(self.face_detection_service, keep_per_angle=self.captures_per_angle, scale=self.scale)
+        self.worker_thread = QThread()
+        self.enrollment_worker.moveToThread(self.worker_thread)
+        self.frame_ready.connect(self.enrollment_worker.process_frame)
+        self.enrollment_worker.faces_detected.connect(self.update_face_overlay)
+        self.worker_thread.start()
+
         self.resize(600, 320)
         screen_geometry = QGuiApplication.primaryScreen().geometry()
         self.move(screen_geometry.center() - self.rect().center())
@@ -248,15 +315,15 @@ class AddPersonWindow(QDialog):
         self.timer.timeout.connect(self.update_frame)
         self.timer.start(30)
 
-        self.cap = cv2.VideoCapture(0)
-
+        self.capture_timer = QTimer(self)
+        self.capture_timer.timeout.connect(self.check_angle_collection)
 
-        self.detected_faces = []
+        self.face_overlay = []
+        self.frame_in_flight = False
 
 
     def start_capture_sequence(self):
         self.current_angle_index = 0
-        self.captured_count = 0
         self.embeddings_buffer.clear()
         self.prompt_next_angle()
 
@@ -273,31 +340,46 @@ class AddPersonWindow(QDialog):
         )
 
         if reply == QMessageBox.Ok:
-            self.captured_count = 0
             self.capture_current_angle()
         else:
             print("Capture cancelled.")
 
     def capture_current_angle(self):
-        self.capture_timer = QTimer(self)
-        self.capture_timer.timeout.connect(self.capture_embedding_frame)
-        self.capture_timer.start(300)  # capture every 300ms, adjust as needed
-
-    def capture_embedding_frame(self):
-        if not self.detected_faces:
-            print("No face detected, waiting...")
-            return  # wait for face
-
-        embedding = self.detected_faces[0].embedding
-        embedding = embedding / norm(embedding)
-        self.embeddings_buffer.append(embedding)
-        self.captured_count += 1
-        print(f"Captured {self.captured_count} embeddings for {self.capture_angles[self.current_angle_index]}")
-
-        if self.captured_count >= self.captures_per_angle:
-            self.capture_timer.stop()
-            self.current_angle_index += 1
+        self.enrollment_worker.start_collecting(self.capture_angles[self.current_angle_index])
+        self.collect_elapsed_ms = 0
+        self.capture_timer.start(300)
+
+    def check_angle_collection(self):
+        """Keep scoring frames for at least min_collect_ms, then take the best N."""
+        self.collect_elapsed_ms += self.capture_timer.interval()
+        count = self.enrollment_worker.candidate_count()
+
+        enough = count >= self.captures_per_angle and self.collect_elapsed_ms >= self.min_collect_ms
+        timed_out = self.collect_elapsed_ms >= self.max_collect_ms
+        if not (enough or timed_out):
+            if count == 0:
+                print("No usable face yet, waiting...")
+            return
+
+        self.capture_timer.stop()
+        best = self.enrollment_worker.stop_collecting()
+        angle = self.capture_angles[self.current_angle_index]
+        if not best:
+            # nothing passed the quality gate within max_collect_ms; let the user fix it and retry this angle
+            QMessageBox.warning(
+                self, "No Usable Face",
+                f"No clear face was captured for '{angle}'.\n\n"
+                "Make sure the face is well lit (no strong light behind the person), "
+                "fully inside the frame and turned the way asked, then try again."
+            )
             self.prompt_next_angle()
+            return
+
+        self.embeddings_buffer.extend(best)
+        print(f"Captured {len(best)} embeddings for {angle}")
+
+        self.current_angle_index += 1
+        self.prompt_next_angle()
 
     def update_frame(self):
         try:
@@ -307,29 +389,33 @@ class AddPersonWindow(QDialog):
             return
 
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        small_frame = cv2.resize(rgb_frame, (0, 0), fx=self.scale, fy=self.scale)
-        self.detected_faces = self.face_detection_service.detect_faces(small_frame)
 
-        for face in self.detected_faces:
-            box = (face.bbox / self.scale).astype(int)
-            x1, y1, x2, y2 = box
+        # Hand the frame to the worker if it is idle; the overlay shows its latest result
+        if not self.frame_in_flight:
+            self.frame_in_flight = True
+            self.frame_ready.emit(rgb_frame.copy())
+
+        for bbox, kps in self.face_overlay:
+            x1, y1, x2, y2 = bbox.astype(int)
             cv2.rectangle(rgb_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            for landmark in (face.kps / self.scale):
-                cv2.circle(rgb_frame, tuple(landmark.astype(int)), 2, (0, 0, 255), -1)
+            if kps is not None:
+                for landmark in kps:
+                    cv2.circle(rgb_frame, tuple(landmark.astype(int)), 2, (0, 0, 255), -1)
 
         h, w, ch = rgb_frame.shape
         bytes_per_line = ch * w
         qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
         self.image_label.setPixmap(QPixmap.fromImage(qt_image))
 
+    def update_face_overlay(self, faces):
+        self.face_overlay = faces
+        self.frame_in_flight = False
+
     def save_face_encoding(self):
         if not self.embeddings_buffer:
             print("No face detected.")
             return
 
-        embedding = self.detected_faces[0].embedding
-        embedding = embedding / norm(embedding)
-
         role = self.role_person.currentText()
         name = self.ent_name.text().strip()
         section_or_job = self.ent_section_job.text().strip()
@@ -340,29 +426,52 @@ class AddPersonWindow(QDialog):
             print("Please enter name and section/job before saving.")
             return
 
-        save_dir = "encoding"
-        os.makedirs(save_dir, exist_ok=True)
-        file_name = f"{name.replace(' ', '_')}_{role}.npz"
-        file_path = os.path.join(save_dir, file_name)
-        embedding_array = np.array(self.embeddings_buffer)
-        np.savez(file_path, embeddings=embedding_array)
-        print(f"Saved encoding locally at: {file_path}")
+        embedding_array = np.array(self.embeddings_buffer, dtype=np.float32)
 
         try:
             conn = get_connection()
             cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO person_info (name, role, section_or_job, contact, npy_path) VALUES (%s, %s, %s, %s, %s)",
-                (name, role, section_or_job, contact, file_path)
+                "INSERT INTO person_info (name, role, section_or_job, contact, npy_path) VALUES (%s, %s, %s, %s, %s) RETURNING id",
+                (name, role, section_or_job, contact, STORE_MARKER)
             )
+            (person_id,) = cursor.fetchone()
             conn.commit()
-            cursor.close()
-            conn.close()
-            print("Path saved to database successfully")
+
+            # Embeddings are keyed by person id, so people with the same name no longer collide.
+            # Appended only after the commit; a failed append removes the row again.
+            try:
+                EmbeddingStore.get_instance().append(person_id, embedding_array)
+            except Exception:
+                cursor.execute("DELETE FROM person_info WHERE id = %s", (person_id,))
+                conn.commit()
+                raise
+            finally:
+                cursor.close()
+                conn.close()
+            print(f"Saved {len(embedding_array)} embeddings for {name} (ID: {person_id})")
         except Exception as e:
             print(f"Error saving to database: {e}")
+            return
+
+        PersonDirectory.get_instance().invalidate()
+
+        # Make the new person recognizable right away if recognition is already loaded
+        from Features.face_indexer import FaceIndexer
+        if FaceIndexer._instance is not None:
+            FaceIndexer._instance.add_faces(embedding_array, {
+                "id": person_id,
+                "name": name,
+                "contact": contact,
+                "role": role,
+                "section": section_or_job
+            })
 
     def closeEvent(self, event):
+        self.timer.stop()
+        self.capture_timer.stop()
         self.camera_manager.stop()
+        self.worker_thread.quit()
+        self.worker_thread.wait()
         super().closeEvent(event)
 
@@ -56,16 +56,21 @@ def update_env_file(creds, env_path=".env"):
     print(f"💾 Updated {env_path} with new DB settings (kept other values).")
 
 
+def connect_from_env():
+    """Connect with the .env settings only; raises instead of prompting (for background threads)."""
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST"),
+        database=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        port=os.getenv("DB_PORT"),
+    )
+
+
 def get_connection():
     # Try env first
     try:
-        return psycopg2.connect(
-            host=os.getenv("DB_HOST"),
-            database=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            port=os.getenv("DB_PORT"),
-        )
+        return connect_from_env()
     except Exception as e:
         print("❌ Database connection failed:", e)
 
@@ -1,25 +1,14 @@
-import psycopg2
+from db.migrations import migrate
+from db.partitions import ensure_partitions
 
-SCHEMA_SQL = """
-CREATE TABLE IF NOT EXISTS accounts (
-    id SERIAL PRIMARY KEY,
-    username TEXT UNIQUE NOT NULL,
-    password TEXT NOT NULL,
-    role TEXT DEFAULT 'user',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
-CREATE TABLE IF NOT EXISTS gate_logs (
-    id SERIAL PRIMARY KEY,
-    user_id INT REFERENCES users(id) ON DELETE CASCADE,
-    action TEXT NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-"""
 
 def init_schema(conn):
-    """Ensure required tables exist, create if missing."""
-    with conn.cursor() as cur:
-        cur.execute(SCHEMA_SQL)
-    conn.commit()
-    print("✅ Schema verified (created missing tables).")
+    """Ensure required tables and indexes exist by applying pending migrations."""
+    applied = migrate(conn)
+    if applied:
+        print(f"✅ Schema updated (migrations {', '.join(map(str, applied))}).")
+    else:
+        print("✅ Schema verified (up to date).")
+
+    # Upcoming monthly log partitions; cheap no-op when they already exist
+    ensure_partitions(conn)
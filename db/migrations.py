@@ -0,0 +1,376 @@
+"""
+Versioned schema migrations.
+
+Each migration runs once, in order, inside its own transaction and is
+recorded in schema_migrations. Add new migrations to the end of MIGRATIONS;
+never edit one that has already shipped.
+"""
+
+MIGRATIONS = [
+    (1, "core tables", """
+        CREATE TABLE IF NOT EXISTS account (
+            id SERIAL PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL DEFAULT 'staff',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS person_info (
+            id SERIAL PRIMARY KEY,
+            name TEXT NOT NULL,
+            role TEXT,
+            section_or_job TEXT,
+            contact TEXT,
+            npy_path TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS gate_logs (
+            id SERIAL PRIMARY KEY,
+            person_id INT,
+            name TEXT NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            role TEXT,
+            purpose TEXT,
+            section TEXT,
+            status TEXT NOT NULL DEFAULT 'active'
+        );
+
+        CREATE TABLE IF NOT EXISTS room_logs (
+            id SERIAL PRIMARY KEY,
+            person_id INT,
+            name TEXT NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            role TEXT,
+            purpose TEXT,
+            section TEXT,
+            room TEXT,
+            status TEXT NOT NULL DEFAULT 'active'
+        );
+
+        -- databases created by hand before migrations may lack these
+        ALTER TABLE gate_logs ADD COLUMN IF NOT EXISTS status TEXT NOT NULL DEFAULT 'active';
+        ALTER TABLE room_logs ADD COLUMN IF NOT EXISTS status TEXT NOT NULL DEFAULT 'active';
+    """),
+
+    (2, "indexes for hot queries", """
+        -- monitoring/dashboard time ranges, newest first
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_timestamp ON gate_logs (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_timestamp ON room_logs (timestamp);
+
+        -- per-person history (reports, duplicate-entry check)
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_person_ts ON gate_logs (person_id, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_person_ts ON room_logs (person_id, timestamp);
+
+        -- dashboard counts / latest entries and exits
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_purpose_ts ON gate_logs (purpose, timestamp);
+
+        -- analytics by role over a time window
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_role_ts ON gate_logs (role, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_role_ts ON room_logs (role, timestamp);
+
+        -- name lookups (room cooldown check: latest row for a name)
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_name_ts ON gate_logs (name, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_name_ts ON room_logs (name, timestamp);
+
+        CREATE INDEX IF NOT EXISTS idx_person_info_name ON person_info (name);
+        CREATE INDEX IF NOT EXISTS idx_person_info_role_section ON person_info (role, section_or_job);
+    """),
+
+    (3, "monthly range partitions for gate_logs and room_logs", """
+        -- Create one monthly partition (<table>_YYYY_MM). Rows for that month that
+        -- already landed in the default partition are moved into it first.
+        CREATE OR REPLACE FUNCTION ensure_monthly_partition(parent TEXT, month_start DATE)
+        RETURNS VOID AS $fn$
+        DECLARE
+            part TEXT := format('%s_%s', parent, to_char(month_start, 'YYYY_MM'));
+            month_end DATE := (month_start + INTERVAL '1 month')::DATE;
+        BEGIN
+            IF to_regclass(part) IS NOT NULL THEN
+                RETURN;
+            END IF;
+            EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', part, parent);
+            IF to_regclass(parent || '_default') IS NOT NULL THEN
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE timestamp >= %L AND timestamp < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    parent || '_default', month_start, month_end, part);
+            END IF;
+            EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           parent, part, month_start, month_end);
+        END;
+        $fn$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent TEXT, from_month DATE, to_month DATE)
+        RETURNS VOID AS $fn$
+        DECLARE
+            m DATE := date_trunc('month', from_month)::DATE;
+        BEGIN
+            WHILE m <= to_month LOOP
+                PERFORM ensure_monthly_partition(parent, m);
+                m := (m + INTERVAL '1 month')::DATE;
+            END LOOP;
+        END;
+        $fn$ LANGUAGE plpgsql;
+
+        -- Swap a plain log table for a partitioned one with the same columns and data.
+        CREATE OR REPLACE FUNCTION convert_to_monthly_partitions(parent TEXT, columns TEXT)
+        RETURNS VOID AS $fn$
+        DECLARE
+            old TEXT := parent || '_unpartitioned';
+            seq TEXT;
+            first_month DATE;
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid
+                       WHERE c.relname = parent) THEN
+                RETURN;
+            END IF;
+
+            EXECUTE format('ALTER TABLE %I RENAME TO %I', parent, old);
+            seq := pg_get_serial_sequence(old, 'id');
+            IF seq IS NULL THEN
+                seq := parent || '_id_seq';
+                EXECUTE format('CREATE SEQUENCE IF NOT EXISTS %I', seq);
+            ELSE
+                -- keep the id sequence alive when the old table is dropped
+                EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', seq);
+            END IF;
+
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS, PRIMARY KEY (id, timestamp)) PARTITION BY RANGE (timestamp)',
+                parent, old);
+            EXECUTE format('ALTER TABLE %I ALTER COLUMN id SET DEFAULT nextval(%L)', parent, seq);
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', seq, parent);
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', parent || '_default', parent);
+
+            EXECUTE format('SELECT date_trunc(''month'', MIN(timestamp))::DATE FROM %I', old) INTO first_month;
+            PERFORM ensure_monthly_partitions(parent, COALESCE(first_month, CURRENT_DATE),
+                                              (CURRENT_DATE + INTERVAL '2 months')::DATE);
+
+            EXECUTE format('INSERT INTO %I (%s) SELECT %s FROM %I', parent, columns, columns, old);
+            EXECUTE format('DROP TABLE %I', old);
+        END;
+        $fn$ LANGUAGE plpgsql;
+
+        SELECT convert_to_monthly_partitions('gate_logs', 'id, person_id, name, timestamp, role, purpose, section, status');
+        SELECT convert_to_monthly_partitions('room_logs', 'id, person_id, name, timestamp, role, purpose, section, room, status');
+
+        -- indexes on the partitioned parents cascade to every partition
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_timestamp ON gate_logs (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_timestamp ON room_logs (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_person_ts ON gate_logs (person_id, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_person_ts ON room_logs (person_id, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_purpose_ts ON gate_logs (purpose, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_role_ts ON gate_logs (role, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_role_ts ON room_logs (role, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_name_ts ON gate_logs (name, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_name_ts ON room_logs (name, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_id ON gate_logs (id);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_id ON room_logs (id);
+    """),
+
+    (4, "daily and hourly log rollups", """
+        -- Pre-aggregated counts per day / hour. Each insert bumps two rows per
+        -- grain: one for the person and one total row (person_id = 0, name = '').
+        -- Rows whose person is unknown are counted under person_id = -1.
+        CREATE TABLE IF NOT EXISTS log_rollup_daily (
+            day DATE NOT NULL,
+            source TEXT NOT NULL,
+            role TEXT NOT NULL,
+            purpose TEXT NOT NULL,
+            location TEXT NOT NULL,
+            person_id INT NOT NULL,
+            name TEXT NOT NULL,
+            count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, source, role, purpose, location, person_id, name)
+        );
+
+        CREATE TABLE IF NOT EXISTS log_rollup_hourly (
+            hour TIMESTAMP NOT NULL,
+            source TEXT NOT NULL,
+            role TEXT NOT NULL,
+            purpose TEXT NOT NULL,
+            location TEXT NOT NULL,
+            person_id INT NOT NULL,
+            name TEXT NOT NULL,
+            count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (hour, source, role, purpose, location, person_id, name)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_rollup_daily_person ON log_rollup_daily (person_id, day);
+        CREATE INDEX IF NOT EXISTS idx_rollup_daily_source_role ON log_rollup_daily (source, role, day);
+        CREATE INDEX IF NOT EXISTS idx_rollup_hourly_person ON log_rollup_hourly (person_id, hour);
+        CREATE INDEX IF NOT EXISTS idx_rollup_hourly_source_role ON log_rollup_hourly (source, role, hour);
+
+        CREATE OR REPLACE FUNCTION rollup_log_insert() RETURNS TRIGGER AS $fn$
+        DECLARE
+            src TEXT := TG_ARGV[0];
+            loc TEXT := CASE WHEN TG_ARGV[0] = 'gate' THEN 'Gate'
+                             ELSE COALESCE(to_jsonb(NEW) ->> 'room', '') END;
+            pid INT := COALESCE(NEW.person_id, -1);
+        BEGIN
+            INSERT INTO log_rollup_daily AS r (day, source, role, purpose, location, person_id, name, count)
+            VALUES (NEW.timestamp::DATE, src, COALESCE(NEW.role, ''), COALESCE(NEW.purpose, ''), loc, pid, NEW.name, 1),
+                   (NEW.timestamp::DATE, src, COALESCE(NEW.role, ''), COALESCE(NEW.purpose, ''), loc, 0, '', 1)
+            ON CONFLICT (day, source, role, purpose, location, person_id, name)
+            DO UPDATE SET count = r.count + 1;
+
+            INSERT INTO log_rollup_hourly AS r (hour, source, role, purpose, location, person_id, name, count)
+            VALUES (date_trunc('hour', NEW.timestamp), src, COALESCE(NEW.role, ''), COALESCE(NEW.purpose, ''), loc, pid, NEW.name, 1),
+                   (date_trunc('hour', NEW.timestamp), src, COALESCE(NEW.role, ''), COALESCE(NEW.purpose, ''), loc, 0, '', 1)
+            ON CONFLICT (hour, source, role, purpose, location, person_id, name)
+            DO UPDATE SET count = r.count + 1;
+            RETURN NULL;
+        END;
+        $fn$ LANGUAGE plpgsql;
+
+        -- Insert-only on purpose: archiving a partition must not erase its history
+        -- from the charts. rebuild_log_rollups() recomputes a range from raw logs.
+        DROP TRIGGER IF EXISTS gate_logs_rollup ON gate_logs;
+        CREATE TRIGGER gate_logs_rollup AFTER INSERT ON gate_logs
+            FOR EACH ROW EXECUTE FUNCTION rollup_log_insert('gate');
+        DROP TRIGGER IF EXISTS room_logs_rollup ON room_logs;
+        CREATE TRIGGER room_logs_rollup AFTER INSERT ON room_logs
+            FOR EACH ROW EXECUTE FUNCTION rollup_log_insert('room');
+
+        CREATE OR REPLACE FUNCTION rebuild_log_rollups(from_day DATE, to_day DATE)
+        RETURNS VOID AS $fn$
+        BEGIN
+            DELETE FROM log_rollup_daily WHERE day >= from_day AND day < to_day;
+            DELETE FROM log_rollup_hourly WHERE hour >= from_day AND hour < to_day;
+
+            CREATE TEMP TABLE rollup_source ON COMMIT DROP AS
+                SELECT timestamp, 'gate'::TEXT AS source, COALESCE(role, '') AS role,
+                       COALESCE(purpose, '') AS purpose, 'Gate'::TEXT AS location,
+                       COALESCE(person_id, -1) AS person_id, name
+                FROM gate_logs WHERE timestamp >= from_day AND timestamp < to_day
+                UNION ALL
+                SELECT timestamp, 'room', COALESCE(role, ''), COALESCE(purpose, ''), COALESCE(room, ''),
+                       COALESCE(person_id, -1), name
+                FROM room_logs WHERE timestamp >= from_day AND timestamp < to_day;
+
+            INSERT INTO log_rollup_daily (day, source, role, purpose, location, person_id, name, count)
+            SELECT timestamp::DATE, source, role, purpose, location, person_id, name, COUNT(*)
+            FROM rollup_source GROUP BY 1, 2, 3, 4, 5, 6, 7
+            UNION ALL
+            SELECT timestamp::DATE, source, role, purpose, location, 0, '', COUNT(*)
+            FROM rollup_source GROUP BY 1, 2, 3, 4, 5;
+
+            INSERT INTO log_rollup_hourly (hour, source, role, purpose, location, person_id, name, count)
+            SELECT date_trunc('hour', timestamp), source, role, purpose, location, person_id, name, COUNT(*)
+            FROM rollup_source GROUP BY 1, 2, 3, 4, 5, 6, 7
+            UNION ALL
+            SELECT date_trunc('hour', timestamp), source, role, purpose, location, 0, '', COUNT(*)
+            FROM rollup_source GROUP BY 1, 2, 3, 4, 5;
+
+            DROP TABLE rollup_source;
+        END;
+        $fn$ LANGUAGE plpgsql;
+
+        SELECT rebuild_log_rollups(
+            COALESCE(LEAST((SELECT MIN(timestamp) FROM gate_logs), (SELECT MIN(timestamp) FROM room_logs))::DATE,
+                     CURRENT_DATE),
+            CURRENT_DATE + 1
+        );
+    """),
+
+    (5, "NOTIFY log_events on log inserts", """
+        -- One small JSON payload per inserted log row for live dashboards
+        CREATE OR REPLACE FUNCTION notify_log_insert() RETURNS TRIGGER AS $fn$
+        BEGIN
+            PERFORM pg_notify('log_events', json_build_object(
+                'source', TG_ARGV[0],
+                'id', NEW.id,
+                'person_id', NEW.person_id,
+                'name', NEW.name,
+                'role', NEW.role,
+                'purpose', NEW.purpose,
+                'location', CASE WHEN TG_ARGV[0] = 'gate' THEN 'Gate' ELSE to_jsonb(NEW) ->> 'room' END,
+                'timestamp', to_char(NEW.timestamp, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+            )::TEXT);
+            RETURN NULL;
+        END;
+        $fn$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS gate_logs_notify ON gate_logs;
+        CREATE TRIGGER gate_logs_notify AFTER INSERT ON gate_logs
+            FOR EACH ROW EXECUTE FUNCTION notify_log_insert('gate');
+        DROP TRIGGER IF EXISTS room_logs_notify ON room_logs;
+        CREATE TRIGGER room_logs_notify AFTER INSERT ON room_logs
+            FOR EACH ROW EXECUTE FUNCTION notify_log_insert('room');
+    """),
+
+    (6, "keyset pagination indexes", """
+        -- monitoring tables page through logs by (timestamp, id) DESC
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_ts_id ON gate_logs (timestamp DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_ts_id ON room_logs (timestamp DESC, id DESC);
+    """),
+
+    (7, "trigram indexes for substring search", """
+        -- lets ILIKE '%x%' and similarity() on names, sections and rooms use an index
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+        CREATE INDEX IF NOT EXISTS idx_person_info_name_trgm ON person_info USING GIN (name gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_person_info_section_trgm ON person_info USING GIN (section_or_job gin_trgm_ops);
+
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_name_trgm ON gate_logs USING GIN (name gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_gate_logs_section_trgm ON gate_logs USING GIN (section gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_name_trgm ON room_logs USING GIN (name gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_room_logs_room_trgm ON room_logs USING GIN (room gin_trgm_ops);
+    """),
+
+    (8, "NOTIFY person_events on person_info changes", """
+        -- once per statement, so a bulk enrollment sends a single notification
+        CREATE OR REPLACE FUNCTION notify_person_change() RETURNS TRIGGER AS $fn$
+        BEGIN
+            PERFORM pg_notify('person_events', json_build_object('op', TG_OP)::TEXT);
+            RETURN NULL;
+        END;
+        $fn$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS person_info_notify ON person_info;
+        CREATE TRIGGER person_info_notify AFTER INSERT OR UPDATE OR DELETE ON person_info
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_person_change();
+    """),
+]
+
+
+def applied_versions(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cur.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def migrate(conn):
+    """Apply every pending migration. Returns the list of versions applied."""
+    done = applied_versions(conn)
+    applied = []
+
+    for version, description, sql in MIGRATIONS:
+        if version in done:
+            continue
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+            conn.commit()
+            applied.append(version)
+            print(f"✅ Applied migration {version}: {description}")
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Migration {version} ({description}) failed: {e}")
+            raise
+
+    return applied
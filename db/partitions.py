@@ -0,0 +1,130 @@
+"""
+Monthly partitions for gate_logs / room_logs: creation ahead of time and
+retention/archival of old months.
+
+    python -m db.partitions [--keep-months 12] [--archive-dir archive] [--detach-only]
+
+Partitions are named <table>_YYYY_MM (see migration 3). Anything that lands
+outside them goes to <table>_default and is moved out when its month's
+partition is created. Old months are exported to gzip CSV and then dropped
+(or only detached), so the live tables, vacuum and backups stay bounded.
+"""
+import argparse
+import gzip
+import os
+import re
+import sys
+from datetime import date
+
+LOG_TABLES = ("gate_logs", "room_logs")
+MONTHS_AHEAD = 2
+RETENTION_MONTHS = int(os.getenv("LOG_RETENTION_MONTHS", "12"))
+ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "archive")
+
+_PARTITION_SUFFIX = re.compile(r"_(\d{4})_(\d{2})$")
+
+
+def add_months(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def ensure_partitions(conn, months_ahead=MONTHS_AHEAD):
+    """Create partitions from the current month through `months_ahead` months ahead."""
+    this_month = date.today().replace(day=1)
+    with conn.cursor() as cur:
+        for table in LOG_TABLES:
+            cur.execute("SELECT ensure_monthly_partitions(%s, %s, %s)",
+                        (table, this_month, add_months(this_month, months_ahead)))
+    conn.commit()
+
+
+def monthly_partitions(conn, table):
+    """[(partition_name, month_start)] attached to `table`, oldest first."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = %s
+        """, (table,))
+        names = [row[0] for row in cur.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def export_partition(conn, partition, archive_dir):
+    """Write one partition to <archive_dir>/<partition>.csv.gz and return the path."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{partition}.csv.gz")
+    tmp_path = path + ".tmp"
+
+    with conn.cursor() as cur, open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            cur.copy_expert(f'COPY (SELECT * FROM "{partition}" ORDER BY timestamp) TO STDOUT WITH CSV HEADER', f)
+        # fsync on the write handle; Windows rejects it on a read-only descriptor
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def archive_old_partitions(conn, keep_months=RETENTION_MONTHS, archive_dir=ARCHIVE_DIR, drop=True):
+    """
+    Export every partition older than `keep_months` (counting the current
+    month) and then drop it, or only detach it when drop=False.
+    Returns the list of archive files written.
+    """
+    cutoff = add_months(date.today().replace(day=1), -(keep_months - 1))
+    archived = []
+
+    for table in LOG_TABLES:
+        for partition, month_start in monthly_partitions(conn, table):
+            if month_start >= cutoff:
+                continue
+            try:
+                path = export_partition(conn, partition, archive_dir)
+                with conn.cursor() as cur:
+                    cur.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{partition}"')
+                    if drop:
+                        cur.execute(f'DROP TABLE "{partition}"')
+                conn.commit()
+                archived.append(path)
+                print(f"📦 Archived {partition} to {path}{'' if drop else ' (detached)'}")
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ Failed to archive {partition}: {e}")
+
+    return archived
+
+
+def main():
+    from db.database import get_connection
+    from db.init_schema import init_schema
+
+    parser = argparse.ArgumentParser(description="Create upcoming log partitions and archive old ones.")
+    parser.add_argument("--keep-months", type=int, default=RETENTION_MONTHS,
+                        help="months of logs to keep online, including the current one")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR, help="where to write <partition>.csv.gz files")
+    parser.add_argument("--detach-only", action="store_true",
+                        help="detach archived partitions instead of dropping them")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    if not conn:
+        sys.exit("No database connection.")
+    try:
+        init_schema(conn)
+        archived = archive_old_partitions(conn, args.keep_months, args.archive_dir, drop=not args.detach_only)
+    finally:
+        conn.close()
+    print(f"✅ {len(archived)} partitions archived.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Backfill for the log rollup tables (migration 4).
+
+    python -m db.rollups [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+
+log_rollup_daily / log_rollup_hourly are kept current by an insert trigger
+on gate_logs and room_logs, so this is only needed after fixing or
+importing raw logs. Only rebuild ranges whose partitions are still online:
+the range is recomputed from raw rows, so archived months would read as 0.
+"""
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+
+
+def backfill_rollups(conn, start=None, end=None):
+    """Recompute rollups for days in [start, end). Defaults to all online logs through today."""
+    with conn.cursor() as cur:
+        if start is None:
+            cur.execute("""
+                SELECT LEAST((SELECT MIN(timestamp) FROM gate_logs), (SELECT MIN(timestamp) FROM room_logs))::DATE
+            """)
+            start = cur.fetchone()[0] or date.today()
+        if end is None:
+            end = date.today() + timedelta(days=1)
+        cur.execute("SELECT rebuild_log_rollups(%s, %s)", (start, end))
+    conn.commit()
+    return start, end
+
+
+def main():
+    from db.database import get_connection
+    from db.init_schema import init_schema
+
+    parser = argparse.ArgumentParser(description="Rebuild log rollups from the raw log tables.")
+    parser.add_argument("--from", dest="start", help="first day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="day after the last day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+    start = datetime.strptime(args.start, "%Y-%m-%d").date() if args.start else None
+    end = datetime.strptime(args.end, "%Y-%m-%d").date() if args.end else None
+
+    conn = get_connection()
+    if not conn:
+        sys.exit("No database connection.")
+    try:
+        init_schema(conn)
+        start, end = backfill_rollups(conn, start, end)
+    finally:
+        conn.close()
+    print(f"✅ Rollups rebuilt for {start} to {end}.")
+
+
+if __name__ == "__main__":
+    main()
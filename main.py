@@ -1,31 +1,27 @@
 # main.py
-from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget, QSizePolicy, QDialog
-from PySide6.QtCore import QCoreApplication, QRect, Qt
-from PySide6.QtGui import QGuiApplication, QIcon
-from faiss.contrib.datasets import username
-from sympy.polys.polyconfig import query
-
-# component import
-from Components.menu_component import MenuWidget
-
-# pages import
-from Pages.dashboard_page import DashboardPage  # Make sure the path is correct
-from Pages.live_recognition_page import LiveRecognitionPage  # Make sure the path is correct
-from Pages.user_management import UserManagementPage  # Make sure the path is correct
-from Pages.monitoring_logs import MonitoringLogs  # Make sure the path is correct
-from Pages.analytics_page import AnalyticsPage  # Make sure the path is correct
-from Pages.report_page import ReportPage  # Make sure the path is correct
+import importlib
 
+from Features import startup_profiler
 
-# from Pages.user_management import AddPersonWindow
+with startup_profiler.profile("import PySide6"):
+    from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget, QSizePolicy, QDialog, QProgressBar
+    from PySide6.QtCore import QCoreApplication, QRect, Qt
+    from PySide6.QtGui import QGuiApplication, QIcon
 
-# features
-# from Features.camera_manager import CameraManager
+# component import
+from Components.menu_component import MenuWidget
+from Features.warmup_service import WarmupService
 
-# import numpy as np
-# import cv2
-# from db.database import get_connection
-# from Features.face_indexer import FaceIndexer
+# pages are imported on first visit (see PAGES) so heavy dependencies such as
+# insightface, faiss, cv2, matplotlib and reportlab stay out of the login path
+PAGES = {
+    "dashboard": ("Pages.dashboard_page", "DashboardPage"),
+    "recognition": ("Pages.live_recognition_page", "LiveRecognitionPage"),
+    "user": ("Pages.user_management", "UserManagementPage"),
+    "monitoring": ("Pages.monitoring_logs", "MonitoringLogs"),
+    "analytics": ("Pages.analytics_page", "AnalyticsPage"),
+    "report": ("Pages.report_page", "ReportPage"),
+}
 
 
 class MainPage(QWidget):
@@ -47,6 +43,8 @@ class MainPage(QWidget):
 
         # Content area where the page will change
         self.content_area = QStackedWidget()
+        self.pages = {}
+        self.current_page = None
 
 
         # Set the layout for the content area
@@ -65,44 +63,47 @@ class MainPage(QWidget):
         role = self.main_window.user_role
         self.sidebar.show()
 
-        if page_name == "dashboard":
-            if not hasattr(self, 'dashboard_page'):
-                self.dashboard_page = DashboardPage()
-                self.content_area.addWidget(self.dashboard_page)
-            self.content_area.setCurrentWidget(self.dashboard_page)
-
-        elif page_name == "recognition":
-            if not hasattr(self, 'recognition_page'):
-                self.recognition_page = LiveRecognitionPage()
-                self.content_area.addWidget(self.recognition_page)
-            self.content_area.setCurrentWidget(self.recognition_page)
-
-        elif page_name == "user":
-            if not hasattr(self, 'user_management_page'):
-                self.user_management_page = UserManagementPage()
-                self.content_area.addWidget(self.user_management_page)
-            self.content_area.setCurrentWidget(self.user_management_page)
-
-        elif page_name == "monitoring":
-            if not hasattr(self, 'monitoring_logs_page'):
-                self.monitoring_logs_page = MonitoringLogs()
-                self.content_area.addWidget(self.monitoring_logs_page)
-            self.content_area.setCurrentWidget(self.monitoring_logs_page)
-
-        elif page_name == "analytics":
-            if not hasattr(self, 'analytics_page'):
-                self.analytics_page = AnalyticsPage()
-                self.content_area.addWidget(self.analytics_page)
-            self.content_area.setCurrentWidget(self.analytics_page)
-
-        elif page_name == "report":
-            if not hasattr(self, 'report_page'):
-                self.report_page = ReportPage(username=self.main_window.username)
-                self.content_area.addWidget(self.report_page)
-            self.content_area.setCurrentWidget(self.report_page)
-
-        else:
+        if page_name not in PAGES:
             print(f"Unknown page: {page_name}")
+            return
+
+        if page_name == self.current_page:
+            return
+
+        # Pages are built once and kept alive; switching only suspends/resumes them
+        if page_name not in self.pages:
+            self.pages[page_name] = self.create_page(page_name)
+            self.content_area.addWidget(self.pages[page_name])
+
+        self.call_page_hook(self.current_page, "suspend")
+        self.content_area.setCurrentWidget(self.pages[page_name])
+        self.call_page_hook(page_name, "resume")
+        self.current_page = page_name
+
+    def call_page_hook(self, page_name, hook):
+        """Pages may optionally define suspend(), resume() and shutdown()."""
+        page = self.pages.get(page_name)
+        if page is not None and hasattr(page, hook):
+            getattr(page, hook)()
+
+    def shutdown(self):
+        for page_name in self.pages:
+            self.call_page_hook(page_name, "shutdown")
+
+    def create_page(self, page_name):
+        module_name, class_name = PAGES[page_name]
+
+        with startup_profiler.profile(f"import {module_name}"):
+            page_class = getattr(importlib.import_module(module_name), class_name)
+
+        with startup_profiler.profile(f"init {class_name}"):
+            if page_name == "report":
+                page = page_class(username=self.main_window.username)
+            else:
+                page = page_class()
+
+        startup_profiler.report()
+        return page
 
 
 class MainWindow(QMainWindow):
@@ -124,39 +125,85 @@ class MainWindow(QMainWindow):
 
         self.user_role = role
 
+        # Warm up face models and the index in the background while staff use other pages
+        self.warmup_progress = QProgressBar()
+        self.warmup_progress.setFixedWidth(200)
+        self.statusBar().addPermanentWidget(self.warmup_progress)
+        self.warmup_service = WarmupService(self)
+        self.warmup_service.progress.connect(self.on_warmup_progress)
+        self.warmup_service.finished.connect(self.on_warmup_finished)
+        self.warmup_service.start()
+
+        self.username = user_info['username']
+
+        # One MainPage for the lifetime of the window; navigation just switches its pages
+        self.central_widget = MainPage(self)
+        self.setCentralWidget(self.central_widget)
+
         self.navigate_to("dashboard" if self.user_role == "admin" else "dashboard")
 
         # load the faces and info
         self.embeddings = None
         self.infos = []
 
-        self.username = user_info['username']
 
+    def on_warmup_progress(self, message, percent):
+        self.statusBar().showMessage(message)
+        self.warmup_progress.setValue(percent)
+
+    def on_warmup_finished(self, ok):
+        self.warmup_progress.hide()
+        if ok:
+            self.statusBar().showMessage("Recognition ready", 5000)
+        # on failure the "Warm-up failed: ..." progress message stays up
+
+    def closeEvent(self, event):
+        self.central_widget.shutdown()
+        self.warmup_service.wait()
+        # only running if a page subscribed to live log events
+        from Features.event_bus import LogEventBus
+        if LogEventBus._instance is not None:
+            LogEventBus._instance.stop()
+        super().closeEvent(event)
 
     def navigate_to(self, page):
-        self.central_widget = MainPage(self)
         self.central_widget.set_content(page)
-        self.setCentralWidget(self.central_widget)
 
 
 if __name__ == "__main__":
-    app = QApplication([])
+    with startup_profiler.profile("create QApplication"):
+        app = QApplication([])
 
-    from Pages.login_page import LoginDialog
-    from db.database import get_connection
+    with startup_profiler.profile("import login page"):
+        from Pages.login_page import LoginDialog
+        from db.database import get_connection
+        from db.init_schema import init_schema
 
-    conn = get_connection()
+    with startup_profiler.profile("connect to database"):
+        conn = get_connection()
     if not conn:
         print("⚠️ Starting app without DB connection")
+    else:
+        with startup_profiler.profile("apply schema migrations"):
+            try:
+                init_schema(conn)
+            except Exception as e:
+                print(f"⚠️ Schema migration failed: {e}")
+        conn.close()
 
     # Show login dialog
-    login = LoginDialog()
+    with startup_profiler.profile("build login dialog"):
+        login = LoginDialog()
+    startup_profiler.mark("login dialog shown")
+    startup_profiler.report()
     if login.exec() == QDialog.Accepted:
         # Only create main window if login passed
         user_info = {
             "username": login.username_text
         }
-        window = MainWindow(login.user_role)
+        with startup_profiler.profile("build main window"):
+            window = MainWindow(login.user_role)
         window.show()
+        startup_profiler.report()
         app.exec()
 